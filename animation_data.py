@@ -1,62 +1,77 @@
-from dataclasses import dataclass, field
+import math
+from dataclasses import dataclass, field, fields, MISSING
+from typing import Any, Callable
 
-@dataclass
+Color = tuple[int, int, int]
+
+# colors received from the controller are interned, up to this many distinct ones
+MAX_INTERNED_COLORS = 4096
+
+
+def ranged(default, low=None, high=None):
+    """
+    Field whose decoded value is clamped to [low, high], None leaves that side open
+    """
+    return field(default=default, metadata={"range": (low, high)})
+
+
+@dataclass(slots=True)
 class FireworkArgs:
-    num_sparks: int = 60
+    num_sparks: int = ranged(60, 0, 1000)
     gravity: float = -0.004
-    brightness_decay: float = 0.985
-    flare_min_vel: float = 0.5
-    flare_max_vel: float = 0.9
-    c1: float = 120
-    c2: float = 50
+    brightness_decay: float = ranged(0.985, 0.0, 1.0)
+    flare_min_vel: float = ranged(0.5, 0.0)
+    flare_max_vel: float = ranged(0.9, 0.0)
+    c1: float = ranged(120, 0, 255)
+    c2: float = ranged(50, 0, 255)
 
-@dataclass
+@dataclass(slots=True)
 class AnimationState:
     """State of animations and neopixels"""
     state: str = "OFF"
-    color: tuple = (255, 255, 255)
+    color: Color = (255, 255, 255)
     effect: str = "SingleColor"
-    brightness: float = 0.0
+    brightness: float = ranged(0.0, 0, 255)
 
 
-@dataclass
+@dataclass(slots=True)
 class SingleColorArgs:
     """Single Color mode options"""
-    color: tuple = (255, 0, 0)
+    color: Color = (255, 0, 0)
 
-@dataclass
+@dataclass(slots=True)
 class GlitterRainbowArgs:
     """Glitter Rainbow Animation options"""
-    glitter_ratio: float = 0.05
+    glitter_ratio: float = ranged(0.05, 0.0, 1.0)
 
-@dataclass
+@dataclass(slots=True)
 class FadeArgs:
     """Fade Animation options"""
-    colora: tuple = (255, 0, 0)
-    colorb: tuple = (0, 0, 0)
+    colora: Color = (255, 0, 0)
+    colorb: Color = (0, 0, 0)
 
 
-@dataclass
+@dataclass(slots=True)
 class FlashArgs:
     """Flash Animation options"""
-    colora: tuple = (255, 0, 0)
-    colorb: tuple = (0, 0, 0)
-    speed: float = 25
+    colora: Color = (255, 0, 0)
+    colorb: Color = (0, 0, 0)
+    speed: float = ranged(25, 1)
 
-@dataclass
+@dataclass(slots=True)
 class RandomArgs:
     """Random Animation options"""
-    color: tuple = (255, 255, 255)
+    color: Color = (255, 255, 255)
 
-@dataclass
+@dataclass(slots=True)
 class WipeArgs:
     """Wipe Animation options"""
-    colora: tuple = (255, 0, 0)
-    colorb: tuple = (0, 0, 255)
-    leds_iter: int = 1
+    colora: Color = (255, 0, 0)
+    colorb: Color = (0, 0, 255)
+    leds_iter: int = ranged(1, 1)
 
 
-@dataclass
+@dataclass(slots=True)
 class AnimationArgs:
     """Options for animations"""
     single_color: SingleColorArgs = field(default_factory=SingleColorArgs)
@@ -66,3 +81,171 @@ class AnimationArgs:
     wipe: WipeArgs = field(default_factory=WipeArgs)
     random: RandomArgs = field(default_factory=RandomArgs)
     firework: FireworkArgs = field(default_factory=FireworkArgs)
+
+
+class ArgsError(ValueError):
+    pass
+
+
+_colors: dict[Color, Color] = {}
+
+
+def _number(value, name: str, kind: type, low, high):
+    number_type = value.__class__
+    # bools are ints to python, but never a valid arg
+    if number_type is not int and number_type is not float:
+        raise ArgsError(f"{name} must be a number, got {type(value).__name__}")
+    if number_type is float and not math.isfinite(value):
+        raise ArgsError(f"{name} must be finite, got {value}")
+    if number_type is not kind:
+        value = round(value) if kind is int else float(value)
+    if low is not None and value < low:
+        return low
+    if high is not None and value > high:
+        return high
+    return value
+
+
+def _color(value, name: str) -> Color:
+    if value.__class__ not in (list, tuple) or len(value) != 3:
+        raise ArgsError(f"{name} must be an RGB triplet, got {value!r}")
+    r, g, b = value
+    if r.__class__ is not int or g.__class__ is not int or b.__class__ is not int:
+        r, g, b = (_number(c, name, int, 0, 255) for c in value)
+    color = (min(max(r, 0), 255), min(max(g, 0), 255), min(max(b, 0), 255))
+    interned = _colors.get(color)
+    if interned is not None:
+        return interned
+    if len(_colors) < MAX_INTERNED_COLORS:
+        _colors[color] = color
+    return color
+
+
+def _string(value, name: str) -> str:
+    if value.__class__ is not str:
+        raise ArgsError(f"{name} must be a string, got {type(value).__name__}")
+    return value
+
+
+def _compile_decoder(cls, decoders: dict) -> Callable[..., Any]:
+    """Generate the decoder of a dataclass from its fields
+
+    Every field becomes straight line code that reads its key, converts it with the
+    converter for its annotated type and falls back to the default when it is missing.
+    Nested dataclasses use their own decoder, which must already be in decoders.
+
+    Args:
+        cls (type): Slots dataclass to decode to
+        decoders (dict): Decoders generated so far, by class
+
+    Returns:
+        Callable[[dict], object]: Builds a cls from a dict, raising ArgsError on invalid values
+    """
+    name = cls.__name__
+    namespace = {
+        "cls": cls, "new": object.__new__, "MISSING": MISSING, "ArgsError": ArgsError,
+        "_number": _number, "_color": _color, "_string": _string, "colors_get": _colors.get, "inf": math.inf,
+    }
+    lines = [
+        "def decode(data, path=''):",
+        "    if data.__class__ is not dict:",
+        f'        raise ArgsError(f"{{path or {name!r}}} must be an object, got {{type(data).__name__}}")',
+        "    get = data.get",
+        "    obj = new(cls)",
+    ]
+    for f in fields(cls):
+        key = f.name
+        label = f"(f'{{path}}.{key}' if path else {key!r})"
+        if f.default_factory is not MISSING:
+            namespace[f"default_{key}"] = f.default_factory
+            default = f"default_{key}()"
+        else:
+            namespace[f"default_{key}"] = _color(f.default, key) if f.type is Color else f.default
+            default = f"default_{key}"
+
+        # values that are already valid take the fast branch, the converter handles the rest
+        fast = None
+        if f.type in decoders:
+            namespace[f"decode_{key}"] = decoders[f.type]
+            convert = f"decode_{key}(value, {label})"
+        elif f.type is Color:
+            # only valid colors are interned, so a hit on three ints needs no other checks,
+            # bools and floats compare equal to ints and must not hit
+            fast = ("value.__class__ is list and len(value) == 3 and value[0].__class__ is int and "
+                    "value[1].__class__ is int and value[2].__class__ is int and "
+                    "(interned := colors_get((value[0], value[1], value[2]))) is not None", "interned")
+            convert = f"_color(value, {label})"
+        elif f.type in (int, float):
+            low, high = f.metadata.get("range", (None, None))
+            # comparisons are false for nan, which leaves it to the converter with inf
+            open_low, open_high = ("-inf", "inf") if f.type is float else (None, None)
+            bounds = "".join([
+                f" and value >= {low!r}" if low is not None else (f" and value > {open_low}" if open_low else ""),
+                f" and value <= {high!r}" if high is not None else (f" and value < {open_high}" if open_high else ""),
+            ])
+            fast = (f"value.__class__ is {f.type.__name__}{bounds}", "value")
+            convert = f"_number(value, {label}, {f.type.__name__}, {low!r}, {high!r})"
+        elif f.type is str:
+            fast = ("value.__class__ is str", "value")
+            convert = f"_string(value, {label})"
+        else:
+            raise TypeError(f"No decoder for {name}.{key} of type {f.type!r}")
+
+        lines += [
+            f"    value = get({key!r}, MISSING)",
+            "    if value is MISSING:",
+            f"        obj.{key} = {default}",
+        ]
+        if fast:
+            lines += [f"    elif {fast[0]}:", f"        obj.{key} = {fast[1]}"]
+        lines += ["    else:", f"        obj.{key} = {convert}"]
+    lines.append("    return obj")
+
+    exec("\n".join(lines), namespace)
+    decode = namespace["decode"]
+    decode.__qualname__ = f"decode_{name}"
+    return decode
+
+
+ARGS_DECODERS: dict[type, Callable[..., Any]] = {}
+for _cls in (SingleColorArgs, GlitterRainbowArgs, FadeArgs, FlashArgs, RandomArgs, WipeArgs, FireworkArgs,
+             AnimationState, AnimationArgs):
+    ARGS_DECODERS[_cls] = _compile_decoder(_cls, ARGS_DECODERS)
+
+
+def decode_args(data: dict) -> AnimationArgs:
+    """Build AnimationArgs from decoded JSON
+
+    Args:
+        data (dict): Args object sent by the controller, missing sections and keys use their defaults
+
+    Raises:
+        ArgsError: A value has the wrong type
+
+    Returns:
+        AnimationArgs: Args with numbers clamped to their ranges and interned colors
+    """
+    return ARGS_DECODERS[AnimationArgs](data)
+
+
+def decode_section(section: str, values: dict) -> dict:
+    """Convert the values of one args section the way decode_args does
+
+    Args:
+        section (str): AnimationArgs field name
+        values (dict): Values to convert, only these keys are returned
+
+    Raises:
+        ArgsError: The section, a key or a value is invalid
+
+    Returns:
+        dict: Converted values
+    """
+    section_field = next((f for f in fields(AnimationArgs) if f.name == section), None)
+    if section_field is None:
+        raise ArgsError(f"Unknown args section {section}")
+    decoded = ARGS_DECODERS[section_field.type](values, section)
+    unknown = values.keys() - {f.name for f in fields(section_field.type)}
+    if unknown:
+        raise ArgsError(f"Unknown {section} args {', '.join(sorted(unknown))}")
+    return {key: getattr(decoded, key) for key in values}
@@ -0,0 +1,160 @@
+from collections import deque
+
+from qtpy import QtCore
+from loguru import logger
+
+from animation_data import AnimationArgs, decode_section
+
+
+class ArgsSynchronizer(QtCore.QObject):
+    """
+    Local AnimationArgs model that is updated as soon as a command is sent.
+
+    Every local change gets a sequence number. Each data request remembers the newest
+    sequence number at the time it was sent, so every snapshot is applied with the local
+    commands it predates laid over it, instead of snapping the UI back.
+
+    The controller does not answer args commands, so a command counts as confirmed once it
+    is published. A snapshot covering confirmed commands that disagrees with them is a
+    mismatch, it replaces those values and a resync is requested. A periodic resync for
+    commands that are never published is opt-in, a resync_timeout of 0 disables it.
+    """
+
+    argsChanged = QtCore.Signal(object)
+    resyncRequested = QtCore.Signal()
+
+    def __init__(self, resync_timeout: int = 0, parent=None):
+        super(ArgsSynchronizer, self).__init__(parent)
+
+        self.m_args = AnimationArgs()
+        self.m_seq = 0
+        # commands by sequence number, until they are published and then until a snapshot covers them
+        self.m_pending: dict[int, tuple[str, dict]] = {}
+        self.m_confirmed: dict[int, tuple[str, dict]] = {}
+        self.m_requests: deque[int] = deque()
+
+        self.m_merged_snapshots = 0
+        self.m_mismatches = 0
+        self.m_resyncs = 0
+
+        self.m_resync_timer = QtCore.QTimer(self)
+        self.m_resync_timer.setSingleShot(True)
+        self.m_resync_timer.setInterval(resync_timeout)
+        self.m_resync_timer.timeout.connect(self.on_resync_timeout)
+
+    @property
+    def args(self) -> AnimationArgs:
+        return self.m_args
+
+    @property
+    def seq(self) -> int:
+        return self.m_seq
+
+    @property
+    def in_flight(self) -> int:
+        return len(self.m_pending)
+
+    @property
+    def merged_snapshots(self) -> int:
+        """
+        Snapshots that predated local commands and had them laid over
+        """
+        return self.m_merged_snapshots
+
+    @property
+    def mismatches(self) -> int:
+        return self.m_mismatches
+
+    @property
+    def resyncs(self) -> int:
+        return self.m_resyncs
+
+    def apply_local(self, section: str, values: dict) -> int:
+        """
+        Apply a change to the local model and return the sequence number for its command
+        """
+        # converted like a controller response, so both compare equal when confirmed
+        values = decode_section(section, values)
+        section_args = getattr(self.m_args, section)
+        for key, value in values.items():
+            setattr(section_args, key, value)
+
+        self.m_seq += 1
+        self.m_pending[self.m_seq] = (section, values)
+        if self.m_resync_timer.interval() > 0:
+            self.m_resync_timer.start()
+
+        self.argsChanged.emit(self.m_args)
+        return self.m_seq
+
+    def on_published(self, seq: int):
+        """
+        Confirm the command with seq and the older commands it replaced before they were sent
+        """
+        command = self.m_pending.pop(seq, None)
+        if command is None:
+            return
+        section, values = command
+        # the publish scheduler drops unsent commands for the same keys
+        replaced = [
+            older for older, (older_section, older_values) in self.m_pending.items()
+            if older < seq and older_section == section and older_values.keys() == values.keys()
+        ]
+        for older in replaced:
+            self.m_confirmed[older] = self.m_pending.pop(older)
+        self.m_confirmed[seq] = command
+        if not self.m_pending:
+            self.m_resync_timer.stop()
+
+    def request_sent(self):
+        """
+        Record that a data request including args was published
+        """
+        self.m_requests.append(self.m_seq)
+
+    def on_snapshot(self, args: AnimationArgs) -> bool:
+        """
+        Reconcile args received from the controller, returns False on a mismatch
+        """
+        # a snapshot nobody asked for covers no commands, so all of them are laid over it
+        covered = self.m_requests.popleft() if self.m_requests else 0
+
+        # the newest value of every confirmed key the snapshot should already reflect
+        expected: dict[tuple[str, str], object] = {}
+        for seq in sorted(self.m_confirmed):
+            if seq > covered:
+                break
+            section, values = self.m_confirmed.pop(seq)
+            for key, value in values.items():
+                expected[(section, key)] = value
+        mismatched = [
+            f"{section}.{key}"
+            for (section, key), value in expected.items()
+            if getattr(getattr(args, section), key) != value
+        ]
+
+        # commands sent after the request, or not sent yet, are still newer than the snapshot
+        later = sorted([*self.m_confirmed.items(), *self.m_pending.items()])
+        for _seq, (section, values) in later:
+            section_args = getattr(args, section)
+            for key, value in values.items():
+                setattr(section_args, key, value)
+        if later:
+            self.m_merged_snapshots += 1
+
+        self.m_args = args
+        self.argsChanged.emit(self.m_args)
+
+        if mismatched:
+            self.m_mismatches += 1
+            self.m_resyncs += 1
+            logger.warning(f"Controller args differ from local state for {', '.join(mismatched)}")
+            self.resyncRequested.emit()
+        return not mismatched
+
+    def on_resync_timeout(self):
+        # any outstanding requests will not be answered, don't let them shift the queue
+        self.m_requests.clear()
+        self.m_resyncs += 1
+        logger.debug(f"{len(self.m_pending)} args commands unpublished, requesting resync")
+        self.resyncRequested.emit()
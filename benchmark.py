@@ -0,0 +1,592 @@
+"""
+/// NeoPixel Animator Benchmarks ///
+DESCRIPTION: Headless microbenchmarks for startup, message handling, publishing and previews
+LICENSE: GPLv3
+"""
+
+import argparse
+import json
+import os
+import platform
+import statistics
+import sys
+import tempfile
+import time
+from typing import Callable
+
+# must be set before Qt is imported
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+import numpy as np
+from loguru import logger
+from qtpy import QT_VERSION
+from qtpy.QtCore import QSettings, QStandardPaths
+from qtpy.QtWidgets import QApplication
+
+BENCHMARKS: dict[str, Callable[["BenchContext"], Callable[[], None]]] = {}
+
+
+def benchmark(name: str, number: int | None = None):
+    """Register a benchmark.
+
+    The decorated function receives the BenchContext and returns the callable to time.
+
+    Args:
+        name (str): Benchmark name used in results and baselines
+        number (int | None, optional): Fixed calls per round. Calibrated if None. Defaults to None.
+    """
+
+    def decorator(setup):
+        setup.number = number
+        BENCHMARKS[name] = setup
+        return setup
+
+    return decorator
+
+
+class BenchContext:
+    """
+    Shared QApplication, local broker, simulated controller and lazily built MainWindow
+    """
+
+    def __init__(self) -> None:
+        # keep benchmarks away from the user's settings
+        self.config_dir = tempfile.TemporaryDirectory(prefix="npa-bench-")
+        QSettings.setPath(QSettings.Format.NativeFormat, QSettings.Scope.UserScope, self.config_dir.name)
+        QSettings.setPath(QSettings.Format.IniFormat, QSettings.Scope.UserScope, self.config_dir.name)
+        # and the icon and offline queue stores away from the user's data
+        QStandardPaths.setTestModeEnabled(True)
+
+        self.app = QApplication.instance() or QApplication(sys.argv)
+
+        from simulator import ControllerSimulator, LocalBroker
+
+        self.broker = LocalBroker().start()
+        self.controller = ControllerSimulator(self.broker.bus)
+
+        settings = QSettings("meowmeowahr", "NeoPixelAnimatorGUI")
+        settings.setValue("mqtt/host", self.broker.address[0])
+        settings.setValue("mqtt/port", self.broker.address[1])
+        settings.sync()
+
+        self._window = None
+
+    def new_window(self):
+        import main
+
+        main.app = self.app
+        return main.MainWindow(self.app)
+
+    @staticmethod
+    def close_window(window) -> None:
+        window.close()
+        window.deleteLater()
+
+    @property
+    def window(self):
+        if self._window is None:
+            self._window = self.new_window()
+            # subscriptions are in place once the initial data request has been answered
+            self.wait_for(lambda: self._window.client.inbound.metrics()["delivered"] > 0)
+        return self._window
+
+    def wait_for(self, condition: Callable[[], bool], timeout: float = 10.0) -> bool:
+        end = time.perf_counter() + timeout
+        while not condition():
+            if time.perf_counter() > end:
+                return False
+            self.app.processEvents()
+        return True
+
+    def close(self) -> None:
+        if self._window is not None:
+            self.close_window(self._window)
+            self.app.processEvents()
+        self.controller.close()
+        self.broker.stop()
+        self.config_dir.cleanup()
+
+
+def measure(run: Callable[[], None], number: int | None, rounds: int, min_time: float) -> dict:
+    """Time a callable over several rounds.
+
+    Args:
+        run (Callable[[], None]): Callable to time
+        number (int | None): Calls per round, calibrated to take at least min_time if None
+        rounds (int): Number of rounds
+        min_time (float): Minimum round duration in seconds used for calibration
+
+    Returns:
+        dict: Per-call statistics in seconds
+    """
+    run()  # warm up
+    if number is None:
+        number = 1
+        while True:
+            start = time.perf_counter()
+            for _ in range(number):
+                run()
+            if time.perf_counter() - start >= min_time or number >= 1 << 20:
+                break
+            number *= 2
+
+    times = []
+    for _ in range(rounds):
+        start = time.perf_counter()
+        for _ in range(number):
+            run()
+        times.append((time.perf_counter() - start) / number)
+
+    median = statistics.median(times)
+    return {
+        "median": median,
+        "min": min(times),
+        "max": max(times),
+        "stdev": statistics.stdev(times) if len(times) > 1 else 0.0,
+        "ops_per_sec": 1 / median if median else None,
+        "rounds": rounds,
+        "number": number,
+    }
+
+
+@benchmark("startup.main_window_init", number=1)
+def bench_main_window_init(ctx: BenchContext):
+    def run():
+        ctx.close_window(ctx.new_window())
+        ctx.app.processEvents()
+
+    return run
+
+
+RESTARTS = 20
+
+
+def rss_bytes() -> int:
+    """
+    Resident set size of this process, the peak size where the current one is not available
+    """
+    try:
+        with open("/proc/self/statm", encoding="ascii") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except OSError:
+        import resource
+
+        # kilobytes on linux, bytes on macos
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return peak if sys.platform == "darwin" else peak * 1024
+
+
+@benchmark(f"startup.restart_{RESTARTS}", number=1)
+def bench_restart(ctx: BenchContext):
+    # every restart applies a new title and broker host, both reach the same local broker
+    window = ctx.window
+    hosts = [window.settings.mqtt_host, "localhost"]
+    titles = [window.settings.app_title, f"{window.settings.app_title} (bench)"]
+    samples = [rss_bytes()]
+
+    def run():
+        for i in range(1, RESTARTS + 1):
+            window.settings.set_mqtt_host(hosts[i % 2])
+            window.settings.set_app_title(titles[i % 2])
+            window.restart()
+            if not ctx.wait_for(lambda: window.client.state == window.client.Connected):
+                raise TimeoutError(f"no connection after restart {i}")
+        ctx.app.processEvents()
+        samples.append(rss_bytes())
+        run.metrics = {
+            "rss_start": samples[0],
+            "rss_end": samples[-1],
+            "rss_growth_per_restart": (samples[-1] - samples[0]) / (RESTARTS * (len(samples) - 1)),
+        }
+
+    run.metrics = {}
+    return run
+
+
+def _message_bench(topic_setting: str, payloads: list[str], burst: int = 1):
+    # messages take the production path, parsed on the inbound thread and delivered as a batch
+    def setup(ctx: BenchContext):
+        window = ctx.window
+        inbound = window.client.inbound
+        topic = getattr(window.settings, topic_setting)
+        encoded = [payload.encode("utf-8") for payload in payloads]
+        index = 0
+
+        def run():
+            nonlocal index
+            for _ in range(burst):
+                inbound.submit(topic, encoded[index % len(encoded)])
+                index += 1
+            inbound.flush()
+
+        return run
+
+    return setup
+
+
+def _full_response(**overrides) -> str:
+    from simulator import ControllerSimulator, InProcessBus
+
+    controller = ControllerSimulator(InProcessBus())
+    data = json.loads(controller.full_response())
+    controller.close()
+    data.update(overrides)
+    return json.dumps(data)
+
+
+benchmark("message.state")(_message_bench("return_state_topic", ["ON", "OFF"]))
+benchmark("message.brightness")(_message_bench("return_brightness_topic", ["12", "200"]))
+benchmark("message.animation")(_message_bench("return_anim_topic", ["Rainbow", "Fade", "Wipe"]))
+benchmark("message.data_full")(
+    _message_bench("return_data_request_topic", [_full_response(state="ON"), _full_response(state="OFF")])
+)
+# a burst on a latest-wins topic is coalesced into one handler call
+benchmark("message.brightness_burst_100")(_message_bench("return_brightness_topic", ["12", "200"], burst=100))
+
+
+@benchmark("decode.args")
+def bench_decode_args(ctx: BenchContext):
+    from animation_data import decode_args
+
+    args = json.loads(json.loads(_full_response())["args"])
+    return lambda: decode_args(args)
+
+
+@benchmark("decode.args_varied")
+def bench_decode_args_varied(ctx: BenchContext):
+    import itertools
+
+    from animation_data import decode_args
+
+    # every section set, with numbers to clamp and colors repeating the way palettes do
+    rng = np.random.default_rng(0)
+    palette = rng.integers(0, 256, (16, 3)).tolist()
+
+    def color():
+        return palette[rng.integers(len(palette))]
+
+    messages = [
+        {
+            "single_color": {"color": color()},
+            "glitter_rainbow": {"glitter_ratio": float(rng.uniform(-0.5, 1.5))},
+            "fade": {"colora": color(), "colorb": color()},
+            "flash": {"colora": color(), "colorb": color(), "speed": int(rng.integers(-10, 100))},
+            "wipe": {"colora": color(), "colorb": color(), "leds_iter": int(rng.integers(0, 10))},
+            "random": {"color": color()},
+            "firework": {
+                "num_sparks": int(rng.integers(0, 2000)),
+                "gravity": float(rng.uniform(-0.02, 0)),
+                "brightness_decay": float(rng.uniform(0.9, 1.1)),
+                "flare_min_vel": float(rng.uniform(0, 1)),
+                "flare_max_vel": float(rng.uniform(0, 2)),
+                "c1": int(rng.integers(0, 300)),
+                "c2": float(rng.uniform(0, 300)),
+            },
+        }
+        for _ in range(64)
+    ]
+    cycle = itertools.cycle(messages)
+    return lambda: decode_args(next(cycle))
+
+
+@benchmark("decode.parse_data_response")
+def bench_parse_data_response(ctx: BenchContext):
+    from main import parse_data_response
+
+    payload = _full_response()
+    return lambda: parse_data_response(payload)
+
+
+@benchmark("widgets.color_block_set_rgb")
+def bench_color_block(ctx: BenchContext):
+    from widgets import ColorBlock
+
+    block = ColorBlock()
+    colors = [(255, 0, 0), (0, 255, 0), (0, 0, 255)]
+    index = 0
+
+    def run():
+        nonlocal index
+        block.set_rgb(colors[index % 3])
+        index += 1
+
+    return run
+
+
+@benchmark("widgets.palette_grid_init")
+def bench_palette_grid(ctx: BenchContext):
+    from palette import PALETTES, PaletteGrid
+
+    sfx = ctx.window.sfx
+
+    def run():
+        PaletteGrid(PALETTES["kevinbot"], sfx, size=56).deleteLater()
+
+    return run
+
+
+PREVIEW_LEDS = 4096
+
+
+def _preview_bench(animation: str):
+    def setup(ctx: BenchContext):
+        from preview import PreviewEngine
+
+        engine = PreviewEngine(PREVIEW_LEDS, seed=0)
+        engine.animation = animation
+        # enough sparks for several hundred to be alive at once
+        engine.args.firework.num_sparks = 300
+        frame = np.empty((PREVIEW_LEDS, 3), dtype=np.uint8)
+        t = 0.0
+
+        def run():
+            nonlocal t
+            t += 1 / 60
+            engine.render(t, frame)
+
+        return run
+
+    return setup
+
+
+# op/s is the frame rate the preview could sustain at PREVIEW_LEDS
+for _animation in ("SingleColor", "Rainbow", "GlitterRainbow", "Colorloop", "Fade", "Flash", "Wipe", "Random",
+                   "Firework"):
+    benchmark(f"preview.{_animation.lower()}_{PREVIEW_LEDS}")(_preview_bench(_animation))
+
+
+@benchmark(f"preview.strip_frame_{PREVIEW_LEDS}")
+def bench_strip_frame(ctx: BenchContext):
+    from qtpy.QtGui import QImage
+
+    from preview import PreviewEngine, StripPreview
+
+    engine = PreviewEngine(PREVIEW_LEDS, seed=0)
+    engine.animation = "GlitterRainbow"
+    strip = StripPreview(engine)
+    strip.resize(800, 32)
+    target = QImage(800, 32, QImage.Format.Format_RGB32)
+
+    def run():
+        # render and paint one frame, as the preview timer does
+        strip.render_frame()
+        strip.render(target)
+
+    return run
+
+
+LOD_LEDS = 100_000
+
+
+@benchmark(f"lod.new_frame_{LOD_LEDS}")
+def bench_lod_new_frame(ctx: BenchContext):
+    from qtpy.QtGui import QImage
+
+    from strip_view import StripView
+
+    frames = [np.random.default_rng(seed).integers(0, 256, (LOD_LEDS, 3), dtype=np.uint8) for seed in range(2)]
+    view = StripView()
+    view.resize(800, 32)
+    target = QImage(800, 32, QImage.Format.Format_RGB32)
+    index = 0
+
+    def run():
+        # every frame rebuilds the pyramid levels the full view needs
+        nonlocal index
+        view.set_frame(frames[index % 2])
+        view.render(target)
+        index += 1
+
+    return run
+
+
+@benchmark(f"lod.zoom_pan_{LOD_LEDS}")
+def bench_lod_zoom_pan(ctx: BenchContext):
+    from qtpy.QtGui import QImage
+
+    from strip_view import StripView
+
+    view = StripView()
+    view.resize(800, 32)
+    view.set_frame(np.random.default_rng(0).integers(0, 256, (LOD_LEDS, 3), dtype=np.uint8))
+    target = QImage(800, 32, QImage.Format.Format_RGB32)
+    index = 0
+
+    def run():
+        # views of one frame only pool the cached levels
+        nonlocal index
+        span = LOD_LEDS / 2 ** (index % 8)
+        start = (index * 997) % (LOD_LEDS - span + 1)
+        view.set_view(start, start + span)
+        view.render(target)
+        index += 1
+
+    return run
+
+
+FRAME_LEDS = 1000
+
+
+def _frame_decode_bench(encoding: int):
+    def setup(ctx: BenchContext):
+        from frames import FRAME_DELTA, FRAME_HEADER, FRAME_RAW, FRAME_RLE, FrameDecoder
+        from frames import encode_delta, encode_raw, encode_rle
+        from preview import PreviewEngine
+
+        engine = PreviewEngine(FRAME_LEDS, seed=0)
+        engine.animation = "Wipe"
+        previous = engine.render(0.0)
+        pixels = engine.render(0.1)
+        payload = {
+            FRAME_RAW: lambda: encode_raw(pixels),
+            FRAME_RLE: lambda: encode_rle(pixels),
+            FRAME_DELTA: lambda: encode_delta(previous, pixels),
+        }[encoding]()
+        body = payload[FRAME_HEADER.size:]
+
+        decoder = FrameDecoder()
+        decoder.submit(encode_raw(previous, 255))
+        seq = 0
+
+        def run():
+            # deltas are only applied in sequence
+            nonlocal seq
+            decoder.submit(FRAME_HEADER.pack(encoding, seq, FRAME_LEDS) + body)
+            seq = (seq + 1) % 256
+
+        return run
+
+    return setup
+
+
+for _name, _encoding in (("raw", 0), ("rle", 1), ("delta", 2)):
+    benchmark(f"frames.decode_{_name}_{FRAME_LEDS}")(_frame_decode_bench(_encoding))
+
+
+@benchmark("mqtt.publish", number=1000)
+def bench_publish(ctx: BenchContext):
+    client = ctx.window.client
+    topic = ctx.window.settings.brightness_topic
+    return lambda: client.publish(topic, "128")
+
+
+@benchmark("mqtt.round_trip_100", number=1)
+def bench_round_trip(ctx: BenchContext):
+    window = ctx.window
+    topic = window.settings.state_topic
+    received = []
+    window.client.inbound.batchReady.connect(
+        lambda batch: received.extend(m for m in batch if m.topic == window.settings.return_state_topic)
+    )
+    window.client.inbound.set_latest_wins([])
+
+    def run():
+        received.clear()
+        for i in range(100):
+            window.client.publish(topic, "ON" if i % 2 else "OFF")
+        if not ctx.wait_for(lambda: len(received) >= 100):
+            raise TimeoutError(f"only {len(received)} of 100 echoes received")
+
+    return run
+
+
+def compare(results: dict, baseline: dict, tolerance: float) -> list[str]:
+    """Compare results against a baseline.
+
+    Args:
+        results (dict): Benchmark results
+        baseline (dict): Saved baseline results
+        tolerance (float): Allowed slowdown as a fraction of the baseline median
+
+    Returns:
+        list[str]: Names of the benchmarks that regressed
+    """
+    regressions = []
+    for name, stats in results.items():
+        base = baseline.get(name)
+        if base is None:
+            continue
+        ratio = stats["median"] / base["median"]
+        stats["baseline_median"] = base["median"]
+        stats["ratio"] = ratio
+        if ratio > 1 + tolerance:
+            regressions.append(name)
+    return regressions
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Headless NeoPixel Animator benchmarks")
+    parser.add_argument("-k", "--filter", default="", help="only run benchmarks containing this text")
+    parser.add_argument("--rounds", type=int, default=5, help="rounds per benchmark")
+    parser.add_argument("--min-time", type=float, default=0.05, help="minimum round time for calibration")
+    parser.add_argument("--json", dest="json_path", help="write results as JSON to this path ('-' for stdout)")
+    parser.add_argument("--save-baseline", help="save results as a baseline to this path")
+    parser.add_argument("--compare", help="compare against a saved baseline, exit 1 on regressions")
+    parser.add_argument("--tolerance", type=float, default=0.25, help="allowed slowdown against the baseline")
+    parser.add_argument("--list", action="store_true", help="list benchmarks and exit")
+    args = parser.parse_args()
+
+    if args.list:
+        print("\n".join(BENCHMARKS))
+        return 0
+
+    logger.remove()
+    logger.add(sys.stderr, level="WARNING")
+
+    ctx = BenchContext()
+    results: dict[str, dict] = {}
+    try:
+        for name, setup in BENCHMARKS.items():
+            if args.filter not in name:
+                continue
+            run = setup(ctx)
+            results[name] = measure(run, setup.number, args.rounds, args.min_time)
+            stats = results[name]
+            # benchmarks may report more than timings, such as memory use
+            stats.update(getattr(run, "metrics", {}))
+            print(
+                f"{name:<36} {stats['median'] * 1e6:>12.2f} us/op  {stats['ops_per_sec']:>12.1f} op/s",
+                file=sys.stderr,
+            )
+            if "rss_growth_per_restart" in stats:
+                print(
+                    f"{'':<36} {stats['rss_start'] / 2**20:>9.1f} -> {stats['rss_end'] / 2**20:.1f} MiB RSS, "
+                    f"{stats['rss_growth_per_restart'] / 1024:.1f} KiB per restart",
+                    file=sys.stderr,
+                )
+    finally:
+        ctx.close()
+
+    regressions = []
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as f:
+            regressions = compare(results, json.load(f)["results"], args.tolerance)
+        for name in regressions:
+            print(f"REGRESSION {name}: {results[name]['ratio']:.2f}x baseline", file=sys.stderr)
+
+    report = {
+        "meta": {
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "python": platform.python_version(),
+            "qt": QT_VERSION,
+            "platform": platform.platform(),
+            "machine": platform.machine(),
+            "qpa": os.environ["QT_QPA_PLATFORM"],
+        },
+        "results": results,
+        "regressions": regressions,
+    }
+    if args.json_path == "-":
+        json.dump(report, sys.stdout, indent=2)
+    elif args.json_path:
+        with open(args.json_path, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+    if args.save_baseline:
+        with open(args.save_baseline, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,243 @@
+import struct
+import threading
+
+import numpy as np
+from qtpy import QtCore
+from loguru import logger
+
+from strip_view import StripView
+
+FRAME_RAW = 0
+FRAME_RLE = 1
+FRAME_DELTA = 2
+
+# encoding, sequence number, number of LEDs
+FRAME_HEADER = struct.Struct(">BBH")
+RLE_RECORD = np.dtype([("count", "u1"), ("rgb", "u1", 3)])
+DELTA_RECORD = np.dtype([("index", ">u2"), ("rgb", "u1", 3)])
+
+KEYFRAME_INTERVAL = 30
+DECODER_RING_SIZE = 3
+
+
+class FrameError(ValueError):
+    pass
+
+
+class FrameEncoder:
+    """
+    Encodes strip frames for the raw frame topic, as a controller would.
+
+    Every frame starts with FRAME_HEADER followed by one of
+        raw:   num_leds packed RGB triplets
+        rle:   RLE_RECORD runs of up to 255 LEDs with the same color
+        delta: DELTA_RECORD entries for the LEDs that changed since the previous frame
+
+    A keyframe (raw or rle, whichever is smaller) is sent every KEYFRAME_INTERVAL frames,
+    the frames in between use the smallest encoding. The sequence number lets a decoder
+    notice a lost frame and wait for the next keyframe instead of applying a delta to the
+    wrong base.
+    """
+
+    def __init__(self, keyframe_interval: int = KEYFRAME_INTERVAL) -> None:
+        self.keyframe_interval = keyframe_interval
+        self.m_previous: np.ndarray | None = None
+        self.m_seq = 0
+        self.m_since_keyframe = 0
+
+    def encode(self, pixels: np.ndarray) -> bytes:
+        """Encode the next frame
+
+        Args:
+            pixels (np.ndarray): (num_leds, 3) uint8 frame
+
+        Returns:
+            bytes: Payload for the raw frame topic
+        """
+        pixels = np.ascontiguousarray(pixels, dtype=np.uint8).reshape(-1, 3)
+        candidates = [encode_raw(pixels, self.m_seq), encode_rle(pixels, self.m_seq)]
+        keyframe = (
+            self.m_previous is None
+            or self.m_previous.shape != pixels.shape
+            or self.m_since_keyframe >= self.keyframe_interval - 1
+        )
+        if keyframe:
+            self.m_since_keyframe = 0
+        else:
+            candidates.append(encode_delta(self.m_previous, pixels, self.m_seq))
+            self.m_since_keyframe += 1
+
+        self.m_previous = pixels.copy()
+        self.m_seq = (self.m_seq + 1) % 256
+        return min(candidates, key=len)
+
+
+def encode_raw(pixels: np.ndarray, seq: int = 0) -> bytes:
+    return FRAME_HEADER.pack(FRAME_RAW, seq, len(pixels)) + pixels.tobytes()
+
+
+def encode_rle(pixels: np.ndarray, seq: int = 0) -> bytes:
+    n = len(pixels)
+    if n == 0:
+        return FRAME_HEADER.pack(FRAME_RLE, seq, 0)
+    changes = np.any(pixels[1:] != pixels[:-1], axis=1)
+    starts = np.flatnonzero(np.concatenate(([True], changes)))
+    lengths = np.diff(np.append(starts, n))
+
+    # runs longer than 255 are split into chunks
+    chunks = (lengths + 254) // 255
+    run = np.repeat(np.arange(len(starts)), chunks)
+    chunk = np.arange(len(run)) - np.repeat(np.cumsum(chunks) - chunks, chunks)
+
+    records = np.empty(len(run), dtype=RLE_RECORD)
+    records["count"] = np.minimum(lengths[run] - chunk * 255, 255)
+    records["rgb"] = pixels[starts[run]]
+    return FRAME_HEADER.pack(FRAME_RLE, seq, n) + records.tobytes()
+
+
+def encode_delta(previous: np.ndarray, pixels: np.ndarray, seq: int = 0) -> bytes:
+    changed = np.flatnonzero(np.any(previous != pixels, axis=1))
+    records = np.empty(len(changed), dtype=DELTA_RECORD)
+    records["index"] = changed
+    records["rgb"] = pixels[changed]
+    return FRAME_HEADER.pack(FRAME_DELTA, seq, len(pixels)) + records.tobytes()
+
+
+class FrameDecoder(QtCore.QObject):
+    """
+    Decodes raw frame topic payloads on the network thread and hands the newest frame to
+    the GUI thread, at most one delivery per event loop pass.
+
+    Raw frames are NumPy views of the payload itself. RLE and delta frames are decoded into
+    a ring of buffers, skipping the buffer the GUI is showing and the one waiting to be
+    delivered, so a delivered frame is never written while it is shown.
+    """
+
+    frameReady = QtCore.Signal(object)
+    _wake = QtCore.Signal()
+
+    def __init__(self, parent=None):
+        super(FrameDecoder, self).__init__(parent)
+
+        self.m_lock = threading.Lock()
+        self.m_ring: list[np.ndarray] = []
+        # frames with their ring slot, None for raw frames
+        self.m_latest: tuple[np.ndarray, int | None] | None = None
+        self.m_displayed_slot: int | None = None
+        self.m_base: np.ndarray | None = None
+        self.m_seq: int | None = None
+
+        self.received = 0
+        self.delivered = 0
+        self.coalesced = 0
+        self.errors = 0
+        self.desyncs = 0
+        self.bytes = 0
+
+        self._wake.connect(self._deliver, QtCore.Qt.ConnectionType.QueuedConnection)
+
+    def metrics(self) -> dict[str, float]:
+        return {
+            "received": self.received,
+            "delivered": self.delivered,
+            "coalesced": self.coalesced,
+            "errors": self.errors,
+            "desyncs": self.desyncs,
+            "bytes": self.bytes,
+            "mean_frame_bytes": self.bytes / self.received if self.received else 0,
+        }
+
+    def reset(self) -> None:
+        with self.m_lock:
+            self.m_base = None
+            self.m_seq = None
+
+    def submit(self, payload: bytes) -> None:
+        """
+        Decode a payload, safe to call from any thread
+        """
+        self.received += 1
+        self.bytes += len(payload)
+        try:
+            frame, slot = self._decode(payload)
+        except FrameError as e:
+            self.errors += 1
+            logger.warning(f"Dropped unreadable frame: {e}")
+            return
+        if frame is None:
+            return
+
+        with self.m_lock:
+            wake = self.m_latest is None
+            if not wake:
+                self.coalesced += 1
+            self.m_latest = (frame, slot)
+        if wake:
+            self._wake.emit()
+
+    def _free_slot(self, num_leds: int) -> int:
+        if not self.m_ring or self.m_ring[0].shape[0] != num_leds:
+            self.m_ring = [np.zeros((num_leds, 3), dtype=np.uint8) for _ in range(DECODER_RING_SIZE)]
+            self.m_displayed_slot = None
+        with self.m_lock:
+            busy = (self.m_latest[1] if self.m_latest else None, self.m_displayed_slot)
+        return next(slot for slot in range(DECODER_RING_SIZE) if slot not in busy)
+
+    def _decode(self, payload: bytes) -> tuple[np.ndarray | None, int | None]:
+        if len(payload) < FRAME_HEADER.size:
+            raise FrameError(f"{len(payload)} byte payload is shorter than the header")
+        encoding, seq, num_leds = FRAME_HEADER.unpack_from(payload)
+        body = memoryview(payload)[FRAME_HEADER.size:]
+        in_order = self.m_seq is not None and seq == (self.m_seq + 1) % 256
+        self.m_seq = seq
+
+        slot = None
+        if encoding == FRAME_RAW:
+            if len(body) != num_leds * 3:
+                raise FrameError(f"raw frame for {num_leds} LEDs has {len(body)} bytes")
+            frame = np.frombuffer(body, dtype=np.uint8).reshape(num_leds, 3)
+        elif encoding == FRAME_RLE:
+            if len(body) % RLE_RECORD.itemsize:
+                raise FrameError("truncated rle frame")
+            records = np.frombuffer(body, dtype=RLE_RECORD)
+            if int(records["count"].sum(dtype=np.int64)) != num_leds:
+                raise FrameError(f"rle runs do not cover {num_leds} LEDs")
+            slot = self._free_slot(num_leds)
+            frame = self.m_ring[slot]
+            frame[:] = np.repeat(records["rgb"], records["count"], axis=0)
+        elif encoding == FRAME_DELTA:
+            if len(body) % DELTA_RECORD.itemsize:
+                raise FrameError("truncated delta frame")
+            if self.m_base is None or self.m_base.shape[0] != num_leds or not in_order:
+                # a frame was lost, wait for the next keyframe
+                self.desyncs += 1
+                self.m_base = None
+                return None, None
+            records = np.frombuffer(body, dtype=DELTA_RECORD)
+            if len(records) and int(records["index"].max()) >= num_leds:
+                raise FrameError(f"delta index out of range for {num_leds} LEDs")
+            slot = self._free_slot(num_leds)
+            frame = self.m_ring[slot]
+            frame[:] = self.m_base
+            frame[records["index"]] = records["rgb"]
+        else:
+            raise FrameError(f"unknown encoding {encoding}")
+
+        self.m_base = frame
+        return frame, slot
+
+    def _deliver(self) -> None:
+        with self.m_lock:
+            latest = self.m_latest
+            self.m_latest = None
+            if latest is None:
+                return
+            frame, self.m_displayed_slot = latest
+        self.delivered += 1
+        self.frameReady.emit(frame)
+
+
+class FrameMirror(StripView):
+    """
+    Shows the frames received from the controller, the delivered array is drawn without copying
+    """
@@ -36,6 +36,7 @@ def generate_topic_config_row(
         setter: Callable[[str], Any],
         getter: Callable[[], str],
         default: str | None = None,
+        commit_on_finish: bool = True,
 ):
     label = QLabel(name)
     label.setObjectName("config_label")
@@ -44,7 +45,11 @@ def generate_topic_config_row(
     if default:
         control.setPlaceholderText(default)
     control.setText(getter())
-    control.textChanged.connect(setter)
+    if commit_on_finish:
+        # committed once editing is done, every change rebinds a topic
+        control.editingFinished.connect(lambda: setter(control.text()))
+    else:
+        control.textChanged.connect(setter)
 
     grid.addWidget(label, vpos, 0)
     grid.addWidget(control, vpos, 1)
@@ -0,0 +1,120 @@
+from collections import OrderedDict
+import os
+import re
+
+from qtpy.QtCore import QSize
+from qtpy.QtGui import QGuiApplication, QIcon, QPixmap
+from loguru import logger
+import qtawesome as _qta
+
+
+class IconCache:
+    """
+    LRU cache of rasterized qtawesome icons, keyed by name, color, size and device pixel ratio.
+
+    Colored icons can also be kept as PNG files in a disk store, so a cold start only
+    loads images instead of rasterizing font glyphs. Icons without a color follow the
+    qtawesome theme, they are never written to disk and are dropped by clear().
+    """
+
+    def __init__(self, max_entries: int = 256, disk_path: str | None = None) -> None:
+        self.max_entries = max_entries
+        self.m_entries: OrderedDict[tuple, tuple[QPixmap, QIcon]] = OrderedDict()
+        self.m_disk_path: str | None = None
+
+        self.hits = 0
+        self.misses = 0
+        self.disk_hits = 0
+        self.evictions = 0
+
+        self.set_disk_path(disk_path)
+
+    def set_disk_path(self, path: str | None) -> None:
+        """
+        Set the directory of the PNG store, None keeps icons in memory only
+        """
+        if path is None:
+            self.m_disk_path = None
+            return
+        # glyphs can change between qtawesome releases
+        self.m_disk_path = os.path.join(path, _qta.__version__)
+        try:
+            os.makedirs(self.m_disk_path, exist_ok=True)
+        except OSError as e:
+            logger.warning(f"Icon disk cache disabled, could not create {self.m_disk_path}: {e}")
+            self.m_disk_path = None
+
+    def pixmap(self, name: str, size: int | QSize, color: str | None = None, dpr: float | None = None) -> QPixmap:
+        return self._entry(name, size, color, dpr)[0]
+
+    def icon(self, name: str, size: int | QSize, color: str | None = None, dpr: float | None = None) -> QIcon:
+        return self._entry(name, size, color, dpr)[1]
+
+    def clear(self) -> None:
+        """
+        Drop the icons without a color, colored icons do not depend on the theme
+        """
+        for key in [key for key in self.m_entries if key[1] is None]:
+            del self.m_entries[key]
+
+    def stats(self) -> dict:
+        return {
+            "entries": len(self.m_entries),
+            "hits": self.hits,
+            "misses": self.misses,
+            "disk_hits": self.disk_hits,
+            "evictions": self.evictions,
+        }
+
+    def _entry(self, name: str, size: int | QSize, color: str | None, dpr: float | None) -> tuple[QPixmap, QIcon]:
+        width, height = (size, size) if isinstance(size, int) else (size.width(), size.height())
+        if dpr is None:
+            screen = QGuiApplication.primaryScreen()
+            dpr = screen.devicePixelRatio() if screen else 1.0
+
+        key = (name, color, width, height, dpr)
+        entry = self.m_entries.get(key)
+        if entry is not None:
+            self.m_entries.move_to_end(key)
+            self.hits += 1
+            return entry
+
+        self.misses += 1
+        pixmap = self._load(key)
+        if pixmap is None:
+            options = {} if color is None else {"color": color}
+            pixmap = _qta.icon(name, **options).pixmap(QSize(round(width * dpr), round(height * dpr)))
+            self._store(key, pixmap)
+        pixmap.setDevicePixelRatio(dpr)
+
+        entry = (pixmap, QIcon(pixmap))
+        self.m_entries[key] = entry
+        if len(self.m_entries) > self.max_entries:
+            self.m_entries.popitem(last=False)
+            self.evictions += 1
+        return entry
+
+    def _file(self, key: tuple) -> str | None:
+        name, color, width, height, dpr = key
+        if self.m_disk_path is None or color is None:
+            return None
+        stem = re.sub(r"[^\w.@-]", "_", f"{name}-{color}-{width}x{height}@{dpr:g}")
+        return os.path.join(self.m_disk_path, f"{stem}.png")
+
+    def _load(self, key: tuple) -> QPixmap | None:
+        path = self._file(key)
+        if path is None or not os.path.exists(path):
+            return None
+        pixmap = QPixmap(path)
+        if pixmap.isNull():
+            return None
+        self.disk_hits += 1
+        return pixmap
+
+    def _store(self, key: tuple, pixmap: QPixmap) -> None:
+        path = self._file(key)
+        if path is not None and not pixmap.save(path, "PNG"):
+            logger.warning(f"Could not write icon cache file {path}")
+
+
+icons = IconCache()
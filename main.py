@@ -4,12 +4,19 @@ DESCRIPTION: Fully featured PyQt GUI for controlling NeoPixelAnimator
 LICENSE: GPLv3
 """
 
+# imported first so the startup profiler also times the imports below
+from profiler import profiler
+
 import dataclasses
 from enum import Enum
+from datetime import datetime
 from functools import partial
 import json
+import math
+import os
 from random import randint
 import sys
+from typing import Any, Callable
 from loguru import logger
 from platform import system
 
@@ -31,27 +38,37 @@ from qtpy.QtWidgets import (
     QToolButton,
     QLineEdit,
     QSpinBox,
+    QDoubleSpinBox,
     QRadioButton,
-    QCheckBox
+    QCheckBox,
+    QSpacerItem,
+    QSizePolicy,
 )
-from qtpy.QtCore import Qt, QSize, QTimer, QUrl
+from qtpy.QtCore import Qt, QSize, QTimer, QUrl, QStandardPaths
 from qtpy.QtGui import QPixmap, QIcon, QFontDatabase, QMouseEvent, QCursor
 from qtpy.QtMultimedia import QSoundEffect
-from qdarktheme import load_stylesheet
 from qtawesome import icon
 from qtawesome import dark as qtadark
 from qtawesome import light as qtalight
 
-from widgets import WarningBar, ColorBlock, LockButton, AnimationWidget
+from widgets import WarningBar, ColorBlock, LockButton, AnimationWidget, LazyStackedWidget
 from gui_generators import generate_animation_config_unavailable, generate_topic_config_row
 from palette import PaletteGrid, PALETTES
-
-from animation_data import AnimationArgs
-from mqtt import MqttClient
+from icon_cache import icons
+from theme import DARK_COLORS, register_fonts, themes
+from preview import PreviewEngine, StripPreview
+from thumbnails import ThumbnailAnimator, sprites
+from frames import FrameDecoder, FrameMirror
+
+from animation_data import AnimationArgs, decode_args
+from args_sync import ArgsSynchronizer
+from mqtt import MqttClient, PublishScheduler, InboundMessage, ReconnectEngine, TopicBindings
 from settings import SettingsManager, CursorSetting
 
 __version__ = "0.2.0"
 
+profiler.phase("module setup")
+
 if system() == "Windows":
     import ctypes
 
@@ -77,12 +94,36 @@ ANIMATION_LIST: dict[str, str] = {
     "Random Color": "RandomColor",
 }
 
+ANIMATION_NAMES: dict[str, str] = {value: key for key, value in ANIMATION_LIST.items()}
+
 M_CONNECTION_WIDGET_INDEX = 0
 M_CONTROL_WIDGET_INDEX = 1
 M_ABOUT_PAGE_INDEX = 2
 M_SETTINGS_PAGE_INDEX = 3
 M_ANIM_CONF_INDEX = 4
 
+PAGE_WARM_UP_DELAY = 1000
+
+# topics answered by the controller, a rebound one is re-requested with a full data request
+RETURN_TOPICS: set[str] = {
+    "mqtt/topics/return_state_topic",
+    "mqtt/topics/return_brightness_topic",
+    "mqtt/topics/return_anim_topic",
+    "mqtt/topics/return_data_request_topic",
+}
+FRAME_TOPIC = "mqtt/topics/frame_topic"
+
+# FireworkArgs field, label, slider range and the divisor from slider steps to the value
+FIREWORK_SLIDERS: list[tuple[str, str, int, int, int]] = [
+    ("num_sparks", "Sparks", 10, 300, 1),
+    ("gravity", "Gravity", -200, -5, 10000),
+    ("brightness_decay", "Flare Decay", 900, 999, 1000),
+    ("c1", "White Heat", 2, 254, 1),
+    ("flare_min_vel", "Min Velocity", 10, 150, 100),
+    ("c2", "Yellow Heat", 1, 253, 1),
+    ("flare_max_vel", "Max Velocity", 10, 150, 100),
+]
+
 A_UNKNOWN_INDEX = 0
 A_SINGLE_COLOR_INDEX = 1
 A_RAINBOW_INDEX = 2
@@ -142,14 +183,38 @@ def hex_to_rgb(hexa: str) -> tuple:
     return tuple(int(hexa[i: i + 2], 16) for i in (0, 2, 4))
 
 
-def dict_to_dataclass(data_dict, dataclass_type):
-    # Recursively convert nested dictionaries to dataclasses
-    for field in dataclasses.fields(dataclass_type):
-        field_name = field.name
-        if hasattr(field.type, "__annotations__") and field_name in data_dict:
-            data_dict[field_name] = dict_to_dataclass(data_dict[field_name], field.type)
+def parse_data_response(payload: str) -> dict:
+    """Parse a data request response, including the nested args
 
-    return dataclass_type(**data_dict)
+    Args:
+        payload (str): JSON response from the controller
+
+    Returns:
+        dict: Response with "args" decoded to AnimationArgs, or without "args" if they are invalid
+    """
+    data = json.loads(payload)
+    if "args" in data:
+        # bad args must not cost the state, brightness and animation of the same response
+        try:
+            data["args"] = decode_args(json.loads(data["args"]))
+        except (ValueError, TypeError) as e:
+            logger.warning(f"Ignored invalid args from the controller: {e}")
+            del data["args"]
+    return data
+
+
+def app_data_path(filename: str) -> str:
+    """Get the path of a file in the writable application data directory
+
+    Args:
+        filename (str): File name
+
+    Returns:
+        str: Absolute path, the directory is created if needed
+    """
+    directory = QStandardPaths.writableLocation(QStandardPaths.StandardLocation.AppDataLocation)
+    os.makedirs(directory, exist_ok=True)
+    return os.path.join(directory, filename)
 
 
 def map_range(inp: float, in_min: float, in_max: float, out_min: float, out_max: float):
@@ -173,29 +238,74 @@ class MainWindow(QMainWindow):
         super().__init__()
 
         # Settings Manager
+        profiler.phase("settings")
         self.settings = SettingsManager()
+        self.settings.settingChanged.connect(self.on_setting_changed)
+
+        # Icons
+        icons.set_disk_path(app_data_path("icons"))
+        themes.set_cache_dir(app_data_path("themes"))
+        sprites.set_cache_dir(app_data_path("thumbnails"))
 
         # Theme
+        profiler.phase("theme")
         self.set_custom_theming(self.settings.custom_theming)
 
         # Mqtt Client
+        profiler.phase("mqtt client")
         self.client = MqttClient()
         self.client.hostname = self.settings.mqtt_host
         self.client.port = self.settings.mqtt_port
 
         self.client.connected.connect(self.on_client_connect)
-        self.client.messageSignal.connect(self.on_client_message)
+        # frames sent by the controller are decoded on the network thread
+        self.frame_decoder = FrameDecoder(parent=self)
+        # subscriptions follow their topic settings and are renewed on every connect
+        self.topics = TopicBindings(self.client, parent=self)
+        for key, topic in self.settings.snapshot().items():
+            if key.startswith("mqtt/topics/"):
+                self.topics.bind(key, topic, subscribe=key in RETURN_TOPICS)
+        self.topics.set_subscribed(FRAME_TOPIC, self.settings.frame_mirror)
+        self.topics.rebound.connect(self.on_topic_rebound)
+        self.rebuild_message_handlers()
+        self.client.inbound.batchReady.connect(self.on_client_messages)
+
+        self.client.correlate_commands = self.settings.latency_correlation
+        self.client.offline.enabled = self.settings.offline_queue
+        self.client.offline.max_age = self.settings.offline_queue_expiry
+        if self.settings.offline_queue_persist:
+            self.client.offline.set_path(app_data_path("offline_queue.log"))
+
+        self.publisher = PublishScheduler(self.client, self.settings.max_publish_rate)
+
+        self.args_sync = ArgsSynchronizer()
+        self.args_sync.argsChanged.connect(self.on_args_changed)
+        self.args_sync.resyncRequested.connect(self.request_args)
+        self.client.published.connect(self.args_sync.on_published)
+
+        self.reconnect = ReconnectEngine(
+            self.client,
+            self.settings.reconnect_min_delay,
+            self.settings.reconnect_max_delay,
+            self.settings.reconnect_jitter,
+            parent=self,
+        )
 
-        self.connection_attempts = 1
+        # settings used at startup, restart() applies whatever differs from these
+        self.applied_settings = self.settings.snapshot()
 
         # Led State
         self.led_powered = PowerStates.UNKNOWN
+        self.state_request_pending = False
         self.brightness_value = 0
         self.brightness_known = BrightnessStates.UNKNOWN
-        self.animation_args = AnimationArgs()
+        self.animation_args = self.args_sync.args
         self.num_leds = 100
+        self.preview_engine = PreviewEngine(self.num_leds)
+        self.preview_engine.args = self.animation_args
 
         # SFX
+        profiler.phase("sound effects")
         self.sfx = QSoundEffect()
         self.sfx.setSource(QUrl.fromLocalFile("assets/sounds/click.wav"))
         self.sfx.setVolume(self.settings.sfx_volume)
@@ -203,6 +313,7 @@ class MainWindow(QMainWindow):
         self.setWindowTitle("NeoPixel Animator Client")
         self.setWindowIcon(QIcon("assets/icons/icon-128.svg"))
 
+        profiler.phase("control page")
         self.root_widget = QStackedWidget()
         self.setCentralWidget(self.root_widget)
 
@@ -224,22 +335,26 @@ class MainWindow(QMainWindow):
         self.connection_label.setAlignment(Qt.AlignmentFlag.AlignCenter)
         self.connection_layout.addWidget(self.connection_label)
 
-        self.connection_attempts_label = QLabel(
-            f"Connection Attempts: {self.connection_attempts}"
-        )
+        self.connection_attempts_label = QLabel("Connection Attempts: 0")
         self.connection_attempts_label.setObjectName("h3")
         self.connection_attempts_label.setAlignment(Qt.AlignmentFlag.AlignCenter)
         self.connection_layout.addWidget(self.connection_attempts_label)
 
+        self.connection_telemetry_label = QLabel()
+        self.connection_telemetry_label.setObjectName("h4")
+        self.connection_telemetry_label.setAlignment(Qt.AlignmentFlag.AlignCenter)
+        self.connection_layout.addWidget(self.connection_telemetry_label)
+
         self.connection_settings_button = QPushButton("Access Settings")
         self.connection_settings_button.clicked.connect(self.show_settings)
         self.connection_layout.addWidget(self.connection_settings_button)
 
-        self.connection_timer = QTimer(self)
-        self.connection_timer.setInterval(1000)
-        self.connection_timer.timeout.connect(self.check_mqtt_connection)
-        self.connection_timer.start()
-        self.check_mqtt_connection()
+        self.client.stateChanged.connect(self.on_client_state_changed)
+        self.reconnect.telemetryChanged.connect(self.update_connection_telemetry)
+        # counts the retry delay down while a retry is scheduled
+        self.connection_countdown = QTimer(self)
+        self.connection_countdown.setInterval(1000)
+        self.connection_countdown.timeout.connect(self.update_connection_telemetry)
 
         # Control
         self.control_widget = QWidget()
@@ -253,11 +368,10 @@ class MainWindow(QMainWindow):
 
         self.control_title = QLabel(self.settings.app_title)
         self.control_title.setObjectName("h2")
-        self.control_title.setFixedWidth(self.control_title.minimumSizeHint().width())
 
         self.control_power = QPushButton()
         self.control_power.setFlat(True)
-        self.control_power.setIcon(icon("mdi6.power", color="#9EA7AA"))
+        self.control_power.setIcon(icons.icon("mdi6.power", 72, color="#9EA7AA"))
         self.control_power.setIconSize(QSize(72, 72))
         self.control_power.setFixedSize(QSize(72, 72))
         self.control_power.clicked.connect(self.toggle_led_power)
@@ -284,15 +398,12 @@ class MainWindow(QMainWindow):
         self.control_top_bar.addWidget(self.control_title)
         self.control_top_bar.addStretch()
         self.control_top_bar.addWidget(self.control_power)
-        # this is to evenly center the power control
-        # gets size of title widget and subtracts width of about and settings buttons
-        # accounts for layout spacing and paddings
-        # results in a perfectly centered power control
-        self.control_top_bar.addSpacing((self.control_title.width() - (
-                    self.control_about.width() + self.control_settings.width() + (self.control_top_bar.spacing() * 2))))
+        self.control_title_spacer = QSpacerItem(0, 0, QSizePolicy.Policy.Fixed, QSizePolicy.Policy.Minimum)
+        self.control_top_bar.addItem(self.control_title_spacer)
         self.control_top_bar.addStretch()
         self.control_top_bar.addWidget(self.control_about)
         self.control_top_bar.addWidget(self.control_settings)
+        self.update_title_layout()
 
         self.control_brightness_box = QGroupBox("Brightness")
         self.control_layout.addWidget(self.control_brightness_box)
@@ -302,7 +413,7 @@ class MainWindow(QMainWindow):
 
         self.control_brightness_warning = QLabel()
         self.control_brightness_warning.setPixmap(
-            icon("mdi6.alert", color="#FDD835").pixmap(QSize(24, 24))
+            icons.pixmap("mdi6.alert", 24, color="#FDD835")
         )
         self.control_brightness_warning.setToolTip("Brightness data may be inaccurate")
         self.control_brightness_layout.addWidget(self.control_brightness_warning)
@@ -311,6 +422,7 @@ class MainWindow(QMainWindow):
         self.control_brightness_slider.setObjectName("big_slider")
         self.control_brightness_slider.setRange(1, 255)
         self.control_brightness_slider.valueChanged.connect(self.update_brightness)
+        self.control_brightness_slider.sliderReleased.connect(self.publisher.flush)
         self.control_brightness_layout.addWidget(self.control_brightness_slider)
 
         self.current_animation = QLabel("Current Animation: Unknown")
@@ -338,10 +450,15 @@ class MainWindow(QMainWindow):
         self.control_animator_layout = QGridLayout()
         self.control_animator_widget.setLayout(self.control_animator_layout)
 
+        # one timer plays the previews of every tile
+        self.thumbnails = ThumbnailAnimator(parent=self)
+        self.thumbnails.args = self.animation_args
+
         self.control_animation_list = []
         for idx, key in enumerate(ANIMATION_LIST.keys()):
             widget = AnimationWidget(self.sfx, key)
             widget.clicked.connect(partial(self.set_animation, key))
+            self.thumbnails.add(ANIMATION_LIST[key], widget.thumbnail)
             self.control_animation_list.append(widget)
             self.control_animator_layout.addWidget(widget, idx % 2, idx // 2)
 
@@ -365,6 +482,7 @@ class MainWindow(QMainWindow):
         self.animation_sidebar_layout.addWidget(self.animation_settings)
 
         # About
+        profiler.phase("about page")
         self.about_widget = QWidget()
         self.root_widget.insertWidget(M_ABOUT_PAGE_INDEX, self.about_widget)
 
@@ -424,9 +542,16 @@ class MainWindow(QMainWindow):
             self.about_qt_button, Qt.AlignmentFlag.AlignCenter
         )
 
+        self.about_startup = QLabel()
+        self.about_startup.setObjectName("startup_timeline")
+        self.about_startup.setFont(QFontDatabase.systemFont(QFontDatabase.SystemFont.FixedFont))
+        self.about_startup.setVisible(profiler.enabled)
+        self.about_right_layout.addWidget(self.about_startup)
+
         self.about_right_layout.addStretch()
 
         # Animation Conf
+        profiler.phase("animation config")
         self.anim_conf_widget = QWidget()
         self.root_widget.insertWidget(M_ANIM_CONF_INDEX, self.anim_conf_widget)
 
@@ -453,7 +578,15 @@ class MainWindow(QMainWindow):
 
         self.anim_conf_top_bar.addStretch()
 
-        self.anim_config_stack = QStackedWidget()
+        self.anim_conf_preview = StripPreview(self.preview_engine)
+        self.anim_conf_layout.addWidget(self.anim_conf_preview)
+
+        self.anim_conf_mirror = FrameMirror()
+        self.anim_conf_mirror.setVisible(self.settings.frame_mirror)
+        self.frame_decoder.frameReady.connect(self.anim_conf_mirror.set_frame)
+        self.anim_conf_layout.addWidget(self.anim_conf_mirror)
+
+        self.anim_config_stack = LazyStackedWidget()
         self.anim_conf_layout.addWidget(self.anim_config_stack)
 
         self.unknown_anim_widget = QWidget()
@@ -478,20 +611,440 @@ class MainWindow(QMainWindow):
 
         self.unknown_anim_layout.addStretch()
 
-        self.anim_single_color_widget = QWidget()
-        self.anim_config_stack.insertWidget(
-            A_SINGLE_COLOR_INDEX, self.anim_single_color_widget
+        # config pages are built the first time they are shown
+        for index, factory in (
+            (A_SINGLE_COLOR_INDEX, self.generate_single_color_config_page),
+            (A_RAINBOW_INDEX, generate_animation_config_unavailable),
+            (A_GLITTER_RAINBOW_INDEX, self.generate_glitter_rainbow_config_page),
+            (A_COLORLOOP_INDEX, generate_animation_config_unavailable),
+            (A_MAGIC_INDEX, generate_animation_config_unavailable),
+            (A_FIRE_INDEX, generate_animation_config_unavailable),
+            (A_COLORED_LIGHTS_INDEX, generate_animation_config_unavailable),
+            (A_FADE_INDEX, self.generate_fade_config_page),
+            (A_FLASH_INDEX, self.generate_flash_config_page),
+            (A_WIPE_INDEX, self.generate_wipe_config_page),
+            (A_FIREWORK_INDEX, self.generate_firework_config_page),
+            (A_RANDOM_INDEX, self.generate_random_config_page),
+            (A_RANDOM_COLOR_INDEX, generate_animation_config_unavailable),
+        ):
+            self.anim_config_stack.insert_page(index, factory)
+        self.anim_config_stack.pageCreated.connect(lambda: self.on_args_changed(self.animation_args))
+
+        # Application settings
+        profiler.phase("settings pages")
+        self.settings_widget = QWidget()
+        self.root_widget.insertWidget(M_SETTINGS_PAGE_INDEX, self.settings_widget)
+
+        self.settings_root_layout = QVBoxLayout()
+        self.settings_widget.setLayout(self.settings_root_layout)
+
+        self.settings_top_bar = QHBoxLayout()
+        self.settings_root_layout.addLayout(self.settings_top_bar)
+
+        self.settings_back = QPushButton()
+        self.settings_back.setFlat(True)
+        self.settings_back.setIcon(icon("mdi6.arrow-left-box"))
+        self.settings_back.setIconSize(QSize(48, 48))
+        self.settings_back.clicked.connect(
+            lambda: self.root_widget.setCurrentIndex(M_CONTROL_WIDGET_INDEX)
+        )
+        self.settings_back.clicked.connect(self.sfx.play)
+
+        self.settings_restart = QPushButton()
+        self.settings_restart.setFlat(True)
+        self.settings_restart.setIcon(icon("mdi6.restart"))
+        self.settings_restart.setIconSize(QSize(48, 48))
+        self.settings_restart.clicked.connect(self.restart)
+
+        self.settings_lock = LockButton()
+        self.settings_lock.set_warning_text(
+            "Changing these settings may result in the system to stop functioning. Do you want to unlock the settings?")
+        self.settings_lock.locked.connect(self.lock_settings)
+        self.settings_lock.unlocked.connect(self.unlock_settings)
+
+        self.settings_top_bar.addWidget(self.settings_back)
+        self.settings_top_bar.addStretch()
+        self.settings_top_bar.addWidget(self.settings_restart)
+        self.settings_top_bar.addStretch()
+        self.settings_top_bar.addWidget(self.settings_lock)
+
+        self.settings_side_by_side = QHBoxLayout()
+        self.settings_root_layout.addLayout(self.settings_side_by_side)
+
+        self.settings_sidebar_widget = QFrame()
+        self.settings_side_by_side.addWidget(self.settings_sidebar_widget)
+
+        self.settings_sidebar_layout = QVBoxLayout()
+        self.settings_sidebar_widget.setLayout(self.settings_sidebar_layout)
+
+        self.settings_sidebar_items: list[QToolButton] = []
+
+        self.settings_pages = LazyStackedWidget()
+        self.settings_pages.setEnabled(False)
+        self.settings_side_by_side.addWidget(self.settings_pages)
+
+        self.add_setting_sidebar_item(
+            "MQTT Server",
+            "mdi6.server-network",
+            self.generate_mqtt_server_config_page,
+        )
+        self.add_setting_sidebar_item(
+            "MQTT Topics",
+            "mdi6.slash-forward-box",
+            self.generate_mqtt_topics_config_page,
+        )
+        self.add_setting_sidebar_item(
+            "Application Style",
+            "mdi6.application-variable",
+            self.generate_gui_config_page,
+        )
+        self.add_setting_sidebar_item(
+            "Diagnostics",
+            "mdi6.chart-bell-curve",
+            self.generate_diagnostics_page,
+        )
+
+        profiler.phase("connect")
+        self.reconnect.start()
+
+        profiler.phase("show")
+        self.set_cursor()
+        if self.settings.fullscreen:
+            self.showFullScreen()
+        else:
+            self.show()
+        profiler.end()
+
+        # compiled once per install, later theme switches only apply the cached result
+        QTimer.singleShot(PAGE_WARM_UP_DELAY, self.precompile_themes)
+
+        if self.settings.warm_up_pages:
+            # let the first frame paint before building the remaining pages
+            self.anim_config_stack.warm_up(PAGE_WARM_UP_DELAY)
+            self.settings_pages.warm_up(PAGE_WARM_UP_DELAY)
+
+    def on_client_state_changed(self, state: int) -> None:
+        if state == MqttClient.Connected:
+            if self.root_widget.currentIndex() not in [
+                M_ABOUT_PAGE_INDEX,
+                M_ANIM_CONF_INDEX,
+                M_SETTINGS_PAGE_INDEX,
+            ]:
+                self.root_widget.setCurrentIndex(M_CONTROL_WIDGET_INDEX)
+        elif state == MqttClient.Connecting:
+            if self.root_widget.currentIndex() not in [
+                M_ABOUT_PAGE_INDEX,
+                M_SETTINGS_PAGE_INDEX,
+            ]:
+                self.root_widget.setCurrentIndex(M_CONNECTION_WIDGET_INDEX)
+        else:
+            self.root_widget.setCurrentIndex(M_CONNECTION_WIDGET_INDEX)
+        self.update_connection_telemetry()
+
+    def update_connection_telemetry(self) -> None:
+        telemetry = self.reconnect.telemetry()
+
+        if self.client.state == MqttClient.ConnectError:
+            self.connection_attempts_label.setText(
+                f"Connection Failed: {self.client.last_error}"
+            )
+        else:
+            self.connection_attempts_label.setText(
+                f"Connection Attempts: {telemetry['attempts']}"
+            )
+
+        details = []
+        if telemetry["next_retry_in"] is not None:
+            details.append(f"Retrying in {math.ceil(telemetry['next_retry_in'])} s")
+            if not self.connection_countdown.isActive():
+                self.connection_countdown.start()
+        else:
+            self.connection_countdown.stop()
+        if telemetry["last_time_to_connect"] is not None:
+            details.append(f"Last connection took {telemetry['last_time_to_connect']:.2f} s")
+        if telemetry["disconnect_reasons"]:
+            when, reason = telemetry["disconnect_reasons"][-1]
+            details.append(f"Last disconnect at {when}: {reason}")
+        details.append(f"Total attempts: {telemetry['total_attempts']}")
+        self.connection_telemetry_label.setText("\n".join(details))
+
+    def on_client_connect(self) -> None:
+        profiler.milestone("mqtt connected")
+        if self.settings.frame_mirror:
+            self.frame_decoder.reset()
+        self.client.publish(self.settings.data_request_topic, "request_type_full")
+        self.args_sync.request_sent()
+
+    def rebuild_message_handlers(self) -> None:
+        self.message_handlers: dict[str, Callable[[str, Any], None]] = {
+            self.settings.return_state_topic: self.on_state_message,
+            self.settings.return_brightness_topic: self.on_brightness_message,
+            self.settings.return_anim_topic: self.on_animation_message,
+            self.settings.return_data_request_topic: self.on_data_message,
+        }
+        self.client.inbound.set_parsers({self.settings.return_data_request_topic: parse_data_response})
+        self.client.set_raw_handlers(
+            {self.settings.frame_topic: self.frame_decoder.submit} if self.settings.frame_mirror else {}
+        )
+        self.client.inbound.set_latest_wins({
+            self.settings.return_state_topic,
+            self.settings.return_brightness_topic,
+            self.settings.return_anim_topic,
+        })
+        self.client.latency.set_pairs({
+            self.settings.state_topic: (self.settings.return_state_topic, True),
+            self.settings.brightness_topic: (self.settings.return_brightness_topic, True),
+            self.settings.animation_topic: (self.settings.return_anim_topic, True),
+            self.settings.data_request_topic: (self.settings.return_data_request_topic, True),
+            # args are not answered directly, only a correlated response can be matched
+            self.settings.args_topic: (self.settings.return_data_request_topic, False),
+        })
+
+    def on_setting_changed(self, key: str, value: object) -> None:
+        if key.startswith("mqtt/topics/"):
+            self.topics.rebind(key, value)
+        elif key == "mqtt/reconnect_min_delay":
+            self.reconnect.min_delay = value
+        elif key == "mqtt/reconnect_max_delay":
+            self.reconnect.max_delay = value
+        elif key == "mqtt/reconnect_jitter":
+            self.reconnect.jitter = value
+        elif key == "mqtt/offline_queue":
+            self.client.offline.enabled = value
+        elif key == "mqtt/offline_queue_expiry":
+            self.client.offline.max_age = value
+        elif key == "mqtt/frame_mirror":
+            self.rebuild_message_handlers()
+            self.anim_conf_mirror.setVisible(value)
+            if value:
+                self.frame_decoder.reset()
+            self.topics.set_subscribed(FRAME_TOPIC, value)
+        elif key == "mqtt/offline_queue_persist":
+            self.client.offline.set_path(app_data_path("offline_queue.log") if value else None)
+        elif key == "mqtt/latency_correlation":
+            self.client.correlate_commands = value
+
+    def on_topic_rebound(self, key: str, _old: str, _new: str) -> None:
+        self.rebuild_message_handlers()
+        if key == FRAME_TOPIC:
+            self.frame_decoder.reset()
+        elif key == "mqtt/topics/return_state_topic":
+            self.led_powered = PowerStates.UNKNOWN
+            self.control_power.setIcon(icons.icon("mdi6.power", 72, color="#9EA7AA"))
+        elif key == "mqtt/topics/return_brightness_topic":
+            self.brightness_known = BrightnessStates.UNKNOWN
+            self.control_brightness_warning.setPixmap(
+                icons.pixmap("mdi6.alert", 24, color="#FDD835")
+            )
+        elif key == "mqtt/topics/return_anim_topic":
+            self.current_animation.setText("Current Animation: Unknown")
+
+        # the controller only answers full and args requests, so every rebound return topic
+        # needs the full state, several edits in one pass share a single request
+        if key in RETURN_TOPICS and not self.state_request_pending:
+            self.state_request_pending = True
+            QTimer.singleShot(0, self.request_state)
+
+    def request_state(self) -> None:
+        self.state_request_pending = False
+        self.publisher.flush()
+        self.client.publish(self.settings.data_request_topic, "request_type_full", queue_offline=False)
+        self.args_sync.request_sent()
+
+    def on_client_messages(self, batch: list[InboundMessage]) -> None:
+        for message in batch:
+            handler = self.message_handlers.get(message.topic)
+            if handler:
+                handler(message.payload, message.data)
+
+    def on_state_message(self, payload: str, _data: Any = None) -> None:
+        self.preview_engine.powered = payload == "ON"
+        if payload == "ON":
+            self.led_powered = PowerStates.ON
+            self.control_power.setIcon(icons.icon("mdi6.power", 72, color="#66BB6A"))
+        else:
+            self.led_powered = PowerStates.OFF
+            self.control_power.setIcon(icons.icon("mdi6.power", 72, color="#F44336"))
+
+    def on_brightness_message(self, payload: str, _data: Any = None) -> None:
+        self.brightness_known = BrightnessStates.KNOWN
+        self.brightness_value = int(payload)
+        self.preview_engine.brightness = self.brightness_value
+        self.control_brightness_warning.setPixmap(
+            icons.pixmap("mdi6.check-circle", 24, color="#66BB6A")
+        )
+
+    def on_animation_message(self, payload: str, _data: Any = None) -> None:
+        self.preview_engine.animation = payload
+        if payload in ANIMATION_NAMES:
+            animation_name = ANIMATION_NAMES[payload]
+            self.animation_sidebar_frame.setEnabled(True)
+            self.update_animation_page(payload)
+        else:
+            animation_name = "Unknown"
+        self.current_animation.setText(f"Current Animation: {animation_name}")
+
+    def on_data_message(self, payload: str, data: dict | None = None) -> None:
+        if data is None:
+            try:
+                data = parse_data_response(payload)
+            except json.JSONDecodeError:
+                # TODO: Handle this!
+                return
+
+        if "state" in data:
+            self.on_state_message(data["state"])
+
+        if "animation" in data:
+            self.on_animation_message(data["animation"])
+
+        if "brightness" in data:
+            self.control_brightness_slider.setValue(data["brightness"])
+            self.preview_engine.brightness = data["brightness"]
+            self.brightness_known = BrightnessStates.KNOWN
+            self.control_brightness_warning.setPixmap(
+                icons.pixmap("mdi6.check-circle", 24, color="#66BB6A")
+            )
+
+        if "args" in data:
+            self.args_sync.on_snapshot(data["args"])
+
+        if "num_leds" in data:
+            self.num_leds = data["num_leds"]
+            self.anim_conf_preview.set_num_leds(self.num_leds)
+            if self.anim_config_stack.is_created(A_FIREWORK_INDEX):
+                self.anim_firework_preview.set_num_leds(self.num_leds)
+
+        if "state" in data and profiler.milestone("first full state"):
+            self.save_startup_timeline()
+
+    def paintEvent(self, event):
+        super().paintEvent(event)
+        if profiler.milestone("first paint"):
+            self.save_startup_timeline()
+
+    def save_startup_timeline(self) -> None:
+        profiler.write(app_data_path("startup-timeline.json"))
+        self.about_startup.setText(profiler.report())
+
+    def toggle_led_power(self) -> None:
+        if self.led_powered == PowerStates.ON:
+            self.led_powered = PowerStates.UNKNOWN
+            self.control_power.setIcon(icons.icon("mdi6.power", 72, color="#9EA7AA"))
+            self.client.publish(self.settings.state_topic, "OFF")
+        elif self.led_powered == PowerStates.OFF:
+            self.led_powered = PowerStates.UNKNOWN
+            self.control_power.setIcon(icons.icon("mdi6.power", 72, color="#9EA7AA"))
+            self.client.publish(self.settings.state_topic, "ON")
+        else:
+            self.led_powered = PowerStates.UNKNOWN
+            self.control_power.setIcon(icons.icon("mdi6.power", 72, color="#9EA7AA"))
+            self.client.publish(self.settings.state_topic, "OFF")
+
+    def update_brightness(self) -> None:
+        self.brightness_known = BrightnessStates.UNKNOWN
+        self.control_brightness_warning.setPixmap(
+            icons.pixmap("mdi6.alert", 24, color="#FDD835")
+        )
+        self.publisher.schedule(self.settings.brightness_topic, self.control_brightness_slider.value())
+
+    def set_animation(self, anim_name: str) -> None:
+        self.animation_sidebar_frame.setEnabled(False)
+        self.client.publish(self.settings.animation_topic, ANIMATION_LIST[anim_name])
+
+    def show_about(self) -> None:
+        self.root_widget.setCurrentIndex(M_ABOUT_PAGE_INDEX)
+
+    def show_settings(self) -> None:
+        self.root_widget.setCurrentIndex(M_SETTINGS_PAGE_INDEX)
+        if not self.settings_pages.isEnabled():
+            self.settings_lock.flash_outline()
+
+    def anim_conf(self) -> None:
+        self.root_widget.setCurrentIndex(M_ANIM_CONF_INDEX)
+
+    def update_animation_page(self, animation: str) -> None:
+        if animation in ANIMATION_CONF_INDEXES:
+            self.anim_config_stack.setCurrentIndex(ANIMATION_CONF_INDEXES[animation])
+        else:
+            self.anim_config_stack.setCurrentIndex(A_UNKNOWN_INDEX)
+
+    def send_args(self, section: str, values: dict) -> None:
+        # applied locally right away, the controller is only asked for args if it goes quiet
+        seq = self.args_sync.apply_local(section, values)
+        self.publisher.schedule(
+            self.settings.args_topic,
+            f"{section},{json.dumps(values)}",
+            f"{self.settings.args_topic}/{section}.{','.join(values)}",
+            seq=seq,
         )
 
+    def request_args(self) -> None:
+        self.publisher.flush()
+        self.client.publish(self.settings.data_request_topic, "request_type_args", queue_offline=False)
+        self.args_sync.request_sent()
+
+    def on_args_changed(self, args: AnimationArgs) -> None:
+        self.animation_args = args
+        self.preview_engine.args = args
+        self.thumbnails.set_args(args)
+
+        # pages that were not shown yet get these args when they are built
+        stack = self.anim_config_stack
+        sliders = []
+        if stack.is_created(A_SINGLE_COLOR_INDEX):
+            self.anim_single_color_current.set_rgb(args.single_color.color)
+        if stack.is_created(A_RANDOM_INDEX):
+            self.anim_random_current.set_rgb(args.random.color)
+        if stack.is_created(A_FADE_INDEX):
+            self.anim_fade_current_a.set_rgb(args.fade.colora)
+            self.anim_fade_current_b.set_rgb(args.fade.colorb)
+        if stack.is_created(A_FLASH_INDEX):
+            self.anim_flash_current_a.set_rgb(args.flash.colora)
+            self.anim_flash_current_b.set_rgb(args.flash.colorb)
+            sliders.append((self.anim_flash_speed, round(args.flash.speed)))
+        if stack.is_created(A_WIPE_INDEX):
+            self.anim_wipe_current_a.set_rgb(args.wipe.colora)
+            self.anim_wipe_current_b.set_rgb(args.wipe.colorb)
+            sliders.append((self.anim_wipe_speed, args.wipe.leds_iter))
+        if stack.is_created(A_GLITTER_RAINBOW_INDEX):
+            sliders.append((self.anim_grainbow_ratio, round(args.glitter_rainbow.glitter_ratio * 100)))
+        if stack.is_created(A_FIREWORK_INDEX) and not self.anim_firework_modified:
+            # local edits are kept until they are applied or reset
+            self.reset_firework_draft()
+
+        for slider, value in sliders:
+            if not slider.isSliderDown() and slider.value() != value:
+                slider.blockSignals(True)
+                slider.setValue(value)
+                slider.blockSignals(False)
+
+    def add_setting_sidebar_item(self, title: str, qta_icon: str, factory: Callable[[], QWidget | QFrame]):
+        i: int = len(self.settings_sidebar_items)
+
+        button = QToolButton()
+        button.setObjectName("sidebar_button")
+        button.setText(title)
+        button.setIcon(icon(qta_icon))
+        button.setIconSize(QSize(24, 24))
+        button.setFixedWidth(180)
+        button.setToolButtonStyle(Qt.ToolButtonStyle.ToolButtonTextBesideIcon)
+        self.settings_sidebar_items.append(button)
+        self.settings_sidebar_layout.addWidget(button)
+
+        self.settings_pages.insert_page(i, factory)
+        button.clicked.connect(lambda: self.settings_pages.setCurrentIndex(i))
+        button.clicked.connect(self.sfx.play)
+
+    def generate_single_color_config_page(self) -> QWidget:
+        self.anim_single_color_widget = QWidget()
+
         self.anim_single_color_layout = QHBoxLayout()
         self.anim_single_color_widget.setLayout(self.anim_single_color_layout)
 
         self.anim_single_color_palette = PaletteGrid(PALETTES["kevinbot"], self.sfx, size=56)
         self.anim_single_color_palette.selected.connect(
-            lambda c: self.publish_and_update_args(
-                self.settings.args_topic,
-                f'single_color,{{"color": ' f"{list(hex_to_rgb(c.lstrip('#')))}}}",
-            )
+            lambda c: self.send_args("single_color", {"color": list(hex_to_rgb(c.lstrip("#")))})
         )
         self.anim_single_color_layout.addWidget(self.anim_single_color_palette)
 
@@ -511,17 +1064,10 @@ class MainWindow(QMainWindow):
 
         self.anim_single_color_right_layout.addStretch()
 
-        # Rainbow Conf
-        self.anim_config_stack.insertWidget(
-            A_RAINBOW_INDEX, generate_animation_config_unavailable()
-        )
-
-        # Glitter Rainbow Conf
+        return self.anim_single_color_widget
 
+    def generate_glitter_rainbow_config_page(self) -> QWidget:
         self.anim_grainbow_widget = QWidget()
-        self.anim_config_stack.insertWidget(
-            A_GLITTER_RAINBOW_INDEX, self.anim_grainbow_widget
-        )
 
         self.anim_grainbow_layout = QVBoxLayout()
         self.anim_grainbow_widget.setLayout(self.anim_grainbow_layout)
@@ -536,44 +1082,19 @@ class MainWindow(QMainWindow):
         self.anim_grainbow_ratio.setObjectName("big_slider")
         self.anim_grainbow_ratio.setRange(1, 50)
         self.anim_grainbow_ratio.valueChanged.connect(
-            lambda: self.publish_and_update_args(
-                self.settings.args_topic,
-                f'glitter_rainbow,{{"glitter_ratio": {self.anim_grainbow_ratio.value() / 100}}}',
-            )
-        )
-        self.anim_grainbow_ratio.sliderReleased.connect(
-            lambda: self.publish_and_update_args(
-                self.settings.args_topic,
-                f'glitter_rainbow,{{"glitter_ratio": {self.anim_grainbow_ratio.value() / 100}}}',
+            lambda: self.send_args(
+                "glitter_rainbow", {"glitter_ratio": self.anim_grainbow_ratio.value() / 100}
             )
         )
+        self.anim_grainbow_ratio.sliderReleased.connect(self.publisher.flush)
         self.anim_grainbow_layout.addWidget(self.anim_grainbow_ratio)
 
         self.anim_grainbow_layout.addStretch()
 
-        # Colorloop Conf
-        self.anim_config_stack.insertWidget(
-            A_COLORLOOP_INDEX, generate_animation_config_unavailable()
-        )
-
-        # Magic Conf
-        self.anim_config_stack.insertWidget(
-            A_MAGIC_INDEX, generate_animation_config_unavailable()
-        )
-
-        # Fire Conf
-        self.anim_config_stack.insertWidget(
-            A_FIRE_INDEX, generate_animation_config_unavailable()
-        )
-
-        # Colored Lights Conf
-        self.anim_config_stack.insertWidget(
-            A_COLORED_LIGHTS_INDEX, generate_animation_config_unavailable()
-        )
+        return self.anim_grainbow_widget
 
-        # Fade config
+    def generate_fade_config_page(self) -> QWidget:
         self.anim_fade_widget = QWidget()
-        self.anim_config_stack.insertWidget(A_FADE_INDEX, self.anim_fade_widget)
 
         self.anim_fade_layout = QHBoxLayout()
         self.anim_fade_widget.setLayout(self.anim_fade_layout)
@@ -583,9 +1104,7 @@ class MainWindow(QMainWindow):
 
         self.anim_fade_palette_a = PaletteGrid(PALETTES["kevinbot"], self.sfx, size=56)
         self.anim_fade_palette_a.selected.connect(
-            lambda c: self.publish_and_update_args(
-                self.settings.args_topic, f'fade,{{"colora": ' f"{list(hex_to_rgb(c.lstrip('#')))}}}"
-            )
+            lambda c: self.send_args("fade", {"colora": list(hex_to_rgb(c.lstrip("#")))})
         )
         self.anim_fade_a_layout.addWidget(self.anim_fade_palette_a)
 
@@ -613,9 +1132,7 @@ class MainWindow(QMainWindow):
 
         self.anim_fade_palette_b = PaletteGrid(PALETTES["kevinbot"], self.sfx, size=56)
         self.anim_fade_palette_b.selected.connect(
-            lambda c: self.publish_and_update_args(
-                self.settings.args_topic, f'fade,{{"colorb": ' f"{list(hex_to_rgb(c.lstrip('#')))}}}"
-            )
+            lambda c: self.send_args("fade", {"colorb": list(hex_to_rgb(c.lstrip("#")))})
         )
         self.anim_fade_b_layout.addWidget(self.anim_fade_palette_b)
 
@@ -634,9 +1151,10 @@ class MainWindow(QMainWindow):
 
         self.anim_fade_b_bottom_layout.addStretch()
 
-        # Flash config
+        return self.anim_fade_widget
+
+    def generate_flash_config_page(self) -> QWidget:
         self.anim_flash_widget = QWidget()
-        self.anim_config_stack.insertWidget(A_FLASH_INDEX, self.anim_flash_widget)
 
         self.anim_flash_layout = QHBoxLayout()
         self.anim_flash_widget.setLayout(self.anim_flash_layout)
@@ -646,9 +1164,7 @@ class MainWindow(QMainWindow):
 
         self.anim_flash_palette_a = PaletteGrid(PALETTES["kevinbot"], self.sfx, size=56)
         self.anim_flash_palette_a.selected.connect(
-            lambda c: self.publish_and_update_args(
-                self.settings.args_topic, f'flash,{{"colora": ' f"{list(hex_to_rgb(c.lstrip('#')))}}}"
-            )
+            lambda c: self.send_args("flash", {"colora": list(hex_to_rgb(c.lstrip("#")))})
         )
         self.anim_flash_a_layout.addWidget(self.anim_flash_palette_a)
 
@@ -676,9 +1192,7 @@ class MainWindow(QMainWindow):
 
         self.anim_flash_palette_b = PaletteGrid(PALETTES["kevinbot"], self.sfx, size=56)
         self.anim_flash_palette_b.selected.connect(
-            lambda c: self.publish_and_update_args(
-                self.settings.args_topic, f'flash,{{"colorb": ' f"{list(hex_to_rgb(c.lstrip('#')))}}}"
-            )
+            lambda c: self.send_args("flash", {"colorb": list(hex_to_rgb(c.lstrip("#")))})
         )
         self.anim_flash_b_layout.addWidget(self.anim_flash_palette_b)
 
@@ -701,20 +1215,15 @@ class MainWindow(QMainWindow):
         self.anim_flash_speed.setObjectName("big_slider")
         self.anim_flash_speed.setRange(3, 50)
         self.anim_flash_speed.valueChanged.connect(
-            lambda: self.publish_and_update_args(
-                self.settings.args_topic, f'flash,{{"speed": ' f"{self.anim_flash_speed.value()}}}"
-            )
-        )
-        self.anim_flash_speed.sliderReleased.connect(
-            lambda: self.publish_and_update_args(
-                self.settings.args_topic, f'flash,{{"speed": ' f"{self.anim_flash_speed.value()}}}"
-            )
+            lambda: self.send_args("flash", {"speed": self.anim_flash_speed.value()})
         )
+        self.anim_flash_speed.sliderReleased.connect(self.publisher.flush)
         self.anim_flash_layout.addWidget(self.anim_flash_speed)
 
-        # Wipe config
+        return self.anim_flash_widget
+
+    def generate_wipe_config_page(self) -> QWidget:
         self.anim_wipe_widget = QWidget()
-        self.anim_config_stack.insertWidget(A_WIPE_INDEX, self.anim_wipe_widget)
 
         self.anim_wipe_layout = QHBoxLayout()
         self.anim_wipe_widget.setLayout(self.anim_wipe_layout)
@@ -724,9 +1233,7 @@ class MainWindow(QMainWindow):
 
         self.anim_wipe_palette_a = PaletteGrid(PALETTES["kevinbot"], self.sfx, size=56)
         self.anim_wipe_palette_a.selected.connect(
-            lambda c: self.publish_and_update_args(
-                self.settings.args_topic, f'wipe,{{"colora": ' f"{list(hex_to_rgb(c.lstrip('#')))}}}"
-            )
+            lambda c: self.send_args("wipe", {"colora": list(hex_to_rgb(c.lstrip("#")))})
         )
         self.anim_wipe_a_layout.addWidget(self.anim_wipe_palette_a)
 
@@ -754,9 +1261,7 @@ class MainWindow(QMainWindow):
 
         self.anim_wipe_palette_b = PaletteGrid(PALETTES["kevinbot"], self.sfx, size=56)
         self.anim_wipe_palette_b.selected.connect(
-            lambda c: self.publish_and_update_args(
-                self.settings.args_topic, f'wipe,{{"colorb": ' f"{list(hex_to_rgb(c.lstrip('#')))}}}"
-            )
+            lambda c: self.send_args("wipe", {"colorb": list(hex_to_rgb(c.lstrip("#")))})
         )
         self.anim_wipe_b_layout.addWidget(self.anim_wipe_palette_b)
 
@@ -779,37 +1284,22 @@ class MainWindow(QMainWindow):
         self.anim_wipe_speed.setObjectName("big_slider")
         self.anim_wipe_speed.setRange(1, 5)
         self.anim_wipe_speed.valueChanged.connect(
-            lambda: self.publish_and_update_args(
-                self.settings.args_topic, f'wipe,{{"leds_iter": ' f"{self.anim_wipe_speed.value()}}}"
-            )
-        )
-        self.anim_wipe_speed.sliderReleased.connect(
-            lambda: self.publish_and_update_args(
-                self.settings.args_topic, f'wipe,{{"speed": ' f"{self.anim_wipe_speed.value()}}}"
-            )
+            lambda: self.send_args("wipe", {"leds_iter": self.anim_wipe_speed.value()})
         )
+        self.anim_wipe_speed.sliderReleased.connect(self.publisher.flush)
         self.anim_wipe_layout.addWidget(self.anim_wipe_speed)
 
-        # Firework
-        self.anim_config_stack.insertWidget(
-            A_FIREWORK_INDEX, generate_animation_config_unavailable()
-        )
+        return self.anim_wipe_widget
 
-        # Random / Random Color
+    def generate_random_config_page(self) -> QWidget:
         self.anim_random_widget = QWidget()
-        self.anim_config_stack.insertWidget(
-            A_RANDOM_INDEX, self.anim_random_widget
-        )
 
         self.anim_random_layout = QHBoxLayout()
         self.anim_random_widget.setLayout(self.anim_random_layout)
 
         self.anim_random_palette = PaletteGrid(PALETTES["kevinbot"], self.sfx, size=56)
         self.anim_random_palette.selected.connect(
-            lambda c: self.publish_and_update_args(
-                self.settings.args_topic,
-                f'random,{{"color": ' f"{list(hex_to_rgb(c.lstrip('#')))}}}",
-            )
+            lambda c: self.send_args("random", {"color": list(hex_to_rgb(c.lstrip("#")))})
         )
         self.anim_random_layout.addWidget(self.anim_random_palette)
 
@@ -829,280 +1319,83 @@ class MainWindow(QMainWindow):
 
         self.anim_random_right_layout.addStretch()
 
-        self.anim_config_stack.insertWidget(
-            A_RANDOM_COLOR_INDEX, generate_animation_config_unavailable()
-        )
-
-        # Application settings
-        self.settings_widget = QWidget()
-        self.root_widget.insertWidget(M_SETTINGS_PAGE_INDEX, self.settings_widget)
-
-        self.settings_root_layout = QVBoxLayout()
-        self.settings_widget.setLayout(self.settings_root_layout)
-
-        self.settings_top_bar = QHBoxLayout()
-        self.settings_root_layout.addLayout(self.settings_top_bar)
-
-        self.settings_back = QPushButton()
-        self.settings_back.setFlat(True)
-        self.settings_back.setIcon(icon("mdi6.arrow-left-box"))
-        self.settings_back.setIconSize(QSize(48, 48))
-        self.settings_back.clicked.connect(
-            lambda: self.root_widget.setCurrentIndex(M_CONTROL_WIDGET_INDEX)
-        )
-        self.settings_back.clicked.connect(self.sfx.play)
-
-        self.settings_restart = QPushButton()
-        self.settings_restart.setFlat(True)
-        self.settings_restart.setIcon(icon("mdi6.restart"))
-        self.settings_restart.setIconSize(QSize(48, 48))
-        self.settings_restart.clicked.connect(self.restart)
-
-        self.settings_lock = LockButton()
-        self.settings_lock.set_warning_text(
-            "Changing these settings may result in the system to stop functioning. Do you want to unlock the settings?")
-        self.settings_lock.locked.connect(self.lock_settings)
-        self.settings_lock.unlocked.connect(self.unlock_settings)
-
-        self.settings_top_bar.addWidget(self.settings_back)
-        self.settings_top_bar.addStretch()
-        self.settings_top_bar.addWidget(self.settings_restart)
-        self.settings_top_bar.addStretch()
-        self.settings_top_bar.addWidget(self.settings_lock)
-
-        self.settings_side_by_side = QHBoxLayout()
-        self.settings_root_layout.addLayout(self.settings_side_by_side)
-
-        self.settings_sidebar_widget = QFrame()
-        self.settings_side_by_side.addWidget(self.settings_sidebar_widget)
-
-        self.settings_sidebar_layout = QVBoxLayout()
-        self.settings_sidebar_widget.setLayout(self.settings_sidebar_layout)
-
-        self.settings_sidebar_items: list[QToolButton] = []
-
-        self.settings_pages = QStackedWidget()
-        self.settings_pages.setEnabled(False)
-        self.settings_side_by_side.addWidget(self.settings_pages)
-
-        self.add_setting_sidebar_item(
-            "MQTT Server",
-            "mdi6.server-network",
-            self.generate_mqtt_server_config_page(),
-        )
-        self.add_setting_sidebar_item(
-            "MQTT Topics",
-            "mdi6.slash-forward-box",
-            self.generate_mqtt_topics_config_page(),
-        )
-        self.add_setting_sidebar_item(
-            "Application Style",
-            "mdi6.application-variable",
-            self.generate_gui_config_page(),
-        )
+        return self.anim_random_widget
 
-        self.set_cursor()
-        if self.settings.fullscreen:
-            self.showFullScreen()
-        else:
-            self.show()
-
-    def check_mqtt_connection(self) -> None:
-        if self.client.state == MqttClient.Connected:
-            if self.root_widget.currentIndex() not in [
-                M_ABOUT_PAGE_INDEX,
-                M_ANIM_CONF_INDEX,
-                M_SETTINGS_PAGE_INDEX,
-            ]:
-                self.root_widget.setCurrentIndex(M_CONTROL_WIDGET_INDEX)
-            return
-        elif self.client.state == MqttClient.Connecting:
-            self.connection_timer.start()
-            self.connection_attempts_label.setText(
-                f"Connection Attempts: {self.connection_attempts}"
-            )
-            if self.root_widget.currentIndex() not in [
-                M_ABOUT_PAGE_INDEX,
-                M_SETTINGS_PAGE_INDEX,
-            ]:
-                self.root_widget.setCurrentIndex(M_CONNECTION_WIDGET_INDEX)
-            self.connection_attempts += 1
-        elif self.client.state == MqttClient.ConnectError:
-            self.connection_timer.start()
-            self.connection_attempts_label.setText(
-                f"Connection Failed: {self.client.result_code}"
-            )
-            self.root_widget.setCurrentIndex(M_CONNECTION_WIDGET_INDEX)
-            self.connection_attempts += 1
-        else:
-            self.client.connectToHost()
-            self.connection_timer.start()
-            self.connection_attempts_label.setText(
-                f"Connection Attempts: {self.connection_attempts}"
-            )
-            self.root_widget.setCurrentIndex(M_CONNECTION_WIDGET_INDEX)
-            self.connection_attempts += 1
+    def generate_firework_config_page(self) -> QWidget:
+        self.anim_firework_widget = QWidget()
 
-    def on_client_connect(self) -> None:
-        self.client.subscribe(self.settings.return_state_topic)
-        self.client.subscribe(self.settings.return_brightness_topic)
-        self.client.subscribe(self.settings.return_anim_topic)
-        self.client.subscribe(self.settings.return_data_request_topic)
-        self.client.publish(self.settings.data_request_topic, "request_type_full")
+        self.anim_firework_layout = QVBoxLayout()
+        self.anim_firework_widget.setLayout(self.anim_firework_layout)
 
-    def on_client_message(self, topic: str, payload: str) -> None:
-        if topic == self.settings.return_state_topic:
-            if payload == "ON":
-                self.led_powered = PowerStates.ON
-                self.control_power.setIcon(icon("mdi6.power", color="#66BB6A"))
-            else:
-                self.led_powered = PowerStates.OFF
-                self.control_power.setIcon(icon("mdi6.power", color="#F44336"))
+        # edits are previewed with a draft of the args and only published on apply
+        self.anim_firework_modified = False
+        self.anim_firework_engine = PreviewEngine(self.num_leds)
+        self.anim_firework_engine.animation = "Firework"
+        self.anim_firework_engine.args.firework = dataclasses.replace(self.animation_args.firework)
 
-        elif topic == self.settings.return_brightness_topic:
-            self.brightness_known = BrightnessStates.KNOWN
-            self.brightness_value = int(payload)
-            self.control_brightness_warning.setPixmap(
-                icon("mdi6.check-circle", color="#66BB6A").pixmap(QSize(24, 24))
-            )
+        self.anim_firework_preview = StripPreview(self.anim_firework_engine)
+        self.anim_firework_layout.addWidget(self.anim_firework_preview)
 
-        elif topic == self.settings.return_anim_topic:
-            if payload in list(ANIMATION_LIST.values()):
-                animation_name = list(ANIMATION_LIST.keys())[
-                    list(ANIMATION_LIST.values()).index(payload)
-                ]
-                self.animation_sidebar_frame.setEnabled(True)
-                self.update_animation_page(payload)
-            else:
-                animation_name = "Unknown"
-            self.current_animation.setText(f"Current Animation: {animation_name}")
+        self.anim_firework_grid = QGridLayout()
+        self.anim_firework_layout.addLayout(self.anim_firework_grid)
 
-        elif topic == self.settings.return_data_request_topic:
-            try:
-                data = json.loads(payload)
-            except json.JSONDecodeError:
-                # TODO: Handle this!
-                return
+        self.anim_firework_sliders: dict[str, tuple[QSlider, QLabel, int]] = {}
+        for i, (name, title, minimum, maximum, scale) in enumerate(FIREWORK_SLIDERS):
+            row, column = divmod(i, 2)
 
-            if "state" in data:
-                if data["state"] == "ON":
-                    self.led_powered = PowerStates.ON
-                    self.control_power.setIcon(icon("mdi6.power", color="#66BB6A"))
-                else:
-                    self.led_powered = PowerStates.OFF
-                    self.control_power.setIcon(icon("mdi6.power", color="#F44336"))
-
-            if "animation" in data:
-                if data["animation"] in list(ANIMATION_LIST.values()):
-                    animation_name = list(ANIMATION_LIST.keys())[
-                        list(ANIMATION_LIST.values()).index(data["animation"])
-                    ]
-                    self.animation_sidebar_frame.setEnabled(True)
-                    self.update_animation_page(data["animation"])
-                else:
-                    animation_name = "Unknown"
-                self.current_animation.setText(f"Current Animation: {animation_name}")
-
-            if "brightness" in data:
-                self.control_brightness_slider.setValue(data["brightness"])
-                self.brightness_known = BrightnessStates.KNOWN
-                self.control_brightness_warning.setPixmap(
-                    icon("mdi6.check-circle", color="#66BB6A").pixmap(QSize(24, 24))
-                )
-
-            if "args" in data:
-                self.animation_args = dict_to_dataclass(
-                    json.loads(data["args"]), AnimationArgs
-                )
-                self.anim_single_color_current.set_rgb(
-                    self.animation_args.single_color.color
-                )
-                self.anim_random_current.set_rgb(
-                    self.animation_args.random.color
-                )
-                self.anim_fade_current_a.set_rgb(self.animation_args.fade.colora)
-                self.anim_fade_current_b.set_rgb(self.animation_args.fade.colorb)
-                self.anim_flash_current_a.set_rgb(self.animation_args.flash.colora)
-                self.anim_flash_current_b.set_rgb(self.animation_args.flash.colorb)
-                self.anim_wipe_current_a.set_rgb(self.animation_args.wipe.colora)
-                self.anim_wipe_current_b.set_rgb(self.animation_args.wipe.colorb)
-                if not self.anim_grainbow_ratio.isSliderDown():
-                    self.anim_grainbow_ratio.blockSignals(True)
-                    self.anim_grainbow_ratio.setValue(
-                        round(self.animation_args.glitter_rainbow.glitter_ratio * 100)
-                    )
-                    self.anim_grainbow_ratio.blockSignals(False)
-
-                if not self.anim_flash_speed.isSliderDown():
-                    self.anim_flash_speed.blockSignals(True)
-                    self.anim_flash_speed.setValue(self.animation_args.flash.speed)
-                    self.anim_flash_speed.blockSignals(False)
-
-            if "num_leds" in data:
-                self.num_leds = data["num_leds"]
+            label = QLabel(title)
+            label.setObjectName("config_label")
+            self.anim_firework_grid.addWidget(label, row, column * 3)
 
-    def toggle_led_power(self) -> None:
-        if self.led_powered == PowerStates.ON:
-            self.led_powered = PowerStates.UNKNOWN
-            self.control_power.setIcon(icon("mdi6.power", color="#9EA7AA"))
-            self.client.publish(self.settings.state_topic, "OFF")
-        elif self.led_powered == PowerStates.OFF:
-            self.led_powered = PowerStates.UNKNOWN
-            self.control_power.setIcon(icon("mdi6.power", color="#9EA7AA"))
-            self.client.publish(self.settings.state_topic, "ON")
-        else:
-            self.led_powered = PowerStates.UNKNOWN
-            self.control_power.setIcon(icon("mdi6.power", color="#9EA7AA"))
-            self.client.publish(self.settings.state_topic, "OFF")
+            slider = QSlider(Qt.Orientation.Horizontal)
+            slider.setRange(minimum, maximum)
+            slider.valueChanged.connect(partial(self.on_firework_slider, name))
+            self.anim_firework_grid.addWidget(slider, row, column * 3 + 1)
 
-    def update_brightness(self) -> None:
-        self.brightness_known = BrightnessStates.UNKNOWN
-        self.control_brightness_warning.setPixmap(
-            icon("mdi6.alert", color="#FDD835").pixmap(QSize(24, 24))
-        )
-        self.client.publish(self.settings.brightness_topic, self.control_brightness_slider.value())
+            value = QLabel()
+            value.setObjectName("config_label")
+            value.setMinimumWidth(56)
+            self.anim_firework_grid.addWidget(value, row, column * 3 + 2)
 
-    def set_animation(self, anim_name: str) -> None:
-        self.animation_sidebar_frame.setEnabled(False)
-        self.client.publish(self.settings.animation_topic, ANIMATION_LIST[anim_name])
+            self.anim_firework_sliders[name] = (slider, value, scale)
 
-    def show_about(self) -> None:
-        self.root_widget.setCurrentIndex(M_ABOUT_PAGE_INDEX)
+        self.anim_firework_buttons = QHBoxLayout()
+        self.anim_firework_grid.addLayout(self.anim_firework_buttons, len(FIREWORK_SLIDERS) // 2, 3, 1, 3)
 
-    def show_settings(self) -> None:
-        self.root_widget.setCurrentIndex(M_SETTINGS_PAGE_INDEX)
-        if not self.settings_pages.isEnabled():
-            self.settings_lock.flash_outline()
+        self.anim_firework_reset = QPushButton("Reset")
+        self.anim_firework_reset.clicked.connect(self.reset_firework_draft)
+        self.anim_firework_buttons.addWidget(self.anim_firework_reset)
 
-    def anim_conf(self) -> None:
-        self.root_widget.setCurrentIndex(M_ANIM_CONF_INDEX)
+        self.anim_firework_apply = QPushButton("Apply")
+        self.anim_firework_apply.clicked.connect(self.apply_firework_draft)
+        self.anim_firework_buttons.addWidget(self.anim_firework_apply)
 
-    def update_animation_page(self, animation: str) -> None:
-        if animation in ANIMATION_CONF_INDEXES:
-            self.anim_config_stack.setCurrentIndex(ANIMATION_CONF_INDEXES[animation])
-        else:
-            self.anim_config_stack.setCurrentIndex(A_UNKNOWN_INDEX)
+        self.reset_firework_draft()
 
-    def publish_and_update_args(self, topic: str, data: str) -> None:
-        self.client.publish(topic, data)
-        self.client.publish(self.settings.data_request_topic, "request_type_args")
+        return self.anim_firework_widget
 
-    def add_setting_sidebar_item(self, title: str, qta_icon: str, content: QWidget | QFrame):
-        i: int = len(self.settings_sidebar_items)
+    def on_firework_slider(self, name: str, position: int) -> None:
+        _, value_label, scale = self.anim_firework_sliders[name]
+        value = position if scale == 1 else position / scale
+        setattr(self.anim_firework_engine.args.firework, name, value)
+        value_label.setText(str(value))
+        self.anim_firework_modified = True
 
-        button = QToolButton()
-        button.setObjectName("sidebar_button")
-        button.setText(title)
-        button.setIcon(icon(qta_icon))
-        button.setIconSize(QSize(24, 24))
-        button.setFixedWidth(180)
-        button.setToolButtonStyle(Qt.ToolButtonStyle.ToolButtonTextBesideIcon)
-        self.settings_sidebar_items.append(button)
-        self.settings_sidebar_layout.addWidget(button)
+    def reset_firework_draft(self) -> None:
+        draft = dataclasses.replace(self.animation_args.firework)
+        self.anim_firework_engine.args.firework = draft
+        for name, (slider, value_label, scale) in self.anim_firework_sliders.items():
+            value = getattr(draft, name)
+            slider.blockSignals(True)
+            slider.setValue(round(value * scale))
+            slider.blockSignals(False)
+            value_label.setText(str(value))
+        self.anim_firework_modified = False
 
-        self.settings_pages.insertWidget(i, content)
-        button.clicked.connect(lambda: self.settings_pages.setCurrentIndex(i))
-        button.clicked.connect(self.sfx.play)
+    def apply_firework_draft(self) -> None:
+        self.send_args("firework", dataclasses.asdict(self.anim_firework_engine.args.firework))
+        self.publisher.flush()
+        self.anim_firework_modified = False
 
     def generate_mqtt_server_config_page(self):
         frame = QFrame()
@@ -1110,9 +1403,6 @@ class MainWindow(QMainWindow):
         layout = QVBoxLayout()
         frame.setLayout(layout)
 
-        warning = WarningBar("A relaunch is required for these settings to apply")
-        layout.addWidget(warning)
-
         host_config_layout = QHBoxLayout()
         layout.addLayout(host_config_layout)
 
@@ -1138,6 +1428,67 @@ class MainWindow(QMainWindow):
         port_config.valueChanged.connect(self.settings.set_mqtt_port)
         port_config_layout.addWidget(port_config)
 
+        warning = WarningBar("Broker host and port changes apply when you press the restart button in the top bar")
+        layout.addWidget(warning)
+
+        rate_config_layout = QHBoxLayout()
+        layout.addLayout(rate_config_layout)
+
+        rate_config_label = QLabel("Maximum Slider Messages per Second")
+        rate_config_label.setObjectName("config_label")
+        rate_config_layout.addWidget(rate_config_label)
+
+        rate_config = QSpinBox()
+        rate_config.setRange(1, 100)
+        rate_config.setValue(round(self.settings.max_publish_rate))
+        rate_config.valueChanged.connect(self.set_max_publish_rate)
+        rate_config_layout.addWidget(rate_config)
+
+        reconnect_grid = QGridLayout()
+        layout.addLayout(reconnect_grid)
+
+        for row, (name, getter, setter, maximum) in enumerate((
+            ("Reconnect Minimum Delay (s)", self.settings.reconnect_min_delay,
+             self.settings.set_reconnect_min_delay, 60),
+            ("Reconnect Maximum Delay (s)", self.settings.reconnect_max_delay,
+             self.settings.set_reconnect_max_delay, 600),
+            ("Reconnect Jitter", self.settings.reconnect_jitter,
+             self.settings.set_reconnect_jitter, 1),
+        )):
+            reconnect_label = QLabel(name)
+            reconnect_label.setObjectName("config_label")
+            reconnect_grid.addWidget(reconnect_label, row, 0)
+
+            reconnect_config = QDoubleSpinBox()
+            reconnect_config.setRange(0, maximum)
+            reconnect_config.setSingleStep(0.05 if maximum == 1 else 0.5)
+            reconnect_config.setValue(getter)
+            reconnect_config.valueChanged.connect(setter)
+            reconnect_grid.addWidget(reconnect_config, row, 1)
+
+        offline_grid = QGridLayout()
+        layout.addLayout(offline_grid)
+
+        offline_queue_check = QCheckBox("Queue commands while disconnected")
+        offline_queue_check.setChecked(self.settings.offline_queue)
+        offline_queue_check.clicked.connect(self.settings.set_offline_queue)
+        offline_grid.addWidget(offline_queue_check, 0, 0)
+
+        offline_persist_check = QCheckBox("Keep queued commands across restarts")
+        offline_persist_check.setChecked(self.settings.offline_queue_persist)
+        offline_persist_check.clicked.connect(self.settings.set_offline_queue_persist)
+        offline_grid.addWidget(offline_persist_check, 0, 1)
+
+        offline_expiry_label = QLabel("Discard Queued Commands After (s)")
+        offline_expiry_label.setObjectName("config_label")
+        offline_grid.addWidget(offline_expiry_label, 1, 0)
+
+        offline_expiry = QDoubleSpinBox()
+        offline_expiry.setRange(0, 3600)
+        offline_expiry.setValue(self.settings.offline_queue_expiry)
+        offline_expiry.valueChanged.connect(self.settings.set_offline_queue_expiry)
+        offline_grid.addWidget(offline_expiry, 1, 1)
+
         return frame
 
     def generate_mqtt_topics_config_page(self):
@@ -1146,9 +1497,6 @@ class MainWindow(QMainWindow):
         layout = QVBoxLayout()
         frame.setLayout(layout)
 
-        warning = WarningBar("A relaunch is required for these settings to fully apply")
-        layout.addWidget(warning)
-
         grid = QGridLayout()
         layout.addLayout(grid)
 
@@ -1224,6 +1572,19 @@ class MainWindow(QMainWindow):
             lambda: self.settings.return_anim_topic,
             "MQTTAnimator/ranimation",
         )
+        generate_topic_config_row(
+            grid,
+            9,
+            "Frame Mirror Topic",
+            self.settings.set_frame_topic,
+            lambda: self.settings.frame_topic,
+            "MQTTAnimator/rframe",
+        )
+
+        frame_mirror_check = QCheckBox("Mirror the frames sent by the controller")
+        frame_mirror_check.setChecked(self.settings.frame_mirror)
+        frame_mirror_check.clicked.connect(self.settings.set_frame_mirror)
+        grid.addWidget(frame_mirror_check, 10, 0, 1, 2)
 
         return frame
 
@@ -1233,7 +1594,7 @@ class MainWindow(QMainWindow):
         layout = QVBoxLayout()
         frame.setLayout(layout)
 
-        warning = WarningBar("Restart the app for title to fully apply")
+        warning = WarningBar("Title changes apply when you press the restart button in the top bar")
         layout.addWidget(warning)
 
         cursor_config_layout = QHBoxLayout()
@@ -1267,7 +1628,8 @@ class MainWindow(QMainWindow):
             "App Title",
             self.set_title,
             lambda: self.settings.app_title,
-            "NeoPixel Animator"
+            "NeoPixel Animator",
+            commit_on_finish=False,
         )
 
         if self.settings.cursor_style == CursorSetting.DEFAULT:
@@ -1323,8 +1685,132 @@ class MainWindow(QMainWindow):
         sfx_volume.valueChanged.connect(self.set_sfx_volume)
         sfx_vol_layout.addWidget(sfx_volume)
 
+        warm_up_label = QLabel("Prepare all pages in the background after startup")
+        check_grid.addWidget(warm_up_label, 3, 0)
+
+        warm_up_check = QCheckBox("Warm Up Pages")
+        warm_up_check.setChecked(self.settings.warm_up_pages)
+        warm_up_check.clicked.connect(self.settings.set_warm_up_pages)
+        check_grid.addWidget(warm_up_check, 3, 1)
+
+        return frame
+
+    def generate_diagnostics_page(self):
+        frame = QFrame()
+        frame.setFrameShape(QFrame.Shape.Box)
+        layout = QVBoxLayout()
+        frame.setLayout(layout)
+
+        latency_label = QLabel("Command Round Trip (ms)")
+        latency_label.setObjectName("h3")
+        layout.addWidget(latency_label)
+
+        latency_grid = QGridLayout()
+        layout.addLayout(latency_grid)
+
+        for column, heading in enumerate(("Topic", "Samples", "Lost", "p50", "p95", "p99")):
+            heading_label = QLabel(heading)
+            heading_label.setObjectName("config_label")
+            latency_grid.addWidget(heading_label, 0, column)
+
+        self.diagnostics_latency_rows: list[tuple[Callable[[], str], list[QLabel]]] = []
+        for row, (name, topic_getter) in enumerate((
+            ("State", lambda: self.settings.state_topic),
+            ("Brightness", lambda: self.settings.brightness_topic),
+            ("Animation", lambda: self.settings.animation_topic),
+            ("Args", lambda: self.settings.args_topic),
+            ("Data Request", lambda: self.settings.data_request_topic),
+        ), start=1):
+            latency_grid.addWidget(QLabel(name), row, 0)
+            cells = []
+            for column in range(1, 6):
+                cell = QLabel("-")
+                latency_grid.addWidget(cell, row, column)
+                cells.append(cell)
+            self.diagnostics_latency_rows.append((topic_getter, cells))
+
+        # echoes are matched in order otherwise, args are only measured with correlation data
+        correlation_check = QCheckBox("Tag commands with MQTTv5 correlation data")
+        correlation_check.setChecked(self.settings.latency_correlation)
+        correlation_check.clicked.connect(self.settings.set_latency_correlation)
+        layout.addWidget(correlation_check)
+
+        self.diagnostics_counters = QLabel()
+        layout.addWidget(self.diagnostics_counters)
+
+        layout.addStretch()
+
+        self.diagnostics_status = QLabel()
+        self.diagnostics_status.setWordWrap(True)
+        layout.addWidget(self.diagnostics_status)
+
+        button_layout = QHBoxLayout()
+        layout.addLayout(button_layout)
+
+        export_button = QPushButton("Export")
+        export_button.clicked.connect(self.export_diagnostics)
+        button_layout.addWidget(export_button)
+
+        reset_button = QPushButton("Reset")
+        reset_button.clicked.connect(self.client.latency.reset)
+        reset_button.clicked.connect(self.publisher.reset_counters)
+        reset_button.clicked.connect(self.update_diagnostics)
+        button_layout.addWidget(reset_button)
+
+        self.diagnostics_page = frame
+        self.diagnostics_timer = QTimer(self)
+        self.diagnostics_timer.setInterval(1000)
+        self.diagnostics_timer.timeout.connect(self.update_diagnostics)
+        self.diagnostics_timer.start()
+
         return frame
 
+    def update_diagnostics(self) -> None:
+        if not self.diagnostics_page.isVisible():
+            return
+
+        latency = self.client.latency.summary()
+        for topic_getter, cells in self.diagnostics_latency_rows:
+            stats = latency.get(topic_getter())
+            if stats is None:
+                continue
+            cells[0].setText(str(stats["count"]))
+            cells[1].setText(str(stats["lost"]))
+            for cell, key in zip(cells[2:], ("p50", "p95", "p99")):
+                cell.setText("-" if stats[key] is None else f"{stats[key]:.1f}")
+
+        inbound = self.client.inbound.metrics()
+        icon_stats = icons.stats()
+        sprite_stats = sprites.stats()
+        frame_stats = self.frame_decoder.metrics()
+        self.diagnostics_counters.setText(
+            f"Published: {self.publisher.sent} sent, {self.publisher.dropped} coalesced\n"
+            f"Received: {inbound['received']} messages in {inbound['batches']} batches "
+            f"(mean {inbound['mean_batch_size']:.1f}, max {inbound['max_batch_size']}), "
+            f"queue depth {inbound['queue_depth']}\n"
+            f"Args: {self.args_sync.in_flight} in flight, {self.args_sync.merged_snapshots} stale snapshots merged, "
+            f"{self.args_sync.resyncs} resyncs, {self.args_sync.mismatches} mismatches\n"
+            f"Offline queue: {len(self.client.offline)} queued, {self.client.offline.expired} expired, "
+            f"{self.client.offline.overflowed} overflowed\n"
+            f"Icon cache: {icon_stats['entries']} icons, {icon_stats['hits']} hits, "
+            f"{icon_stats['misses']} misses ({icon_stats['disk_hits']} from disk)\n"
+            f"Thumbnails: {sprite_stats['sheets']} sheets, {sprite_stats['renders']} rendered, "
+            f"{sprite_stats['disk_hits']} from disk\n"
+            f"Frame mirror: {frame_stats['received']} frames ({frame_stats['mean_frame_bytes']:.0f} B mean), "
+            f"{frame_stats['coalesced']} skipped, {frame_stats['desyncs']} desyncs, {frame_stats['errors']} errors"
+        )
+
+    def export_diagnostics(self) -> None:
+        try:
+            path = app_data_path(f"latency-{datetime.now().strftime('%Y%m%d-%H%M%S')}.json")
+            self.client.latency.export(path)
+        except OSError as e:
+            logger.error(f"Could not export latency data: {e}")
+            self.diagnostics_status.setText(f"Export failed: {e}")
+            return
+        logger.info(f"Exported latency data to {path}")
+        self.diagnostics_status.setText(f"Exported to {path}")
+
     def lock_settings(self):
         self.settings_pages.setEnabled(False)
 
@@ -1352,34 +1838,47 @@ class MainWindow(QMainWindow):
         self.settings.set_app_title(title)
         self.control_title.setText(title)
 
+    def update_title_layout(self) -> None:
+        self.control_title.setFixedWidth(self.control_title.minimumSizeHint().width())
+        # this is to evenly center the power control
+        # gets size of title widget and subtracts width of about and settings buttons
+        # accounts for layout spacing and paddings
+        # results in a perfectly centered power control
+        self.control_title_spacer.changeSize(
+            self.control_title.width() - (
+                self.control_about.width() + self.control_settings.width() + (self.control_top_bar.spacing() * 2)),
+            0,
+            QSizePolicy.Policy.Fixed,
+            QSizePolicy.Policy.Minimum,
+        )
+        self.control_top_bar.invalidate()
+
     def set_custom_theming(self, enable: bool = True):
         if self.settings.custom_theming != enable:
             self.settings.custom_theming = enable
 
+        # icons without a color follow the theme
+        icons.clear()
+
         if enable:
             if self.settings.dark_mode:
                 qtadark(app)
-                with open("style.qss", "r", encoding="utf-8") as qss:
-                    app.setStyleSheet(load_stylesheet(custom_colors={
-                        "[dark]": {
-                            "primary": "#F44336",
-                            "background": "#000912",
-                            "border": "#263238",
-                        }
-                    }) + "\n" + qss.read())
-                QFontDatabase.addApplicationFont(
-                    "assets/fonts/Roboto/Roboto/Roboto-Regular.ttf"
-                )
+                stylesheet = themes.stylesheet("dark", DARK_COLORS)
             else:
                 qtalight(app)
-                with open("style.qss", "r", encoding="utf-8") as qss:
-                    app.setStyleSheet(load_stylesheet(theme="light") + "\n" + qss.read())
-                QFontDatabase.addApplicationFont(
-                    "assets/fonts/Roboto/Roboto/Roboto-Regular.ttf"
-                )
+                stylesheet = themes.stylesheet("light")
+            register_fonts()
+            # setting an identical stylesheet would still re-polish every widget
+            if app.styleSheet() != stylesheet:
+                app.setStyleSheet(stylesheet)
         else:
             app.setStyleSheet("")
 
+    def precompile_themes(self):
+        for theme, custom_colors in (("dark", DARK_COLORS), ("light", None)):
+            if not themes.is_cached(theme, custom_colors):
+                themes.stylesheet(theme, custom_colors)
+
     def set_dark_mode(self, enable: bool = True):
         self.settings.dark_mode = enable
         self.set_custom_theming(self.settings.custom_theming)
@@ -1394,17 +1893,48 @@ class MainWindow(QMainWindow):
                 return
             self.show()
 
+    def set_max_publish_rate(self, rate: int):
+        self.settings.max_publish_rate = rate
+        self.publisher.max_rate = rate
+
     def set_sfx_volume(self, volume: int):
         self.sfx.setVolume(volume / 100)
         self.settings.sfx_volume = volume / 100
 
     def restart(self):
-        self.deleteLater()
-        logger.info("Application restarting")
-        MainWindow.singleton = MainWindow(app)
+        """Apply settings that are not applied live, keeping the connection and widgets where possible"""
+        changed = {
+            key for key, value in self.settings.snapshot().items()
+            if self.applied_settings.get(key) != value
+        }
+        logger.info(f"Applying changed settings: {', '.join(sorted(changed)) or 'none'}")
+
+        # topics are rebound live, only a new broker needs a new connection
+        if changed & {"mqtt/host", "mqtt/port"}:
+            self.client.hostname = self.settings.mqtt_host
+            self.client.port = self.settings.mqtt_port
+            self.led_powered = PowerStates.UNKNOWN
+            self.brightness_known = BrightnessStates.UNKNOWN
+            self.reconnect.reconnect()
+
+        if "app/title" in changed:
+            self.update_title_layout()
+
+        self.applied_settings = self.settings.snapshot()
+
+    def shutdown(self) -> None:
+        self.reconnect.stop()
+        self.publisher.flush()
+        self.client.shutdown()
+        self.settings.close()
+
+    def closeEvent(self, event):
+        self.shutdown()
+        super().closeEvent(event)
 
 
 if __name__ == "__main__":
+    profiler.phase("qapplication")
     app = QApplication(sys.argv)
     win = MainWindow(app)
     sys.exit(app.exec())
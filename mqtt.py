@@ -1,8 +1,318 @@
+from collections import deque
+from dataclasses import dataclass
+from datetime import datetime
+import json
+import math
+import os
+import queue
+import random
+import threading
+import time
+from typing import Any, Callable, Iterable
+
 from qtpy import QtCore
 import paho.mqtt.client as mqtt
+from paho.mqtt.packettypes import PacketTypes
+from paho.mqtt.properties import Properties
 
 from loguru import logger
 
+from telemetry import LatencyTracker
+
+# ms to wait for CONNACK after starting a connection attempt
+CONNACK_TIMEOUT = 10000
+
+
+@dataclass(slots=True)
+class InboundMessage:
+    topic: str
+    payload: str
+    data: Any = None
+    received: float = 0.0
+
+
+class InboundPipeline(QtCore.QObject):
+    """
+    Decodes and parses incoming messages on a worker thread and hands them
+    to the GUI thread in batches, at most once per frame interval
+    """
+
+    batchReady = QtCore.Signal(list)
+    _wake = QtCore.Signal()
+
+    def __init__(self, frame_interval: int = 16, parent=None):
+        super(InboundPipeline, self).__init__(parent)
+
+        self.m_queue: queue.SimpleQueue = queue.SimpleQueue()
+        self.m_parsers: dict[str, Callable[[str], Any]] = {}
+        self.m_latest_wins: frozenset[str] = frozenset()
+
+        self.m_lock = threading.Lock()
+        self.m_batch: list[InboundMessage] = []
+        self.m_batch_index: dict[str, int] = {}
+
+        self.m_received = 0
+        self.m_delivered = 0
+        self.m_coalesced = 0
+        self.m_errors = 0
+        self.m_batches = 0
+        self.m_last_batch = 0
+        self.m_max_batch = 0
+
+        self.m_deliver_timer = QtCore.QTimer(self)
+        self.m_deliver_timer.setSingleShot(True)
+        self.m_deliver_timer.setInterval(frame_interval)
+        self.m_deliver_timer.timeout.connect(self._deliver)
+        self._wake.connect(self._on_wake)
+
+        self.m_thread: threading.Thread | None = None
+
+    @property
+    def frame_interval(self) -> int:
+        return self.m_deliver_timer.interval()
+
+    @frame_interval.setter
+    def frame_interval(self, interval: int):
+        self.m_deliver_timer.setInterval(interval)
+
+    def set_parsers(self, parsers: dict[str, Callable[[str], Any]]):
+        """
+        Set per-topic parsers, these run on the worker thread
+        """
+        self.m_parsers = dict(parsers)
+
+    def set_latest_wins(self, topics: Iterable[str]):
+        """
+        Set topics where only the newest message in a batch is delivered
+        """
+        self.m_latest_wins = frozenset(topics)
+
+    def start(self):
+        if self.m_thread is not None:
+            return
+        self.m_thread = threading.Thread(target=self._run, name="mqtt-inbound", daemon=True)
+        self.m_thread.start()
+
+    def stop(self):
+        if self.m_thread is None:
+            return
+        self.m_queue.put(None)
+        self.m_thread.join()
+        self.m_thread = None
+
+    def submit(self, topic: str, payload: bytes):
+        """
+        Queue a raw message, safe to call from any thread
+        """
+        self.m_queue.put((topic, payload, time.monotonic()))
+
+    def flush(self):
+        """
+        Wait until every submitted message is parsed and deliver the batch now, on the GUI thread
+        """
+        if self.m_thread is not None:
+            parsed = threading.Event()
+            self.m_queue.put(parsed)
+            parsed.wait()
+        self._deliver()
+
+    def metrics(self) -> dict[str, float]:
+        with self.m_lock:
+            pending = len(self.m_batch)
+        return {
+            "queue_depth": self.m_queue.qsize() + pending,
+            "received": self.m_received,
+            "delivered": self.m_delivered,
+            "coalesced": self.m_coalesced,
+            "errors": self.m_errors,
+            "batches": self.m_batches,
+            "last_batch_size": self.m_last_batch,
+            "max_batch_size": self.m_max_batch,
+            "mean_batch_size": self.m_delivered / self.m_batches if self.m_batches else 0,
+        }
+
+    def _run(self):
+        while True:
+            item = self.m_queue.get()
+            if item is None:
+                return
+            if isinstance(item, threading.Event):
+                # flush marker, everything queued before it is parsed
+                item.set()
+                continue
+            self._process(*item)
+
+    def _process(self, topic: str, raw: bytes, received: float):
+        self.m_received += 1
+        try:
+            payload = raw.decode("utf-8")
+            parser = self.m_parsers.get(topic)
+            data = parser(payload) if parser else None
+        except Exception as e:
+            # a bad payload must never stop the pipeline
+            self.m_errors += 1
+            logger.warning(f"Dropped unreadable message on {topic}: {e!r}")
+            return
+
+        message = InboundMessage(topic, payload, data, received)
+        with self.m_lock:
+            wake = not self.m_batch
+            index = self.m_batch_index.get(topic) if topic in self.m_latest_wins else None
+            if index is None:
+                self.m_batch_index[topic] = len(self.m_batch)
+                self.m_batch.append(message)
+            else:
+                self.m_batch[index] = message
+                self.m_coalesced += 1
+        if wake:
+            self._wake.emit()
+
+    def _on_wake(self):
+        if not self.m_deliver_timer.isActive():
+            self.m_deliver_timer.start()
+
+    def _deliver(self):
+        with self.m_lock:
+            batch = self.m_batch
+            self.m_batch = []
+            self.m_batch_index = {}
+        if not batch:
+            return
+
+        self.m_batches += 1
+        self.m_delivered += len(batch)
+        self.m_last_batch = len(batch)
+        self.m_max_batch = max(self.m_max_batch, len(batch))
+        self.batchReady.emit(batch)
+
+
+class OfflineQueue:
+    """
+    Bounded queue for commands published while disconnected.
+
+    Commands are merged by key, so only the newest command per key is kept, in the
+    order they were last changed. The queue can be persisted to an append-only log
+    that is compacted as it grows, so queued commands survive a restart.
+    Commands older than max_age seconds are discarded instead of replayed. Sequence numbers
+    are kept for replay but not across restarts, where they would belong to another session.
+    """
+
+    def __init__(self, max_size: int = 64, max_age: float = 30.0) -> None:
+        self.enabled = True
+        self.max_size = max_size
+        self.max_age = max_age
+
+        self.m_lock = threading.Lock()
+        self.m_items: dict[str, tuple[str, Any, float, int | None]] = {}
+        self.m_path: str | None = None
+        self.m_log_lines = 0
+
+        self.m_expired = 0
+        self.m_overflowed = 0
+
+    def __len__(self) -> int:
+        return len(self.m_items)
+
+    @property
+    def expired(self) -> int:
+        return self.m_expired
+
+    @property
+    def overflowed(self) -> int:
+        return self.m_overflowed
+
+    @property
+    def path(self) -> str | None:
+        return self.m_path
+
+    def set_path(self, path: str | None) -> None:
+        """
+        Persist the queue to a log at path, loading commands left from a previous run.
+        None disables persistence and removes nothing from disk
+        """
+        with self.m_lock:
+            self.m_path = path
+            if path is None:
+                return
+            if os.path.exists(path):
+                self._load()
+            self._compact()
+
+    def put(self, key: str, topic: str, payload, seq: int | None = None) -> None:
+        with self.m_lock:
+            queued = time.time()
+            self.m_items.pop(key, None)
+            self.m_items[key] = (topic, payload, queued, seq)
+            while len(self.m_items) > self.max_size:
+                del self.m_items[next(iter(self.m_items))]
+                self.m_overflowed += 1
+            self._append(key, topic, payload, queued)
+
+    def drain(self) -> list[tuple[str, Any, int | None]]:
+        """
+        Remove and return every unexpired (topic, payload, seq), oldest first
+        """
+        with self.m_lock:
+            now = time.time()
+            commands = [
+                (topic, payload, seq)
+                for topic, payload, queued, seq in self.m_items.values()
+                if self.max_age <= 0 or now - queued <= self.max_age
+            ]
+            self.m_expired += len(self.m_items) - len(commands)
+            self.m_items.clear()
+            self._compact()
+        return commands
+
+    def clear(self) -> None:
+        with self.m_lock:
+            self.m_items.clear()
+            self._compact()
+
+    def _append(self, key: str, topic: str, payload, queued: float) -> None:
+        if self.m_path is None:
+            return
+        if self.m_log_lines >= self.max_size * 4:
+            self._compact()
+            return
+        try:
+            with open(self.m_path, "a", encoding="utf-8") as log:
+                log.write(json.dumps([key, topic, payload, queued]) + "\n")
+            self.m_log_lines += 1
+        except OSError as e:
+            logger.warning(f"Could not write offline queue log: {e}")
+
+    def _compact(self) -> None:
+        if self.m_path is None:
+            return
+        try:
+            with open(self.m_path + ".tmp", "w", encoding="utf-8") as log:
+                for key, (topic, payload, queued, _seq) in self.m_items.items():
+                    log.write(json.dumps([key, topic, payload, queued]) + "\n")
+            os.replace(self.m_path + ".tmp", self.m_path)
+            self.m_log_lines = len(self.m_items)
+        except OSError as e:
+            logger.warning(f"Could not compact offline queue log: {e}")
+
+    def _load(self) -> None:
+        try:
+            with open(self.m_path, "r", encoding="utf-8") as log:
+                for line in log:
+                    try:
+                        key, topic, payload, queued = json.loads(line)
+                    except ValueError:
+                        # partially written line from an unclean shutdown
+                        continue
+                    self.m_items.pop(key, None)
+                    self.m_items[key] = (topic, payload, queued, None)
+        except OSError as e:
+            logger.warning(f"Could not read offline queue log: {e}")
+            return
+        while len(self.m_items) > self.max_size:
+            del self.m_items[next(iter(self.m_items))]
+        if self.m_items:
+            logger.info(f"Loaded {len(self.m_items)} queued commands from {self.m_path}")
+
 
 class MqttClient(QtCore.QObject):
     Disconnected = 0
@@ -17,6 +327,8 @@ class MqttClient(QtCore.QObject):
     connected = QtCore.Signal()
     disconnected = QtCore.Signal()
     connect_failed = QtCore.Signal()
+    # sequence number of a command handed to the broker connection
+    published = QtCore.Signal(int)
 
     stateChanged = QtCore.Signal(int)
     rcChanged = QtCore.Signal(int)
@@ -26,8 +338,6 @@ class MqttClient(QtCore.QObject):
     cleanSessionChanged = QtCore.Signal(bool)
     protocolVersionChanged = QtCore.Signal(int)
 
-    messageSignal = QtCore.Signal(str, str)
-
     def __init__(self, parent=None):
         super(MqttClient, self).__init__(parent)
 
@@ -39,23 +349,56 @@ class MqttClient(QtCore.QObject):
 
         self.m_state = MqttClient.Disconnected
         self.m_result_code = None
+        self.m_last_error = ""
+
+        # reconnecting is handled by ReconnectEngine, each attempt gets its own network loop
+        self.m_network_thread: threading.Thread | None = None
+
+        # a broker that accepts the connection but never answers fails the attempt
+        self.m_connack_timer = QtCore.QTimer(self)
+        self.m_connack_timer.setSingleShot(True)
+        self.m_connack_timer.setInterval(CONNACK_TIMEOUT)
+        self.m_connack_timer.timeout.connect(self.on_connack_timeout)
 
         if self.m_protocolVersion in [MqttClient.MQTT_3_1, MqttClient.MQTT_3_1_1]:
             self.m_client = mqtt.Client(
                 callback_api_version=mqtt.CallbackAPIVersion.VERSION1,
                 clean_session=self.m_cleanSession,
                 protocol=self.protocolVersion,
+                reconnect_on_failure=False,
             )
         elif self.m_protocolVersion in [MqttClient.MQTT_5]:
             self.m_client = mqtt.Client(
                 callback_api_version=mqtt.CallbackAPIVersion.VERSION1,
                 protocol=self.protocolVersion,
+                reconnect_on_failure=False,
             )
 
         self.m_client.on_connect = self.on_connect
         self.m_client.on_message = self.on_message
         self.m_client.on_disconnect = self.on_disconnect
 
+        self.inbound = InboundPipeline(parent=self)
+        self.inbound.start()
+
+        self.latency = LatencyTracker()
+        # MQTTv5 response topic and correlation data on commands, only if the controller wants them
+        self.correlate_commands = False
+        self.m_correlation = 0
+
+        self.offline = OfflineQueue()
+
+        # held while checking the state and queueing or replaying, so no command is queued
+        # after the replay that would have sent it
+        self.m_publish_lock = threading.Lock()
+
+        # binary topics skip the text pipeline and are handled on the network thread
+        self.m_raw_handlers: dict[str, Callable[[bytes], None]] = {}
+
+        # reference counted subscriptions, renewed on every connect
+        self.m_subscriptions: dict[str, int] = {}
+        self.m_subscriptions_lock = threading.RLock()
+
     @QtCore.Property(int, notify=stateChanged)
     def state(self):
         return self.m_state
@@ -86,6 +429,13 @@ class MqttClient(QtCore.QObject):
     def result_code(self):
         return self.m_result_code
 
+    @property
+    def last_error(self) -> str:
+        """
+        Reason for the last failed connection attempt or disconnect
+        """
+        return self.m_last_error
+
     @QtCore.Property(str, notify=hostnameChanged)
     def hostname(self):
         return self.m_hostname
@@ -154,44 +504,481 @@ class MqttClient(QtCore.QObject):
 
     #################################################################
     @QtCore.Slot()
-    def connectToHost(self):
-        if self.m_hostname:
-            self.m_client.connect_async(
-                self.m_hostname, port=self.port, keepalive=self.keepAlive
-            )
+    def connectToHost(self) -> bool:
+        """
+        Start a single connection attempt, returns False if one could not be started
+        """
+        if not self.m_hostname:
+            return False
+        if self.m_network_thread is not None and self.m_network_thread.is_alive():
+            # ask the previous loop to exit, the engine retries once it has
+            self.m_client.disconnect()
+            return False
+
+        self.state = MqttClient.Connecting
+        self.m_network_thread = threading.Thread(
+            target=self._network_main, name="mqtt-network", daemon=True
+        )
+        self.m_network_thread.start()
+        self.m_connack_timer.start()
+        return True
+
+    def _network_main(self):
+        try:
+            self.m_client.connect(self.m_hostname, port=self.port, keepalive=self.keepAlive)
+        except (OSError, ValueError) as e:
+            self.m_last_error = str(e)
+            self.state = MqttClient.ConnectError
+            self.connect_failed.emit()
+            return
+        self.m_client.loop_forever()
 
-            self.state = MqttClient.Connecting
-            self.m_client.loop_start()
+    @QtCore.Slot()
+    def on_connack_timeout(self):
+        if self.state != MqttClient.Connecting:
+            return
+        self.m_last_error = f"No answer from the broker within {CONNACK_TIMEOUT / 1000:g} s"
+        self.state = MqttClient.ConnectError
+        # on_disconnect stays quiet for ConnectError, so the failure is only reported once
+        self.m_client.disconnect()
+        self.connect_failed.emit()
 
     @QtCore.Slot()
     def disconnectFromHost(self):
         self.m_client.disconnect()
 
-    def subscribe(self, path):
-        if self.state == MqttClient.Connected:
-            self.m_client.subscribe(path)
+    def shutdown(self, timeout: float = 2.0):
+        """
+        Disconnect and stop the network and inbound threads
+        """
+        self.m_client.disconnect()
+        if self.m_network_thread is not None:
+            self.m_network_thread.join(timeout)
+            self.m_network_thread = None
+        self.inbound.stop()
 
-    def publish(self, path, payload):
-        if self.state == MqttClient.Connected:
-            self.m_client.publish(path, payload)
+    def subscribe(self, path):
+        """
+        Add a subscription, it is sent now if connected and again after every connect
+        """
+        with self.m_subscriptions_lock:
+            count = self.m_subscriptions.get(path, 0)
+            self.m_subscriptions[path] = count + 1
+            if count == 0 and self.state == MqttClient.Connected:
+                self.m_client.subscribe(path)
+
+    def unsubscribe(self, path):
+        """
+        Remove a subscription, the broker is only told once nothing else uses the topic
+        """
+        with self.m_subscriptions_lock:
+            count = self.m_subscriptions.get(path, 0)
+            if count > 1:
+                self.m_subscriptions[path] = count - 1
+                return
+            self.m_subscriptions.pop(path, None)
+            if count == 1 and self.state == MqttClient.Connected:
+                self.m_client.unsubscribe(path)
+
+    def rebind(self, old, new):
+        """
+        Move a subscription to a new topic, subscribing before unsubscribing so no message is missed
+        """
+        if old == new:
+            return
+        with self.m_subscriptions_lock:
+            self.subscribe(new)
+            self.unsubscribe(old)
+
+    def subscriptions(self) -> list[str]:
+        with self.m_subscriptions_lock:
+            return list(self.m_subscriptions)
+
+    def set_raw_handlers(self, handlers: dict[str, Callable[[bytes], None]]):
+        """
+        Set handlers for binary topics, these get the undecoded payload on the network thread
+        """
+        self.m_raw_handlers = dict(handlers)
+
+    def publish(self, path, payload, seq: int | None = None, key: str | None = None, queue_offline: bool = True):
+        """
+        Publish a message. While disconnected, the message is queued under key
+        (defaulting to the topic) and replayed on connect unless queue_offline is False
+        """
+        with self.m_publish_lock:
+            if self.state != MqttClient.Connected:
+                if queue_offline and self.offline.enabled:
+                    self.offline.put(path if key is None else key, path, payload, seq)
+                return
+        self._publish(path, payload, seq)
+
+    def _publish(self, path, payload, seq: int | None = None):
+        properties = None
+        correlation = None
+        response_topic = self.latency.return_topic(path) if self.correlate_commands else None
+        if self.protocolVersion == MqttClient.MQTT_5 and (seq is not None or response_topic):
+            properties = Properties(PacketTypes.PUBLISH)
+            if seq is not None:
+                properties.UserProperty = ("seq", str(seq))
+            if response_topic:
+                self.m_correlation += 1
+                correlation = self.m_correlation.to_bytes(4, "big")
+                properties.ResponseTopic = response_topic
+                properties.CorrelationData = correlation
+        info = self.m_client.publish(path, payload, properties=properties)
+        self.latency.sent(path, correlation)
+        if seq is not None and info.rc == mqtt.MQTT_ERR_SUCCESS:
+            self.published.emit(seq)
 
     #################################################################
     # callbacks
     def on_message(self, mqttc, obj, msg):
-        mstr = msg.payload.decode("ascii")
-        # print("on_message", mstr, obj, mqttc)
-        self.messageSignal.emit(msg.topic, mstr)
+        raw_handler = self.m_raw_handlers.get(msg.topic)
+        if raw_handler:
+            raw_handler(msg.payload)
+            return
+        correlation = getattr(msg.properties, "CorrelationData", None) if msg.properties else None
+        self.latency.received(msg.topic, correlation)
+        self.inbound.submit(msg.topic, msg.payload)
 
     def on_connect(self, client, userdata, flags, rc, properties=None):
         if rc != 0:
+            self.m_last_error = mqtt.connack_string(rc) if isinstance(rc, int) else str(rc)
             self.state = MqttClient.ConnectError
             self.m_result_code = rc
             self.connect_failed.emit()
             return
-        self.state = MqttClient.Connected
+        # commands published from now on go out after the replayed ones, and subscriptions
+        # added from now on are sent by subscribe()
+        with self.m_publish_lock:
+            with self.m_subscriptions_lock:
+                self.state = MqttClient.Connected
+                if self.m_subscriptions:
+                    self.m_client.subscribe([(path, 0) for path in self.m_subscriptions])
+
+            replay = self.offline.drain()
+            if replay:
+                logger.info(f"Replaying {len(replay)} commands queued while offline")
+            for topic, payload, seq in replay:
+                self._publish(topic, payload, seq)
+
         self.connected.emit()
 
-    def on_disconnect(self, *args):
-        # print("on_disconnect", args)
+    def on_disconnect(self, client, userdata, rc, properties=None):
+        if self.m_state == MqttClient.ConnectError:
+            # already reported by on_connect
+            return
+        # MQTTv5 reason codes come from the broker, others are local error codes
+        self.m_last_error = mqtt.error_string(rc) if isinstance(rc, int) else str(rc)
         self.state = MqttClient.Disconnected
         self.disconnected.emit()
+
+
+class TopicBindings(QtCore.QObject):
+    """
+    Named topics of an MqttClient.
+
+    Subscribed bindings keep the client subscribed to their current topic. Rebinding one
+    moves the subscription in a single step and emits rebound(name, old, new), so the
+    owner can update its dispatch table and refresh only the affected state.
+    """
+
+    rebound = QtCore.Signal(str, str, str)
+
+    def __init__(self, client: MqttClient, parent=None):
+        super(TopicBindings, self).__init__(parent)
+        self.m_client = client
+        self.m_topics: dict[str, str] = {}
+        self.m_subscribed: set[str] = set()
+
+    def topic(self, name: str) -> str:
+        return self.m_topics[name]
+
+    def bind(self, name: str, topic: str, subscribe: bool = False):
+        self.m_topics[name] = topic
+        if subscribe:
+            self.set_subscribed(name, True)
+
+    def set_subscribed(self, name: str, subscribe: bool):
+        if subscribe == (name in self.m_subscribed):
+            return
+        if subscribe:
+            self.m_subscribed.add(name)
+            self.m_client.subscribe(self.m_topics[name])
+        else:
+            self.m_subscribed.discard(name)
+            self.m_client.unsubscribe(self.m_topics[name])
+
+    def rebind(self, name: str, topic: str) -> bool:
+        """
+        Point a binding at a new topic, returns False if it did not change
+        """
+        old = self.m_topics.get(name)
+        if old is None or old == topic:
+            return False
+        self.m_topics[name] = topic
+        if name in self.m_subscribed:
+            self.m_client.rebind(old, topic)
+        logger.info(f"Rebound {name} from {old} to {topic}")
+        self.rebound.emit(name, old, topic)
+        return True
+
+
+class PublishScheduler(QtCore.QObject):
+    """
+    Coalesces outbound messages so only the latest value per key is kept,
+    and limits how often each key is published
+    """
+
+    countersChanged = QtCore.Signal()
+
+    def __init__(self, client: MqttClient, max_rate: float = 10, parent=None):
+        super(PublishScheduler, self).__init__(parent)
+
+        self.m_client = client
+        self.m_max_rate = max_rate
+        self.m_rates: dict[str, float] = {}
+
+        self.m_pending: dict[str, tuple[str, object, dict]] = {}
+        self.m_last_sent: dict[str, float] = {}
+        self.m_timers: dict[str, QtCore.QTimer] = {}
+
+        self.m_sent = 0
+        self.m_dropped = 0
+
+    @QtCore.Property(int, notify=countersChanged)
+    def sent(self):
+        return self.m_sent
+
+    @QtCore.Property(int, notify=countersChanged)
+    def dropped(self):
+        return self.m_dropped
+
+    @property
+    def max_rate(self) -> float:
+        return self.m_max_rate
+
+    @max_rate.setter
+    def max_rate(self, rate: float):
+        self.m_max_rate = rate
+        logger.info(f"Default maximum publish rate has been set to {rate}/s")
+
+    def set_max_rate(self, topic: str, rate: float | None):
+        """
+        Override the maximum publish rate for a topic or key, None restores the default
+        """
+        if rate is None:
+            self.m_rates.pop(topic, None)
+        else:
+            self.m_rates[topic] = rate
+
+    def reset_counters(self):
+        self.m_sent = 0
+        self.m_dropped = 0
+        self.countersChanged.emit()
+
+    def _interval(self, key: str, topic: str) -> float:
+        rate = self.m_rates.get(key, self.m_rates.get(topic, self.m_max_rate))
+        return 1 / rate if rate > 0 else 0
+
+    def schedule(self, topic: str, payload, key: str | None = None, **kwargs):
+        """
+        Queue a message, replacing any unsent message with the same key.
+        Key defaults to the topic, extra keyword arguments are passed to MqttClient.publish
+        """
+        if key is None:
+            key = topic
+
+        if self.m_pending.pop(key, None) is not None:
+            self.m_dropped += 1
+            self.countersChanged.emit()
+        self.m_pending[key] = (topic, payload, kwargs)
+
+        wait = self.m_last_sent.get(key, -math.inf) + self._interval(key, topic) - time.monotonic()
+        if wait <= 0:
+            self._send(key)
+            return
+
+        timer = self.m_timers.get(key)
+        if timer is None:
+            timer = QtCore.QTimer(self)
+            timer.setSingleShot(True)
+            timer.timeout.connect(lambda: self._send(key))
+            self.m_timers[key] = timer
+        if not timer.isActive():
+            timer.start(math.ceil(wait * 1000))
+
+    @QtCore.Slot()
+    def flush(self, key: str | None = None):
+        """
+        Publish pending messages immediately, for one key or all of them
+        """
+        if key is None:
+            for pending_key in list(self.m_pending):
+                self._send(pending_key)
+        else:
+            self._send(key)
+
+    def _send(self, key: str):
+        timer = self.m_timers.get(key)
+        if timer:
+            timer.stop()
+
+        message = self.m_pending.pop(key, None)
+        if message is None:
+            return
+
+        topic, payload, kwargs = message
+        self.m_client.publish(topic, payload, key=key, **kwargs)
+        self.m_last_sent[key] = time.monotonic()
+        self.m_sent += 1
+        self.countersChanged.emit()
+
+
+class ReconnectEngine(QtCore.QObject):
+    """
+    Reconnects the client after a failed attempt or a lost connection,
+    using exponential backoff with jitter, and records connection telemetry
+    """
+
+    retryScheduled = QtCore.Signal(float)
+    telemetryChanged = QtCore.Signal()
+
+    def __init__(
+        self,
+        client: MqttClient,
+        min_delay: float = 0.5,
+        max_delay: float = 30.0,
+        jitter: float = 0.25,
+        parent=None,
+    ):
+        super(ReconnectEngine, self).__init__(parent)
+
+        self.m_client = client
+        self.min_delay = min_delay
+        self.max_delay = max_delay
+        self.jitter = jitter
+
+        self.m_enabled = False
+        self.m_attempts = 0
+        self.m_total_attempts = 0
+        self.m_connects = 0
+        self.m_first_attempt: float | None = None
+        self.m_next_attempt: float | None = None
+        self.m_times_to_connect: deque[float] = deque(maxlen=50)
+        self.m_disconnect_reasons: deque[tuple[str, str]] = deque(maxlen=20)
+
+        self.m_timer = QtCore.QTimer(self)
+        self.m_timer.setSingleShot(True)
+        self.m_timer.timeout.connect(self._attempt)
+
+        client.connected.connect(self.on_connected)
+        client.connect_failed.connect(self.on_lost)
+        client.disconnected.connect(self.on_lost)
+
+    @property
+    def attempts(self) -> int:
+        """
+        Attempts since the last successful connection
+        """
+        return self.m_attempts
+
+    @property
+    def total_attempts(self) -> int:
+        return self.m_total_attempts
+
+    @property
+    def last_time_to_connect(self) -> float | None:
+        return self.m_times_to_connect[-1] if self.m_times_to_connect else None
+
+    @property
+    def disconnect_reasons(self) -> list[tuple[str, str]]:
+        """
+        Recent (time, reason) pairs, oldest first
+        """
+        return list(self.m_disconnect_reasons)
+
+    def next_retry_in(self) -> float | None:
+        if self.m_next_attempt is None:
+            return None
+        return max(0.0, self.m_next_attempt - time.monotonic())
+
+    def telemetry(self) -> dict[str, Any]:
+        return {
+            "attempts": self.m_attempts,
+            "total_attempts": self.m_total_attempts,
+            "connects": self.m_connects,
+            "last_time_to_connect": self.last_time_to_connect,
+            "mean_time_to_connect": (
+                sum(self.m_times_to_connect) / len(self.m_times_to_connect)
+                if self.m_times_to_connect else None
+            ),
+            "next_retry_in": self.next_retry_in(),
+            "disconnect_reasons": self.disconnect_reasons,
+        }
+
+    @QtCore.Slot()
+    def start(self):
+        self.m_enabled = True
+        if self.m_client.state not in (MqttClient.Connected, MqttClient.Connecting):
+            self._attempt()
+
+    @QtCore.Slot()
+    def stop(self):
+        self.m_enabled = False
+        self.m_timer.stop()
+        self.m_next_attempt = None
+
+    @QtCore.Slot()
+    def reconnect(self):
+        """
+        Drop the current connection, if any, and connect again without backing off
+        """
+        self.m_timer.stop()
+        self.m_attempts = 0
+        if self.m_client.state in (MqttClient.Connected, MqttClient.Connecting):
+            # on_lost schedules the first retry
+            self.m_client.disconnectFromHost()
+        else:
+            self._attempt()
+
+    def backoff(self, attempt: int) -> float:
+        """
+        Delay before the given retry, counting from 1
+        """
+        delay = min(self.max_delay, self.min_delay * 2 ** (attempt - 1))
+        return max(0.0, delay * (1 + random.uniform(-self.jitter, self.jitter)))
+
+    def _attempt(self):
+        self.m_next_attempt = None
+        if not self.m_enabled:
+            return
+        if self.m_first_attempt is None:
+            self.m_first_attempt = time.monotonic()
+        self.m_attempts += 1
+        self.m_total_attempts += 1
+        if not self.m_client.connectToHost():
+            self._schedule()
+        self.telemetryChanged.emit()
+
+    def _schedule(self):
+        delay = self.backoff(max(1, self.m_attempts))
+        self.m_next_attempt = time.monotonic() + delay
+        self.m_timer.start(round(delay * 1000))
+        self.retryScheduled.emit(delay)
+
+    def on_connected(self):
+        if self.m_first_attempt is not None:
+            self.m_times_to_connect.append(time.monotonic() - self.m_first_attempt)
+        self.m_first_attempt = None
+        self.m_attempts = 0
+        self.m_connects += 1
+        self.telemetryChanged.emit()
+
+    def on_lost(self):
+        self.m_disconnect_reasons.append(
+            (datetime.now().strftime("%H:%M:%S"), self.m_client.last_error or "Unknown")
+        )
+        if self.m_enabled and not self.m_timer.isActive():
+            self._schedule()
+        self.telemetryChanged.emit()
@@ -1,6 +1,7 @@
 import functools
+import math
 
-from qtpy import QtCore, QtWidgets
+from qtpy import QtCore, QtGui, QtWidgets
 from qtpy.QtCore import Signal as Signal
 
 PALETTES = {
@@ -147,6 +148,10 @@ class PaletteVertical(_PaletteLinearBase):
 
 
 class PaletteGrid(_PaletteBase):
+    """
+    Grid of color swatches painted by a single widget.
+    Only visible rows are painted, larger palettes scroll with a scrollbar or the wheel
+    """
 
     def __init__(self, colors, sfx, n_columns=7, size=42, *args, **kwargs):
         super().__init__(*args, **kwargs)
@@ -155,18 +160,133 @@ class PaletteGrid(_PaletteBase):
             if colors in PALETTES:
                 colors = PALETTES[colors]
 
-        palette = QtWidgets.QGridLayout()
-        row, col = 0, 0
+        self.colors = list(colors)
+        self.sfx = sfx
+        self.n_columns = n_columns
+        self.swatch_size = size
 
-        for c in colors:
-            b = _PaletteButton(c)
-            b.setFixedSize(size, size)
-            b.pressed.connect(functools.partial(self._emit_color, c))
-            b.pressed.connect(sfx.play)
-            palette.addWidget(b, row, col)
-            col += 1
-            if col == n_columns:
-                col = 0
-                row += 1
+        self.m_qcolors = [QtGui.QColor(c) for c in self.colors]
+        self.m_rows = math.ceil(len(self.colors) / n_columns)
+        self.m_pressed: int | None = None
 
-        self.setLayout(palette)
+        style = self.style()
+        self.m_spacing = style.pixelMetric(QtWidgets.QStyle.PixelMetric.PM_LayoutHorizontalSpacing)
+        if self.m_spacing < 0:
+            self.m_spacing = 6
+        margin = style.pixelMetric(QtWidgets.QStyle.PixelMetric.PM_LayoutLeftMargin)
+        self.setContentsMargins(margin, margin, margin, margin)
+
+        self.m_border = self.palette().color(QtGui.QPalette.ColorRole.Mid)
+        self.m_origin = QtCore.QPoint(0, 0)
+
+        self.m_scrollbar = QtWidgets.QScrollBar(QtCore.Qt.Orientation.Vertical, self)
+        self.m_scrollbar.setSingleStep(self.pitch)
+        self.m_scrollbar.valueChanged.connect(lambda _value: self.update())
+        self.m_scrollbar.hide()
+
+        self.setSizePolicy(QtWidgets.QSizePolicy.Policy.Fixed, QtWidgets.QSizePolicy.Policy.Preferred)
+
+    @property
+    def pitch(self) -> int:
+        return self.swatch_size + self.m_spacing
+
+    def _content_size(self) -> QtCore.QSize:
+        columns = min(self.n_columns, len(self.colors))
+        return QtCore.QSize(
+            max(0, columns * self.pitch - self.m_spacing),
+            max(0, self.m_rows * self.pitch - self.m_spacing),
+        )
+
+    def sizeHint(self) -> QtCore.QSize:
+        margins = self.contentsMargins()
+        content = self._content_size()
+        return QtCore.QSize(
+            content.width() + margins.left() + margins.right(),
+            content.height() + margins.top() + margins.bottom(),
+        )
+
+    def minimumSizeHint(self) -> QtCore.QSize:
+        hint = self.sizeHint()
+        margins = self.contentsMargins()
+        return QtCore.QSize(hint.width(), min(hint.height(), self.swatch_size + margins.top() + margins.bottom()))
+
+    def resizeEvent(self, event):
+        super().resizeEvent(event)
+        rect = self.contentsRect()
+        content = self._content_size()
+        overflow = content.height() - rect.height()
+
+        scrollbar_width = self.m_scrollbar.sizeHint().width() if overflow > 0 else 0
+        self.m_scrollbar.setGeometry(rect.right() - scrollbar_width + 1, rect.top(), scrollbar_width, rect.height())
+        self.m_scrollbar.setPageStep(rect.height())
+        self.m_scrollbar.setRange(0, max(0, overflow))
+        self.m_scrollbar.setVisible(overflow > 0)
+
+        # swatches are centered in the space left of the scrollbar
+        free = rect.width() - scrollbar_width - content.width()
+        self.m_origin = QtCore.QPoint(rect.left() + max(0, free // 2), rect.top())
+
+    def _swatch_rect(self, index: int) -> QtCore.QRect:
+        row, col = divmod(index, self.n_columns)
+        return QtCore.QRect(
+            self.m_origin.x() + col * self.pitch,
+            self.m_origin.y() + row * self.pitch - self.m_scrollbar.value(),
+            self.swatch_size,
+            self.swatch_size,
+        )
+
+    def index_at(self, pos: QtCore.QPoint) -> int | None:
+        x = pos.x() - self.m_origin.x()
+        y = pos.y() - self.m_origin.y() + self.m_scrollbar.value()
+        if x < 0 or y < 0 or not self.contentsRect().contains(pos):
+            return None
+        col, x_offset = divmod(x, self.pitch)
+        row, y_offset = divmod(y, self.pitch)
+        # gaps between swatches are not part of any swatch
+        if col >= self.n_columns or x_offset >= self.swatch_size or y_offset >= self.swatch_size:
+            return None
+        index = row * self.n_columns + col
+        return index if index < len(self.colors) else None
+
+    def paintEvent(self, event):
+        painter = QtGui.QPainter(self)
+        painter.setRenderHint(QtGui.QPainter.RenderHint.Antialiasing)
+        painter.setClipRect(self.contentsRect())
+
+        exposed = event.rect()
+        offset = self.m_scrollbar.value() - self.m_origin.y()
+        first_row = max(0, (exposed.top() + offset) // self.pitch)
+        last_row = min(self.m_rows - 1, (exposed.bottom() + offset) // self.pitch)
+
+        pen = QtGui.QPen(self.m_border, 1)
+        for row in range(first_row, last_row + 1):
+            for index in range(row * self.n_columns, min((row + 1) * self.n_columns, len(self.colors))):
+                rect = QtCore.QRectF(self._swatch_rect(index)).adjusted(0.5, 0.5, -0.5, -0.5)
+                color = self.m_qcolors[index]
+                painter.setPen(pen)
+                painter.setBrush(color.darker(130) if index == self.m_pressed else color)
+                painter.drawRoundedRect(rect, 4, 4)
+
+    def mousePressEvent(self, event):
+        if event.button() != QtCore.Qt.MouseButton.LeftButton:
+            return super().mousePressEvent(event)
+        index = self.index_at(event.position().toPoint())
+        if index is None:
+            return
+        self.m_pressed = index
+        self.update(self._swatch_rect(index))
+        self._emit_color(self.colors[index])
+        self.sfx.play()
+
+    def mouseReleaseEvent(self, event):
+        if self.m_pressed is not None:
+            self.update(self._swatch_rect(self.m_pressed))
+            self.m_pressed = None
+        super().mouseReleaseEvent(event)
+
+    def wheelEvent(self, event):
+        if self.m_scrollbar.isVisible():
+            steps = event.angleDelta().y() / 120
+            self.m_scrollbar.setValue(self.m_scrollbar.value() - round(steps * self.pitch))
+        else:
+            super().wheelEvent(event)
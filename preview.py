@@ -0,0 +1,454 @@
+import math
+import time
+
+import numpy as np
+from qtpy.QtCore import QElapsedTimer, QObject, QRunnable, Qt, QThreadPool, QTimer, Signal
+from qtpy.QtGui import QWindow
+
+from animation_data import AnimationArgs, FireworkArgs
+from strip_view import StripView
+
+# hue offsets of the red, green and blue channels for a fully saturated hsv to rgb conversion
+_HUE_OFFSETS = np.array([0, 4, 2], dtype=np.float32)
+
+RAINBOW_CYCLES_PER_SECOND = 0.25
+COLORLOOP_CYCLES_PER_SECOND = 0.1
+FADE_PERIOD = 4.0
+# FlashArgs.speed and WipeArgs.leds_iter count in controller ticks
+TICKS_PER_SECOND = 50
+RANDOM_SPARKS_PER_SECOND = 0.5
+RANDOM_DECAY_PER_SECOND = 2.0
+# fireworks
+MAX_FLARES = 4
+MAX_SPARKS = 2048
+FLARE_LAUNCH_CHANCE = 0.02
+FLARE_BURST_VELOCITY = -0.2
+SPARK_COOLING = 0.99
+SPARK_GRAVITY_DECAY = 0.995
+MAX_TICKS_PER_FRAME = 10
+# strip widget
+PREVIEW_RING_SIZE = 3
+PREVIEW_FRAME_BUDGET = 0.25
+FRAME_TIME_SMOOTHING = 0.2
+
+
+class FireworkSimulation:
+    """
+    Struct-of-arrays particle system for the Firework animation.
+
+    Flares rise from the start of the strip until they slow down to FLARE_BURST_VELOCITY,
+    then burst into num_sparks sparks. Every particle lives in a slot of fixed size arrays,
+    positions are in LEDs and time advances in controller ticks.
+    """
+
+    def __init__(self, num_leds: int, rng: np.random.Generator) -> None:
+        self.num_leds = num_leds
+        self.m_rng = rng
+
+        self.flare_pos = np.zeros(MAX_FLARES, dtype=np.float32)
+        self.flare_vel = np.zeros(MAX_FLARES, dtype=np.float32)
+        self.flare_level = np.zeros(MAX_FLARES, dtype=np.float32)
+        self.flare_alive = np.zeros(MAX_FLARES, dtype=bool)
+
+        self.spark_pos = np.zeros(MAX_SPARKS, dtype=np.float32)
+        self.spark_vel = np.zeros(MAX_SPARKS, dtype=np.float32)
+        self.spark_heat = np.zeros(MAX_SPARKS, dtype=np.float32)
+        self.spark_gravity = np.zeros(MAX_SPARKS, dtype=np.float32)
+        self.spark_alive = np.zeros(MAX_SPARKS, dtype=bool)
+
+    @property
+    def sparks(self) -> int:
+        return int(self.spark_alive.sum())
+
+    def launch(self, args: FireworkArgs) -> bool:
+        free = np.flatnonzero(~self.flare_alive)
+        if not free.size:
+            return False
+        low, high = sorted((args.flare_min_vel, args.flare_max_vel))
+        slot = free[0]
+        self.flare_pos[slot] = 0
+        self.flare_vel[slot] = self.m_rng.uniform(low, high) if high > low else low
+        self.flare_level[slot] = 1
+        self.flare_alive[slot] = True
+        return True
+
+    def _burst(self, position: float, args: FireworkArgs) -> None:
+        free = np.flatnonzero(~self.spark_alive)[: max(0, int(args.num_sparks))]
+        if not free.size:
+            return
+        velocity = self.m_rng.uniform(-1, 1, free.size).astype(np.float32)
+        self.spark_pos[free] = position
+        self.spark_heat[free] = np.minimum(np.abs(velocity) * 500, 255)
+        # higher bursts spread further
+        self.spark_vel[free] = velocity * (position / self.num_leds)
+        self.spark_gravity[free] = args.gravity
+        self.spark_alive[free] = True
+
+    def step(self, args: FireworkArgs) -> None:
+        alive = self.flare_alive
+        if not alive.any() or (alive.sum() < MAX_FLARES and self.m_rng.random() < FLARE_LAUNCH_CHANCE):
+            self.launch(args)
+
+        self.flare_pos[alive] += self.flare_vel[alive]
+        self.flare_vel[alive] += args.gravity
+        self.flare_level[alive] *= args.brightness_decay
+        bursting = alive & ((self.flare_vel < FLARE_BURST_VELOCITY) | (self.flare_pos >= self.num_leds))
+        for slot in np.flatnonzero(bursting):
+            self._burst(min(float(self.flare_pos[slot]), self.num_leds - 1), args)
+        alive &= ~bursting
+
+        sparks = self.spark_alive
+        self.spark_pos[sparks] += self.spark_vel[sparks]
+        self.spark_vel[sparks] += self.spark_gravity[sparks]
+        self.spark_heat[sparks] *= SPARK_COOLING
+        self.spark_gravity[sparks] *= SPARK_GRAVITY_DECAY
+        sparks &= (self.spark_heat >= 1) & (self.spark_pos >= 0) & (self.spark_pos < self.num_leds)
+
+    def draw(self, frame: np.ndarray, args: FireworkArgs) -> None:
+        frame.fill(0)
+
+        sparks = np.flatnonzero(self.spark_alive)
+        if sparks.size:
+            heat = self.spark_heat[sparks]
+            c1 = min(max(args.c1, 1), 254)
+            c2 = min(max(args.c2, 1), c1 - 1)
+            # red up to c2, then orange to yellow up to c1, then yellow to white
+            colors = np.zeros((sparks.size, 3), dtype=np.float32)
+            colors[:, 0] = np.minimum(heat * 255 / c2, 255)
+            colors[:, 1] = np.clip((heat - c2) * 255 / (c1 - c2), 0, 255)
+            colors[:, 2] = np.clip((heat - c1) * 255 / (255 - c1), 0, 255)
+            frame[self.spark_pos[sparks].astype(np.intp)] = colors
+
+        flares = np.flatnonzero(self.flare_alive)
+        if flares.size:
+            positions = np.clip(self.flare_pos[flares], 0, self.num_leds - 1).astype(np.intp)
+            frame[positions] = self.flare_level[flares, None] * 255
+
+
+class PreviewEngine:
+    """
+    Renders animation frames for num_leds LEDs into (num_leds, 3) uint8 arrays.
+
+    All work is done with whole-strip NumPy operations on preallocated buffers,
+    so the cost per frame does not depend on Python loops over LEDs.
+    """
+
+    def __init__(self, num_leds: int = 100, seed: int | None = None) -> None:
+        self.args = AnimationArgs()
+        self.animation = "SingleColor"
+        self.brightness = 255
+        self.powered = True
+
+        self.m_rng = np.random.default_rng(seed)
+        self.m_last_t: float | None = None
+        self.m_generators = {
+            "SingleColor": self._single_color,
+            "Rainbow": self._rainbow,
+            "GlitterRainbow": self._glitter_rainbow,
+            "Colorloop": self._colorloop,
+            "Fade": self._fade,
+            "Flash": self._flash,
+            "Wipe": self._wipe,
+            "Random": self._random,
+            "RandomColor": self._random_color,
+            "Firework": self._firework,
+        }
+        self.resize(num_leds)
+
+    @property
+    def animations(self) -> list[str]:
+        return list(self.m_generators)
+
+    def resize(self, num_leds: int) -> None:
+        self.num_leds = max(1, num_leds)
+        n = self.num_leds
+        self.m_position = np.arange(n, dtype=np.float32) / n
+        self.m_hue = np.empty(n, dtype=np.float32)
+        self.m_frame = np.zeros((n, 3), dtype=np.float32)
+        self.m_levels = np.zeros(n, dtype=np.float32)
+        self.m_random_colors = np.zeros((n, 3), dtype=np.float32)
+        self.m_mask = np.empty(n, dtype=bool)
+        self.m_firework = FireworkSimulation(n, self.m_rng)
+        self.m_firework_ticks = 0.0
+
+    def render(self, t: float, out: np.ndarray | None = None) -> np.ndarray:
+        """Render the frame at t seconds
+
+        Args:
+            t (float): Animation time in seconds
+            out (np.ndarray | None, optional): (num_leds, 3) uint8 array to render into. Defaults to None.
+
+        Returns:
+            np.ndarray: The rendered (num_leds, 3) uint8 frame
+        """
+        if out is None:
+            out = np.empty((self.num_leds, 3), dtype=np.uint8)
+        dt = 0.0 if self.m_last_t is None else max(0.0, t - self.m_last_t)
+        self.m_last_t = t
+
+        if not self.powered:
+            out.fill(0)
+            return out
+
+        generator = self.m_generators.get(self.animation)
+        if generator is None:
+            out.fill(0)
+            return out
+        generator(t, dt)
+
+        np.multiply(self.m_frame, self.brightness / 255, out=self.m_frame)
+        np.copyto(out, self.m_frame, casting="unsafe")
+        return out
+
+    def _hsv(self, hue: np.ndarray, out: np.ndarray) -> None:
+        # fully saturated hue in [0, 1) to rgb in [0, 255]
+        np.multiply(hue[:, None], 6, out=out)
+        np.add(out, _HUE_OFFSETS, out=out)
+        np.mod(out, 6, out=out)
+        np.subtract(out, 3, out=out)
+        np.abs(out, out=out)
+        np.subtract(out, 1, out=out)
+        np.clip(out, 0, 1, out=out)
+        np.multiply(out, 255, out=out)
+
+    def _single_color(self, t: float, dt: float) -> None:
+        self.m_frame[:] = self.args.single_color.color
+
+    def _rainbow(self, t: float, dt: float) -> None:
+        np.add(self.m_position, (t * RAINBOW_CYCLES_PER_SECOND) % 1, out=self.m_hue)
+        np.mod(self.m_hue, 1, out=self.m_hue)
+        self._hsv(self.m_hue, self.m_frame)
+
+    def _glitter_rainbow(self, t: float, dt: float) -> None:
+        self._rainbow(t, dt)
+        np.less(self.m_rng.random(self.num_leds, dtype=np.float32), self.args.glitter_rainbow.glitter_ratio,
+                out=self.m_mask)
+        self.m_frame[self.m_mask] = 255
+
+    def _colorloop(self, t: float, dt: float) -> None:
+        self.m_hue.fill((t * COLORLOOP_CYCLES_PER_SECOND) % 1)
+        self._hsv(self.m_hue, self.m_frame)
+
+    def _blend(self, color_a, color_b, mix: float) -> None:
+        a = np.asarray(color_a, dtype=np.float32)
+        b = np.asarray(color_b, dtype=np.float32)
+        self.m_frame[:] = a + (b - a) * mix
+
+    def _fade(self, t: float, dt: float) -> None:
+        self._blend(self.args.fade.colora, self.args.fade.colorb, 0.5 - 0.5 * math.cos(2 * math.pi * t / FADE_PERIOD))
+
+    def _flash(self, t: float, dt: float) -> None:
+        half_period = max(1.0, self.args.flash.speed) / TICKS_PER_SECOND
+        first = int(t / half_period) % 2 == 0
+        self.m_frame[:] = self.args.flash.colora if first else self.args.flash.colorb
+
+    def _wipe(self, t: float, dt: float) -> None:
+        # colora wipes over colorb, then colorb wipes back over colora
+        n = self.num_leds
+        step = int(t * TICKS_PER_SECOND * max(1, self.args.wipe.leds_iter)) % (2 * n)
+        front, back = (self.args.wipe.colora, self.args.wipe.colorb) if step < n else \
+            (self.args.wipe.colorb, self.args.wipe.colora)
+        edge = step % n
+        self.m_frame[:edge] = front
+        self.m_frame[edge:] = back
+
+    def _random(self, t: float, dt: float) -> None:
+        # random LEDs light up in the configured color and fade out
+        np.multiply(self.m_levels, math.exp(-RANDOM_DECAY_PER_SECOND * dt), out=self.m_levels)
+        np.less(self.m_rng.random(self.num_leds, dtype=np.float32), RANDOM_SPARKS_PER_SECOND * dt, out=self.m_mask)
+        self.m_levels[self.m_mask] = 1
+        np.multiply(self.m_levels[:, None], np.asarray(self.args.random.color, dtype=np.float32), out=self.m_frame)
+
+    def _random_color(self, t: float, dt: float) -> None:
+        np.less(self.m_rng.random(self.num_leds, dtype=np.float32), RANDOM_SPARKS_PER_SECOND * dt, out=self.m_mask)
+        count = int(self.m_mask.sum())
+        if count:
+            self.m_random_colors[self.m_mask] = self.m_rng.integers(0, 256, (count, 3)).astype(np.float32)
+        self.m_frame[:] = self.m_random_colors
+
+    def _firework(self, t: float, dt: float) -> None:
+        self.m_firework_ticks = min(self.m_firework_ticks + dt * TICKS_PER_SECOND, MAX_TICKS_PER_FRAME)
+        while self.m_firework_ticks >= 1:
+            self.m_firework.step(self.args.firework)
+            self.m_firework_ticks -= 1
+        self.m_firework.draw(self.m_frame, self.args.firework)
+
+
+class _FrameSignals(QObject):
+    # ring index, generation, render time in seconds
+    frameReady = Signal(int, int, float)
+
+
+class _RenderTask(QRunnable):
+    """
+    Renders one frame into a ring buffer on a pool thread
+    """
+
+    def __init__(self, engine: PreviewEngine, buffer: np.ndarray, index: int, generation: int, t: float,
+                 signals: _FrameSignals) -> None:
+        super().__init__()
+        self.engine = engine
+        self.buffer = buffer
+        self.index = index
+        self.generation = generation
+        self.t = t
+        self.signals = signals
+
+    def run(self) -> None:
+        start = time.perf_counter()
+        self.engine.render(self.t, self.buffer)
+        self.signals.frameReady.emit(self.index, self.generation, time.perf_counter() - start)
+
+
+class StripPreview(StripView):
+    """
+    Shows PreviewEngine frames as a strip.
+
+    Frames are rendered on a QThreadPool worker into a ring of preallocated buffers and a
+    finished frame is shown by handing its buffer to the StripView. The frame interval
+    follows the measured render and paint time and the timer only runs while the strip is
+    on screen.
+    """
+
+    def __init__(self, engine: PreviewEngine, max_fps: int = 60, min_fps: int = 10,
+                 pool: QThreadPool | None = None, parent=None) -> None:
+        super(StripPreview, self).__init__(parent=parent)
+        self.engine = engine
+        self.max_fps = max_fps
+        self.min_fps = min_fps
+        self.m_pool = pool or QThreadPool.globalInstance()
+
+        self.m_clock = QElapsedTimer()
+        self.m_clock.start()
+
+        self.m_timer = QTimer(self)
+        self.m_timer.setTimerType(Qt.TimerType.PreciseTimer)
+        self.m_timer.setInterval(round(1000 / max_fps))
+        self.m_timer.timeout.connect(self.schedule_frame)
+
+        self.m_signals = _FrameSignals()
+        self.m_signals.frameReady.connect(self.on_frame_ready)
+
+        self.m_generation = 0
+        self.m_rendering = False
+        self.m_pending_num_leds: int | None = None
+        self.m_window = None
+
+        # moving averages of the frame cost in seconds
+        self.m_render_time = 0.0
+        self.m_paint_time = 0.0
+        self.frames = 0
+        self.skipped = 0
+
+        self._allocate()
+
+    def _allocate(self) -> None:
+        n = self.engine.num_leds
+        self.m_buffers = [np.zeros((n, 3), dtype=np.uint8) for _ in range(PREVIEW_RING_SIZE)]
+        self.m_current = 0
+        self.m_generation += 1
+        self.set_frame(self.m_buffers[0])
+
+    @property
+    def fps(self) -> float:
+        return 1000 / self.m_timer.interval()
+
+    def set_num_leds(self, num_leds: int) -> None:
+        if num_leds == self.engine.num_leds:
+            return
+        if self.m_rendering:
+            # the worker is using the engine, resize when its frame arrives
+            self.m_pending_num_leds = num_leds
+            return
+        self.engine.resize(num_leds)
+        self._allocate()
+
+    def _next_index(self) -> int:
+        return (self.m_current + 1) % PREVIEW_RING_SIZE
+
+    def render_frame(self) -> None:
+        """
+        Render the next frame on the calling thread and show it
+        """
+        index = self._next_index()
+        start = time.perf_counter()
+        self.engine.render(self.m_clock.elapsed() / 1000, self.m_buffers[index])
+        self._show_frame(index, time.perf_counter() - start)
+
+    def schedule_frame(self) -> None:
+        if not self._window_shown():
+            self.m_timer.stop()
+            return
+        if self.visibleRegion().isEmpty():
+            # scrolled out of view, keep polling at the lowest rate without rendering
+            self.m_timer.setInterval(round(1000 / self.min_fps))
+            return
+        if self.m_rendering:
+            # the previous frame is late, the interval is adapted when it arrives
+            self.skipped += 1
+            return
+        self.m_rendering = True
+        index = self._next_index()
+        self.m_pool.start(
+            _RenderTask(
+                self.engine, self.m_buffers[index], index, self.m_generation, self.m_clock.elapsed() / 1000,
+                self.m_signals,
+            )
+        )
+
+    def on_frame_ready(self, index: int, generation: int, render_time: float) -> None:
+        self.m_rendering = False
+        if self.m_pending_num_leds is not None:
+            num_leds, self.m_pending_num_leds = self.m_pending_num_leds, None
+            self.set_num_leds(num_leds)
+        if generation != self.m_generation:
+            return
+        self._show_frame(index, render_time)
+
+    def _show_frame(self, index: int, render_time: float) -> None:
+        self.m_current = index
+        self.frames += 1
+        self.m_render_time += (render_time - self.m_render_time) * FRAME_TIME_SMOOTHING
+        self._adapt()
+        self.set_frame(self.m_buffers[index])
+
+    def _adapt(self) -> None:
+        # keep the preview to a fraction of the frame interval so input and MQTT stay responsive
+        cost = (self.m_render_time + self.m_paint_time) / PREVIEW_FRAME_BUDGET
+        interval = min(max(cost, 1 / self.max_fps), 1 / self.min_fps)
+        interval_ms = max(1, round(interval * 1000))
+        if abs(interval_ms - self.m_timer.interval()) > 1:
+            self.m_timer.setInterval(interval_ms)
+
+    def _window_shown(self) -> bool:
+        if not self.isVisible():
+            return False
+        window = self.window().windowHandle()
+        return window is None or window.visibility() not in (QWindow.Visibility.Hidden, QWindow.Visibility.Minimized)
+
+    def _start(self) -> None:
+        if self._window_shown() and not self.m_timer.isActive():
+            self.m_timer.start()
+
+    def _on_window_visibility(self, visibility) -> None:
+        if visibility in (QWindow.Visibility.Hidden, QWindow.Visibility.Minimized):
+            self.m_timer.stop()
+        else:
+            self._start()
+
+    def paintEvent(self, event):
+        start = time.perf_counter()
+        super().paintEvent(event)
+        self.m_paint_time += (time.perf_counter() - start - self.m_paint_time) * FRAME_TIME_SMOOTHING
+
+    def showEvent(self, event):
+        super().showEvent(event)
+        window = self.window().windowHandle()
+        if window is not None and window is not self.m_window:
+            self.m_window = window
+            window.visibilityChanged.connect(self._on_window_visibility)
+        self._start()
+
+    def hideEvent(self, event):
+        self.m_timer.stop()
+        super().hideEvent(event)
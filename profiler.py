@@ -0,0 +1,104 @@
+import json
+import os
+import time
+
+from loguru import logger
+
+PROFILE_ENV = "NPA_PROFILE_STARTUP"
+
+
+def _process_age() -> float:
+    # seconds since the process was started, 0 where the start time is unknown
+    try:
+        with open("/proc/self/stat", "r", encoding="ascii") as f:
+            # the command name may contain spaces, fields after it are fixed
+            fields = f.read().rsplit(")", 1)[1].split()
+        start = int(fields[19]) / os.sysconf("SC_CLK_TCK")
+        return max(0.0, time.clock_gettime(time.CLOCK_BOOTTIME) - start)
+    except (OSError, IndexError, ValueError, AttributeError):
+        return 0.0
+
+
+class StartupProfiler:
+    """
+    Records named startup phases and milestones relative to process start.
+
+    A phase lasts until the next one starts. Milestones are single points such as the
+    first paint. When disabled every call returns immediately.
+    """
+
+    def __init__(self, enabled: bool) -> None:
+        self.enabled = enabled
+        self.phases: list[tuple[str, float, float | None]] = []
+        self.milestones: dict[str, float] = {}
+        self.origin = 0.0
+        if enabled:
+            self.origin = time.perf_counter() - _process_age()
+            self.phases.append(("interpreter", 0.0, None))
+            self.phase("imports")
+
+    def now(self) -> float:
+        return time.perf_counter() - self.origin
+
+    def phase(self, name: str) -> None:
+        """
+        Start a phase, ending the current one
+        """
+        if not self.enabled:
+            return
+        now = self.now()
+        self.end()
+        self.phases.append((name, now, None))
+
+    def end(self) -> None:
+        """
+        End the current phase
+        """
+        if not self.enabled or not self.phases or self.phases[-1][2] is not None:
+            return
+        name, start, _ = self.phases[-1]
+        self.phases[-1] = (name, start, self.now())
+
+    def milestone(self, name: str) -> bool:
+        """
+        Record the first occurrence of a milestone, returns False if it was already recorded
+        """
+        if not self.enabled or name in self.milestones:
+            return False
+        self.milestones[name] = self.now()
+        return True
+
+    def timeline(self) -> dict:
+        return {
+            "phases": [
+                {
+                    "name": name,
+                    "start_ms": start * 1000,
+                    "duration_ms": None if end is None else (end - start) * 1000,
+                }
+                for name, start, end in self.phases
+            ],
+            "milestones": {name: at * 1000 for name, at in self.milestones.items()},
+        }
+
+    def report(self) -> str:
+        lines = [
+            f"{name:<24} {start * 1000:>8.1f} ms  +{'...' if end is None else f'{(end - start) * 1000:.1f}'} ms"
+            for name, start, end in self.phases
+        ]
+        lines += [f"{name:<24} {at * 1000:>8.1f} ms" for name, at in self.milestones.items()]
+        return "\n".join(lines)
+
+    def write(self, path: str) -> None:
+        if not self.enabled:
+            return
+        try:
+            with open(path, "w", encoding="utf-8") as f:
+                json.dump(self.timeline(), f, indent=2)
+        except OSError as e:
+            logger.warning(f"Could not write startup timeline {path}: {e}")
+            return
+        logger.info(f"Startup timeline written to {path}")
+
+
+profiler = StartupProfiler(os.environ.get(PROFILE_ENV, "") not in ("", "0"))
@@ -1,8 +1,13 @@
 from enum import Enum
+import queue
+import threading
 
-from qtpy.QtCore import QSettings
+from qtpy.QtCore import QCoreApplication, QObject, QSettings, QTimer, Signal
 from loguru import logger
 
+# writes are collected until no setting changed for this long
+SETTINGS_FLUSH_DELAY = 1000
+
 
 class CursorSetting(Enum):
     DEFAULT = 0
@@ -10,229 +15,480 @@ class CursorSetting(Enum):
     BLOB = 2
 
 
-class SettingsManager:
-    def __init__(self) -> None:
+SETTINGS_DEFAULTS: dict[str, tuple[object, type]] = {
+    "mqtt/host": ("localhost", str),
+    "mqtt/port": (1883, int),
+    "mqtt/max_publish_rate": (10.0, float),
+    "mqtt/reconnect_min_delay": (0.5, float),
+    "mqtt/reconnect_max_delay": (30.0, float),
+    "mqtt/reconnect_jitter": (0.25, float),
+    "mqtt/offline_queue": (True, bool),
+    "mqtt/offline_queue_persist": (False, bool),
+    "mqtt/offline_queue_expiry": (30.0, float),
+    "mqtt/frame_mirror": (False, bool),
+    "mqtt/latency_correlation": (False, bool),
+    "mqtt/topics/data_request_topic": ("MQTTAnimator/data_request", str),
+    "mqtt/topics/return_data_request_topic": ("MQTTAnimator/rdata_request", str),
+    "mqtt/topics/state_topic": ("MQTTAnimator/state", str),
+    "mqtt/topics/return_state_topic": ("MQTTAnimator/rstate", str),
+    "mqtt/topics/brightness_topic": ("MQTTAnimator/brightness", str),
+    "mqtt/topics/return_brightness_topic": ("MQTTAnimator/rbrightness", str),
+    "mqtt/topics/args_topic": ("MQTTAnimator/args", str),
+    "mqtt/topics/animation_topic": ("MQTTAnimator/animation", str),
+    "mqtt/topics/return_anim_topic": ("MQTTAnimator/ranimation", str),
+    "mqtt/topics/frame_topic": ("MQTTAnimator/rframe", str),
+    "app/cursor": (CursorSetting.DEFAULT.value, int),
+    "app/title": ("NeoPixel Animator", str),
+    "app/custom_theming": (True, bool),
+    "app/dark_mode": (True, bool),
+    "app/fullscreen": (False, bool),
+    "app/sfx_volume": (0.5, float),
+    "app/warm_up_pages": (False, bool),
+}
+
+
+class SettingsManager(QObject):
+    """
+    Typed access to the persistent settings store.
+
+    Values are read once into an in-memory snapshot, so reads never touch QSettings.
+    Setters update the snapshot and emit settingChanged(key, value) right away, the
+    value is staged and written behind: once no setting changed for SETTINGS_FLUSH_DELAY
+    ms, the staged values are written as one batch by a writer thread with its own
+    QSettings. close() writes whatever is still staged, it also runs when the application
+    is about to quit.
+    """
+
+    settingChanged = Signal(str, object)
+
+    def __init__(self, flush_delay: int = SETTINGS_FLUSH_DELAY) -> None:
+        super().__init__()
         self.qsettings = QSettings("meowmeowahr", "NeoPixelAnimatorGUI")
         logger.info(f"Initialized QSettings store at directory {self.qsettings.fileName()}")
 
+        self._snapshot: dict[str, object] = {}
+        self._staged: dict[str, object] = {}
+
+        # counted by whichever thread writes, the writer thread or the caller once closed
+        self._counter_lock = threading.Lock()
+        self.writes = 0
+        self.flushes = 0
+
+        self._flush_timer = QTimer(self)
+        self._flush_timer.setSingleShot(True)
+        self._flush_timer.setInterval(flush_delay)
+        self._flush_timer.timeout.connect(self.flush)
+
+        self._batches: queue.SimpleQueue = queue.SimpleQueue()
+        self._writer: threading.Thread | None = threading.Thread(
+            target=self._write_batches,
+            args=(self.qsettings.fileName(), self.qsettings.format()),
+            name="settings-writer",
+            daemon=True,
+        )
+        self._writer.start()
+
+        app = QCoreApplication.instance()
+        if app is not None:
+            app.aboutToQuit.connect(self.close)
+
+        self.reload()
+
+    def reload(self) -> None:
+        """
+        Re-read every setting from the store
+        """
+        self.flush(wait=True)
+        for key, (default, value_type) in SETTINGS_DEFAULTS.items():
+            self._snapshot[key] = self._effective(key, self.qsettings.value(key, default, value_type))  # type: ignore
+
+    @staticmethod
+    def _effective(key: str, value):
+        # empty strings fall back to the default
+        default, value_type = SETTINGS_DEFAULTS[key]
+        if value_type is str and not value:
+            return default
+        return value
+
+    def snapshot(self) -> dict[str, object]:
+        return dict(self._snapshot)
+
+    def _get(self, key: str):
+        return self._snapshot[key]
+
+    def _set(self, key: str, new_value) -> None:
+        effective = self._effective(key, new_value)
+        if key not in self._staged and self._snapshot[key] == effective:
+            return
+
+        self._staged[key] = new_value
+        if self._writer is not None:
+            self._flush_timer.start()
+        else:
+            # closed, nothing is written behind any more
+            self.flush(wait=True)
+
+        if self._snapshot[key] != effective:
+            self._snapshot[key] = effective
+            self.settingChanged.emit(key, effective)
+
+    @property
+    def pending(self) -> int:
+        return len(self._staged)
+
+    def flush(self, wait: bool = False) -> None:
+        """
+        Hand the staged values to the writer, wait blocks until they are on disk
+        """
+        self._flush_timer.stop()
+        batch, self._staged = self._staged, {}
+        if self._writer is None:
+            if batch:
+                self._write(self.qsettings, batch)
+            return
+        done = threading.Event() if wait else None
+        if batch or done:
+            self._batches.put((batch, done))
+        if done:
+            done.wait()
+
+    def close(self) -> None:
+        """
+        Write the staged values and stop the writer thread, later calls do nothing
+        """
+        if self._writer is None:
+            return
+        self.flush()
+        self._batches.put(None)
+        self._writer.join()
+        self._writer = None
+
+    def _write(self, store: QSettings, batch: dict[str, object]) -> None:
+        for key, value in batch.items():
+            store.setValue(key, value)
+        store.sync()
+        with self._counter_lock:
+            self.writes += len(batch)
+            self.flushes += 1
+        logger.info(f"Saved {len(batch)} settings: {', '.join(f'{key}={value}' for key, value in batch.items())}")
+
+    def _write_batches(self, path: str, store_format) -> None:
+        store = QSettings(path, store_format)
+        while True:
+            item = self._batches.get()
+            if item is None:
+                return
+            batch, done = item
+            if batch:
+                self._write(store, batch)
+            if done is not None:
+                done.set()
+
     @property
     def mqtt_host(self) -> str:
-        value = self.qsettings.value("mqtt/host", "localhost", str)  # type: ignore
-        return value if value else "localhost"  # type: ignore
+        return self._get("mqtt/host")  # type: ignore
 
     @mqtt_host.setter
     def mqtt_host(self, new_value: str):
-        self.qsettings.setValue("mqtt/host", new_value)
-        logger.info(f"Set value of mqtt/host to {new_value}")
+        self._set("mqtt/host", new_value)
 
     def set_mqtt_host(self, new_value: str):
         self.mqtt_host = new_value
 
     @property
     def mqtt_port(self) -> int:
-        return self.qsettings.value("mqtt/port", 1883, int)  # type: ignore
+        return self._get("mqtt/port")  # type: ignore
 
     @mqtt_port.setter
     def mqtt_port(self, new_value: int):
-        self.qsettings.setValue("mqtt/port", new_value)
-        logger.info(f"Set value of mqtt/port to {new_value}")
+        self._set("mqtt/port", new_value)
 
     def set_mqtt_port(self, new_value: int):
         self.mqtt_port = new_value
 
+    @property
+    def max_publish_rate(self) -> float:
+        return self._get("mqtt/max_publish_rate")  # type: ignore
+
+    @max_publish_rate.setter
+    def max_publish_rate(self, new_value: float):
+        self._set("mqtt/max_publish_rate", new_value)
+
+    def set_max_publish_rate(self, new_value: float):
+        self.max_publish_rate = new_value
+
+    @property
+    def reconnect_min_delay(self) -> float:
+        return self._get("mqtt/reconnect_min_delay")  # type: ignore
+
+    @reconnect_min_delay.setter
+    def reconnect_min_delay(self, new_value: float):
+        self._set("mqtt/reconnect_min_delay", new_value)
+
+    def set_reconnect_min_delay(self, new_value: float):
+        self.reconnect_min_delay = new_value
+
+    @property
+    def reconnect_max_delay(self) -> float:
+        return self._get("mqtt/reconnect_max_delay")  # type: ignore
+
+    @reconnect_max_delay.setter
+    def reconnect_max_delay(self, new_value: float):
+        self._set("mqtt/reconnect_max_delay", new_value)
+
+    def set_reconnect_max_delay(self, new_value: float):
+        self.reconnect_max_delay = new_value
+
+    @property
+    def reconnect_jitter(self) -> float:
+        return self._get("mqtt/reconnect_jitter")  # type: ignore
+
+    @reconnect_jitter.setter
+    def reconnect_jitter(self, new_value: float):
+        self._set("mqtt/reconnect_jitter", new_value)
+
+    def set_reconnect_jitter(self, new_value: float):
+        self.reconnect_jitter = new_value
+
+    @property
+    def offline_queue(self) -> bool:
+        return self._get("mqtt/offline_queue")  # type: ignore
+
+    @offline_queue.setter
+    def offline_queue(self, new_value: bool):
+        self._set("mqtt/offline_queue", new_value)
+
+    def set_offline_queue(self, new_value: bool):
+        self.offline_queue = new_value
+
+    @property
+    def offline_queue_persist(self) -> bool:
+        return self._get("mqtt/offline_queue_persist")  # type: ignore
+
+    @offline_queue_persist.setter
+    def offline_queue_persist(self, new_value: bool):
+        self._set("mqtt/offline_queue_persist", new_value)
+
+    def set_offline_queue_persist(self, new_value: bool):
+        self.offline_queue_persist = new_value
+
+    @property
+    def offline_queue_expiry(self) -> float:
+        return self._get("mqtt/offline_queue_expiry")  # type: ignore
+
+    @offline_queue_expiry.setter
+    def offline_queue_expiry(self, new_value: float):
+        self._set("mqtt/offline_queue_expiry", new_value)
+
+    def set_offline_queue_expiry(self, new_value: float):
+        self.offline_queue_expiry = new_value
+
+    @property
+    def frame_mirror(self) -> bool:
+        return self._get("mqtt/frame_mirror")  # type: ignore
+
+    @frame_mirror.setter
+    def frame_mirror(self, new_value: bool):
+        self._set("mqtt/frame_mirror", new_value)
+
+    def set_frame_mirror(self, new_value: bool):
+        self.frame_mirror = new_value
+
+    @property
+    def latency_correlation(self) -> bool:
+        return self._get("mqtt/latency_correlation")  # type: ignore
+
+    @latency_correlation.setter
+    def latency_correlation(self, new_value: bool):
+        self._set("mqtt/latency_correlation", new_value)
+
+    def set_latency_correlation(self, new_value: bool):
+        self.latency_correlation = new_value
+
     @property
     def data_request_topic(self) -> str:
-        value = self.qsettings.value("mqtt/topics/data_request_topic", "MQTTAnimator/data_request", str)  # type: ignore
-        return value if value else "MQTTAnimator/data_request"  # type: ignore
+        return self._get("mqtt/topics/data_request_topic")  # type: ignore
 
     @data_request_topic.setter
     def data_request_topic(self, new_value: str):
-        self.qsettings.setValue("mqtt/topics/data_request_topic", new_value)
-        logger.info(f"Set value of mqtt/topics/data_request_topic to {new_value}")
+        self._set("mqtt/topics/data_request_topic", new_value)
 
     def set_data_request_topic(self, new_value: str):
         self.data_request_topic = new_value
 
     @property
     def return_data_request_topic(self) -> str:
-        value = self.qsettings.value("mqtt/topics/return_data_request_topic", "MQTTAnimator/rdata_request",
-                                     str)  # type: ignore
-        return value if value else "MQTTAnimator/rdata_request"  # type: ignore
+        return self._get("mqtt/topics/return_data_request_topic")  # type: ignore
 
     @return_data_request_topic.setter
     def return_data_request_topic(self, new_value: str):
-        self.qsettings.setValue("mqtt/topics/return_data_request_topic", new_value)
-        logger.info(f"Set value of mqtt/topics/return_data_request_topic to {new_value}")
+        self._set("mqtt/topics/return_data_request_topic", new_value)
 
     def set_return_data_request_topic(self, new_value: str):
         self.return_data_request_topic = new_value
 
     @property
     def state_topic(self) -> str:
-        value = self.qsettings.value("mqtt/topics/state_topic", "MQTTAnimator/state", str)  # type: ignore
-        return value if value else "MQTTAnimator/state"  # type: ignore
+        return self._get("mqtt/topics/state_topic")  # type: ignore
 
     @state_topic.setter
     def state_topic(self, new_value: str):
-        self.qsettings.setValue("mqtt/topics/state_topic", new_value)
-        logger.info(f"Set value of mqtt/topics/state_topic to {new_value}")
+        self._set("mqtt/topics/state_topic", new_value)
 
     def set_state_topic(self, new_value: str):
         self.state_topic = new_value
 
     @property
     def return_state_topic(self) -> str:
-        value = self.qsettings.value("mqtt/topics/return_state_topic", "MQTTAnimator/rstate", str)  # type: ignore
-        return value if value else "MQTTAnimator/rstate"  # type: ignore
+        return self._get("mqtt/topics/return_state_topic")  # type: ignore
 
     @return_state_topic.setter
     def return_state_topic(self, new_value: str):
-        self.qsettings.setValue("mqtt/topics/return_state_topic", new_value)
-        logger.info(f"Set value of mqtt/topics/return_state_topic to {new_value}")
+        self._set("mqtt/topics/return_state_topic", new_value)
 
     def set_return_state_topic(self, new_value: str):
         self.return_state_topic = new_value
 
     @property
     def brightness_topic(self) -> str:
-        value = self.qsettings.value("mqtt/topics/brightness_topic", "MQTTAnimator/brightness", str)  # type: ignore
-        return value if value else "MQTTAnimator/brightness"  # type: ignore
+        return self._get("mqtt/topics/brightness_topic")  # type: ignore
 
     @brightness_topic.setter
     def brightness_topic(self, new_value: str):
-        self.qsettings.setValue("mqtt/topics/brightness_topic", new_value)
-        logger.info(f"Set value of mqtt/topics/brightness_topic to {new_value}")
+        self._set("mqtt/topics/brightness_topic", new_value)
 
     def set_brightness_topic(self, new_value: str):
         self.brightness_topic = new_value
 
     @property
     def return_brightness_topic(self) -> str:
-        value = self.qsettings.value("mqtt/topics/return_brightness_topic", "MQTTAnimator/rbrightness",
-                                     str)  # type: ignore
-        return value if value else "MQTTAnimator/rbrightness"  # type: ignore
+        return self._get("mqtt/topics/return_brightness_topic")  # type: ignore
 
     @return_brightness_topic.setter
     def return_brightness_topic(self, new_value: str):
-        self.qsettings.setValue("mqtt/topics/return_brightness_topic", new_value)
-        logger.info(f"Set value of mqtt/topics/return_brightness_topic to {new_value}")
+        self._set("mqtt/topics/return_brightness_topic", new_value)
 
     def set_return_brightness_topic(self, new_value: str):
         self.return_brightness_topic = new_value
 
     @property
     def args_topic(self) -> str:
-        value = self.qsettings.value("mqtt/topics/args_topic", "MQTTAnimator/args", str)  # type: ignore
-        return value if value else "MQTTAnimator/args"  # type: ignore
+        return self._get("mqtt/topics/args_topic")  # type: ignore
 
     @args_topic.setter
     def args_topic(self, new_value: str):
-        self.qsettings.setValue("mqtt/topics/args_topic", new_value)
-        logger.info(f"Set value of mqtt/topics/args_topic to {new_value}")
+        self._set("mqtt/topics/args_topic", new_value)
 
     def set_args_topic(self, new_value: str):
         self.args_topic = new_value
 
     @property
     def animation_topic(self) -> str:
-        value = self.qsettings.value("mqtt/topics/animation_topic", "MQTTAnimator/animation", str)  # type: ignore
-        return value if value else "MQTTAnimator/animation"  # type: ignore
+        return self._get("mqtt/topics/animation_topic")  # type: ignore
 
     @animation_topic.setter
     def animation_topic(self, new_value: str):
-        self.qsettings.setValue("mqtt/topics/animation_topic", new_value)
-        logger.info(f"Set value of mqtt/topics/animation_topic to {new_value}")
+        self._set("mqtt/topics/animation_topic", new_value)
 
     def set_animation_topic(self, new_value: str):
         self.animation_topic = new_value
 
     @property
     def return_anim_topic(self) -> str:
-        value = self.qsettings.value("mqtt/topics/return_anim_topic", "MQTTAnimator/ranimation", str)  # type: ignore
-        return value if value else "MQTTAnimator/ranimation"  # type: ignore
+        return self._get("mqtt/topics/return_anim_topic")  # type: ignore
 
     @return_anim_topic.setter
     def return_anim_topic(self, new_value: str):
-        self.qsettings.setValue("mqtt/topics/return_anim_topic", new_value)
-        logger.info(f"Set value of mqtt/topics/return_anim_topic to {new_value}")
+        self._set("mqtt/topics/return_anim_topic", new_value)
 
     def set_return_anim_topic(self, new_value: str):
         self.return_anim_topic = new_value
 
+    @property
+    def frame_topic(self) -> str:
+        return self._get("mqtt/topics/frame_topic")  # type: ignore
+
+    @frame_topic.setter
+    def frame_topic(self, new_value: str):
+        self._set("mqtt/topics/frame_topic", new_value)
+
+    def set_frame_topic(self, new_value: str):
+        self.frame_topic = new_value
+
     @property
     def cursor_style(self) -> CursorSetting:
-        value = self.qsettings.value("app/cursor", CursorSetting.DEFAULT.value, int)  # type: ignore
+        value = self._get("app/cursor")
         return CursorSetting(value) if value else CursorSetting.DEFAULT  # type: ignore
 
     @cursor_style.setter
     def cursor_style(self, new_value: CursorSetting):
-        self.qsettings.setValue("app/cursor", new_value.value)
-        logger.info(f"Set value of app/cursor to {new_value}")
+        self._set("app/cursor", new_value.value)
 
     def set_cursor_style(self, new_value: CursorSetting):
         self.cursor_style = new_value
 
     @property
     def app_title(self) -> str:
-        value = self.qsettings.value("app/title", "NeoPixel Animator", str)  # type: ignore
-        return value if value else "NeoPixel Animator"  # type: ignore
+        return self._get("app/title")  # type: ignore
 
     @app_title.setter
     def app_title(self, new_value: str):
-        self.qsettings.setValue("app/title", new_value)
-        logger.info(f"Set value of app/title to {new_value}")
+        self._set("app/title", new_value)
 
     def set_app_title(self, new_value: str):
         self.app_title = new_value
 
     @property
     def custom_theming(self) -> bool:
-        value = self.qsettings.value("app/custom_theming", True, bool)  # type: ignore
-        return value  # type: ignore
+        return self._get("app/custom_theming")  # type: ignore
 
     @custom_theming.setter
     def custom_theming(self, new_value: bool):
-        self.qsettings.setValue("app/custom_theming", new_value)
-        logger.info(f"Set value of app/custom_theming to {new_value}")
+        self._set("app/custom_theming", new_value)
 
     def set_custom_theming(self, new_value: bool):
         self.custom_theming = new_value
 
     @property
     def dark_mode(self) -> bool:
-        value = self.qsettings.value("app/dark_mode", True, bool)  # type: ignore
-        return value  # type: ignore
+        return self._get("app/dark_mode")  # type: ignore
 
     @dark_mode.setter
     def dark_mode(self, new_value: bool):
-        self.qsettings.setValue("app/dark_mode", new_value)
-        logger.info(f"Set value of app/dark_mode to {new_value}")
+        self._set("app/dark_mode", new_value)
 
     def set_dark_mode(self, new_value: bool):
         self.dark_mode = new_value
 
     @property
     def fullscreen(self) -> bool:
-        value = self.qsettings.value("app/fullscreen", False, bool)  # type: ignore
-        return value  # type: ignore
+        return self._get("app/fullscreen")  # type: ignore
 
     @fullscreen.setter
     def fullscreen(self, new_value: bool):
-        self.qsettings.setValue("app/fullscreen", new_value)
-        logger.info(f"Set value of app/fullscreen to {new_value}")
+        self._set("app/fullscreen", new_value)
 
     def set_fullscreen(self, new_value: bool):
         self.fullscreen = new_value
 
     @property
     def sfx_volume(self) -> float:
-        value = self.qsettings.value("app/sfx_volume", 0.5, float)  # type: ignore
-        return value  # type: ignore
+        return self._get("app/sfx_volume")  # type: ignore
 
     @sfx_volume.setter
     def sfx_volume(self, new_value: float):
-        self.qsettings.setValue("app/sfx_volume", new_value)
-        logger.info(f"Set value of app/sfx_volume to {new_value}")
+        self._set("app/sfx_volume", new_value)
 
     def set_sfx_volume(self, new_value: float):
         self.sfx_volume = new_value
+
+    @property
+    def warm_up_pages(self) -> bool:
+        return self._get("app/warm_up_pages")  # type: ignore
+
+    @warm_up_pages.setter
+    def warm_up_pages(self, new_value: bool):
+        self._set("app/warm_up_pages", new_value)
+
+    def set_warm_up_pages(self, new_value: bool):
+        self.warm_up_pages = new_value
@@ -0,0 +1,550 @@
+"""
+/// NeoPixel Animator Simulator ///
+DESCRIPTION: Simulated NeoPixelAnimator controllers and a minimal local MQTT broker for load testing
+LICENSE: GPLv3
+"""
+
+import argparse
+import dataclasses
+import heapq
+import itertools
+import json
+import random
+import socket
+import socketserver
+import struct
+import threading
+import time
+from typing import Callable
+
+from loguru import logger
+from paho.mqtt.client import topic_matches_sub
+
+from animation_data import AnimationArgs, AnimationState
+from frames import FrameEncoder
+from preview import PreviewEngine
+
+# callback(topic, payload, correlation data)
+BusCallback = Callable[[str, bytes, bytes | None], None]
+
+ANIMATIONS = [
+    "SingleColor", "Rainbow", "GlitterRainbow", "Colorloop", "Magic", "Fire", "ColoredLights",
+    "Fade", "Flash", "Wipe", "Firework", "Random", "RandomColor",
+]
+
+
+class InProcessBus:
+    """
+    Topic router with MQTT wildcard support, used instead of a broker
+    """
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._subscriptions: dict[int, tuple[str, BusCallback]] = {}
+        self._ids = itertools.count()
+        self.published = 0
+
+    def subscribe(self, topic_filter: str, callback: BusCallback) -> int:
+        with self._lock:
+            handle = next(self._ids)
+            self._subscriptions[handle] = (topic_filter, callback)
+        return handle
+
+    def unsubscribe(self, handle: int) -> None:
+        with self._lock:
+            self._subscriptions.pop(handle, None)
+
+    def publish(self, topic: str, payload: bytes | str, correlation: bytes | None = None) -> None:
+        if isinstance(payload, str):
+            payload = payload.encode("utf-8")
+        with self._lock:
+            targets = [
+                callback for topic_filter, callback in self._subscriptions.values()
+                if topic_matches_sub(topic_filter, topic)
+            ]
+            self.published += 1
+        for callback in targets:
+            callback(topic, payload, correlation)
+
+
+class _DelayQueue:
+    """
+    Single thread that runs callbacks after a delay
+    """
+
+    def __init__(self) -> None:
+        self._heap: list[tuple[float, int, Callable[[], None]]] = []
+        self._order = itertools.count()
+        self._cond = threading.Condition()
+        self._running = True
+        self._thread = threading.Thread(target=self._run, name="simulator-delay", daemon=True)
+        self._thread.start()
+
+    def call_later(self, delay: float, callback: Callable[[], None]) -> None:
+        with self._cond:
+            heapq.heappush(self._heap, (time.monotonic() + delay, next(self._order), callback))
+            self._cond.notify()
+
+    def stop(self) -> None:
+        with self._cond:
+            self._running = False
+            self._cond.notify()
+        self._thread.join()
+
+    def _run(self) -> None:
+        while True:
+            with self._cond:
+                while self._running and (not self._heap or self._heap[0][0] > time.monotonic()):
+                    self._cond.wait(self._heap[0][0] - time.monotonic() if self._heap else None)
+                if not self._running:
+                    return
+                _, _, callback = heapq.heappop(self._heap)
+            callback()
+
+
+class ControllerSimulator:
+    """
+    Simulated NeoPixelAnimator controller speaking the same topic protocol as the real one.
+
+    Commands are answered on the return topics after `latency` seconds (+/- `jitter`).
+    Correlation data on a command is copied to its response, like a MQTTv5 responder.
+    """
+
+    def __init__(
+        self,
+        bus: InProcessBus,
+        prefix: str = "MQTTAnimator",
+        num_leds: int = 100,
+        latency: float = 0.0,
+        jitter: float = 0.0,
+    ) -> None:
+        self.bus = bus
+        self.prefix = prefix
+        self.num_leds = num_leds
+        self.latency = latency
+        self.jitter = jitter
+
+        self.state = AnimationState()
+        self.args = AnimationArgs()
+
+        self.commands = 0
+        self.responses = 0
+
+        self._delay = _DelayQueue()
+        self._storm: threading.Thread | None = None
+        self._storm_stop = threading.Event()
+        self._frames: threading.Thread | None = None
+        self._frames_stop = threading.Event()
+        self.frame_bytes = 0
+
+        self._handlers: dict[str, Callable[[str, bytes | None], None]] = {
+            f"{prefix}/state": self._on_state,
+            f"{prefix}/brightness": self._on_brightness,
+            f"{prefix}/animation": self._on_animation,
+            f"{prefix}/args": self._on_args,
+            f"{prefix}/data_request": self._on_data_request,
+        }
+        self._subscriptions = [bus.subscribe(topic, self._on_message) for topic in self._handlers]
+
+    def close(self) -> None:
+        self.stop_storm()
+        self.stop_frames()
+        for handle in self._subscriptions:
+            self.bus.unsubscribe(handle)
+        self._delay.stop()
+
+    def _on_message(self, topic: str, payload: bytes, correlation: bytes | None) -> None:
+        self.commands += 1
+        handler = self._handlers.get(topic)
+        if handler:
+            try:
+                handler(payload.decode("utf-8"), correlation)
+            except (ValueError, TypeError, AttributeError) as e:
+                logger.warning(f"Simulator {self.prefix} ignored bad command on {topic}: {e!r}")
+
+    def _respond(self, topic: str, payload: str, correlation: bytes | None = None) -> None:
+        def send():
+            self.responses += 1
+            self.bus.publish(f"{self.prefix}/{topic}", payload, correlation)
+
+        delay = self.latency + random.uniform(-self.jitter, self.jitter)
+        if delay <= 0:
+            send()
+        else:
+            self._delay.call_later(delay, send)
+
+    def _on_state(self, payload: str, correlation: bytes | None) -> None:
+        self.state.state = "ON" if payload == "ON" else "OFF"
+        self._respond("rstate", self.state.state, correlation)
+
+    def _on_brightness(self, payload: str, correlation: bytes | None) -> None:
+        self.state.brightness = max(0, min(255, int(payload)))
+        self._respond("rbrightness", str(int(self.state.brightness)), correlation)
+
+    def _on_animation(self, payload: str, correlation: bytes | None) -> None:
+        self.state.effect = payload
+        self._respond("ranimation", payload, correlation)
+
+    def _on_args(self, payload: str, correlation: bytes | None) -> None:
+        section, _, body = payload.partition(",")
+        section_args = getattr(self.args, section)
+        for key, value in json.loads(body).items():
+            if hasattr(section_args, key):
+                setattr(section_args, key, value)
+
+    def _on_data_request(self, payload: str, correlation: bytes | None) -> None:
+        if payload == "request_type_full":
+            self._respond("rdata_request", self.full_response(), correlation)
+        elif payload == "request_type_args":
+            self._respond("rdata_request", json.dumps({"args": self.args_json()}), correlation)
+
+    def args_json(self) -> str:
+        return json.dumps(dataclasses.asdict(self.args))
+
+    def full_response(self) -> str:
+        return json.dumps({
+            "state": self.state.state,
+            "animation": self.state.effect,
+            "brightness": int(self.state.brightness),
+            "args": self.args_json(),
+            "num_leds": self.num_leds,
+        })
+
+    def storm(self, rate: float, duration: float | None = None) -> None:
+        """
+        Publish unsolicited state changes at `rate` messages per second
+        """
+        self.stop_storm()
+        self._storm_stop.clear()
+        self._storm = threading.Thread(target=self._run_storm, args=(rate, duration), daemon=True)
+        self._storm.start()
+
+    def stop_storm(self) -> None:
+        if self._storm is not None:
+            self._storm_stop.set()
+            self._storm.join()
+            self._storm = None
+
+    def _run_storm(self, rate: float, duration: float | None) -> None:
+        interval = 1 / rate
+        end = None if duration is None else time.monotonic() + duration
+        next_send = time.monotonic()
+        for i in itertools.count():
+            if self._storm_stop.is_set() or (end is not None and time.monotonic() >= end):
+                return
+            kind = i % 4
+            if kind == 0:
+                self.bus.publish(f"{self.prefix}/rstate", random.choice(("ON", "OFF")))
+            elif kind == 1:
+                self.bus.publish(f"{self.prefix}/rbrightness", str(random.randint(1, 255)))
+            elif kind == 2:
+                self.bus.publish(f"{self.prefix}/ranimation", random.choice(ANIMATIONS))
+            else:
+                self.bus.publish(f"{self.prefix}/rdata_request", self.full_response())
+            self.responses += 1
+
+            next_send += interval
+            wait = next_send - time.monotonic()
+            if wait > 0:
+                self._storm_stop.wait(wait)
+
+    def stream_frames(self, fps: float = 30) -> None:
+        """
+        Publish the rendered strip on the rframe topic at `fps` frames per second
+        """
+        self.stop_frames()
+        self._frames_stop.clear()
+        self._frames = threading.Thread(target=self._run_frames, args=(fps,), daemon=True)
+        self._frames.start()
+
+    def stop_frames(self) -> None:
+        if self._frames is not None:
+            self._frames_stop.set()
+            self._frames.join()
+            self._frames = None
+
+    def _run_frames(self, fps: float) -> None:
+        engine = PreviewEngine(self.num_leds)
+        engine.args = self.args
+        encoder = FrameEncoder()
+        interval = 1 / fps
+        start = next_send = time.monotonic()
+        while not self._frames_stop.is_set():
+            engine.animation = self.state.effect
+            engine.powered = self.state.state == "ON"
+            engine.brightness = int(self.state.brightness)
+            payload = encoder.encode(engine.render(time.monotonic() - start))
+            self.bus.publish(f"{self.prefix}/rframe", payload)
+            self.frame_bytes += len(payload)
+
+            next_send += interval
+            wait = next_send - time.monotonic()
+            if wait > 0:
+                self._frames_stop.wait(wait)
+
+
+# MQTT control packet types
+_CONNECT = 1
+_CONNACK = 2
+_PUBLISH = 3
+_PUBACK = 4
+_SUBSCRIBE = 8
+_SUBACK = 9
+_UNSUBSCRIBE = 10
+_UNSUBACK = 11
+_PINGREQ = 12
+_PINGRESP = 13
+_DISCONNECT = 14
+
+# MQTTv5 property identifiers
+_PROP_CORRELATION_DATA = 0x09
+
+
+def _encode_varint(value: int) -> bytes:
+    out = bytearray()
+    while True:
+        byte = value % 128
+        value //= 128
+        out.append(byte | 0x80 if value else byte)
+        if not value:
+            return bytes(out)
+
+
+def _decode_varint(data: bytes, pos: int) -> tuple[int, int]:
+    value, shift = 0, 0
+    while True:
+        byte = data[pos]
+        pos += 1
+        value |= (byte & 0x7F) << shift
+        if not byte & 0x80:
+            return value, pos
+        shift += 7
+
+
+def _encode_str(value: str | bytes) -> bytes:
+    if isinstance(value, str):
+        value = value.encode("utf-8")
+    return struct.pack("!H", len(value)) + value
+
+
+def _decode_str(data: bytes, pos: int) -> tuple[bytes, int]:
+    (length,) = struct.unpack_from("!H", data, pos)
+    return data[pos + 2: pos + 2 + length], pos + 2 + length
+
+
+def _packet(packet_type: int, body: bytes, flags: int = 0) -> bytes:
+    return bytes([packet_type << 4 | flags]) + _encode_varint(len(body)) + body
+
+
+def _find_correlation(properties: bytes) -> bytes | None:
+    # only correlation data is forwarded, other properties are skipped by their encoding
+    fixed = {0x01: 1, 0x02: 4, 0x11: 4, 0x13: 2, 0x17: 1, 0x18: 4, 0x19: 1, 0x21: 2, 0x22: 2,
+             0x23: 2, 0x24: 1, 0x25: 1, 0x27: 4, 0x28: 1, 0x29: 1, 0x2A: 1}
+    pos = 0
+    while pos < len(properties):
+        identifier, pos = _decode_varint(properties, pos)
+        if identifier == _PROP_CORRELATION_DATA:
+            return _decode_str(properties, pos)[0]
+        if identifier in fixed:
+            pos += fixed[identifier]
+        elif identifier == 0x0B:
+            pos = _decode_varint(properties, pos)[1]
+        elif identifier == 0x26:
+            pos = _decode_str(properties, _decode_str(properties, pos)[1])[1]
+        else:
+            pos = _decode_str(properties, pos)[1]
+    return None
+
+
+class _BrokerConnection(socketserver.BaseRequestHandler):
+    server: "_BrokerServer"
+
+    def setup(self) -> None:
+        self.request.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        self.write_lock = threading.Lock()
+        self.version = 4
+        self.subscriptions: dict[str, int] = {}
+
+    def send(self, data: bytes) -> None:
+        with self.write_lock:
+            try:
+                self.request.sendall(data)
+            except OSError:
+                pass
+
+    def deliver(self, topic: str, payload: bytes, correlation: bytes | None) -> None:
+        body = _encode_str(topic)
+        if self.version == 5:
+            properties = b""
+            if correlation is not None:
+                properties = bytes([_PROP_CORRELATION_DATA]) + _encode_str(correlation)
+            body += _encode_varint(len(properties)) + properties
+        self.send(_packet(_PUBLISH, body + payload))
+
+    def read_packet(self, stream) -> tuple[int, int, bytes] | None:
+        header = stream.read(1)
+        if not header:
+            return None
+        length, shift = 0, 0
+        while True:
+            byte = stream.read(1)
+            if not byte:
+                return None
+            length |= (byte[0] & 0x7F) << shift
+            if not byte[0] & 0x80:
+                break
+            shift += 7
+        body = stream.read(length)
+        if len(body) < length:
+            return None
+        return header[0] >> 4, header[0] & 0x0F, body
+
+    def handle(self) -> None:
+        stream = self.request.makefile("rb")
+        try:
+            while True:
+                packet = self.read_packet(stream)
+                if packet is None or not self.on_packet(*packet):
+                    return
+        except (OSError, IndexError, struct.error):
+            return
+        finally:
+            for handle in self.subscriptions.values():
+                self.server.bus.unsubscribe(handle)
+
+    def on_packet(self, packet_type: int, flags: int, body: bytes) -> bool:
+        if packet_type == _CONNECT:
+            _, pos = _decode_str(body, 0)
+            self.version = body[pos]
+            self.send(_packet(_CONNACK, b"\x00\x00\x00" if self.version == 5 else b"\x00\x00"))
+        elif packet_type == _PUBLISH:
+            qos = (flags >> 1) & 0x03
+            topic, pos = _decode_str(body, 0)
+            packet_id = body[pos: pos + 2]
+            if qos:
+                pos += 2
+            correlation = None
+            if self.version == 5:
+                length, pos = _decode_varint(body, pos)
+                correlation = _find_correlation(body[pos: pos + length])
+                pos += length
+            if qos:
+                self.send(_packet(_PUBACK, packet_id))
+            self.server.bus.publish(topic.decode("utf-8"), body[pos:], correlation)
+        elif packet_type == _SUBSCRIBE:
+            packet_id, pos = body[:2], 2
+            if self.version == 5:
+                length, pos = _decode_varint(body, pos)
+                pos += length
+            granted = bytearray()
+            while pos < len(body):
+                topic_filter, pos = _decode_str(body, pos)
+                pos += 1
+                topic_filter = topic_filter.decode("utf-8")
+                if topic_filter not in self.subscriptions:
+                    self.subscriptions[topic_filter] = self.server.bus.subscribe(topic_filter, self.deliver)
+                granted.append(0)
+            self.send(_packet(_SUBACK, packet_id + (b"\x00" if self.version == 5 else b"") + granted))
+        elif packet_type == _UNSUBSCRIBE:
+            packet_id, pos = body[:2], 2
+            if self.version == 5:
+                length, pos = _decode_varint(body, pos)
+                pos += length
+            codes = bytearray()
+            while pos < len(body):
+                topic_filter, pos = _decode_str(body, pos)
+                handle = self.subscriptions.pop(topic_filter.decode("utf-8"), None)
+                if handle is not None:
+                    self.server.bus.unsubscribe(handle)
+                codes.append(0)
+            self.send(_packet(_UNSUBACK, packet_id + (b"\x00" + codes if self.version == 5 else b"")))
+        elif packet_type == _PINGREQ:
+            self.send(_packet(_PINGRESP, b""))
+        elif packet_type == _DISCONNECT:
+            return False
+        return True
+
+
+class _BrokerServer(socketserver.ThreadingTCPServer):
+    daemon_threads = True
+    allow_reuse_address = True
+
+    def __init__(self, address: tuple[str, int], bus: InProcessBus) -> None:
+        self.bus = bus
+        super().__init__(address, _BrokerConnection)
+
+
+class LocalBroker:
+    """
+    Minimal MQTT 3.1.1/5 broker stand-in for tests and benchmarks.
+    Only QoS 0 delivery, no retained messages, sessions or authentication
+    """
+
+    def __init__(self, host: str = "127.0.0.1", port: int = 0, bus: InProcessBus | None = None) -> None:
+        self.bus = bus or InProcessBus()
+        self._server = _BrokerServer((host, port), self.bus)
+        self._thread: threading.Thread | None = None
+
+    @property
+    def address(self) -> tuple[str, int]:
+        return self._server.server_address[:2]
+
+    def start(self) -> "LocalBroker":
+        self._thread = threading.Thread(target=self._server.serve_forever, name="local-broker", daemon=True)
+        self._thread.start()
+        logger.info(f"Local broker listening on {self.address[0]}:{self.address[1]}")
+        return self
+
+    def stop(self) -> None:
+        self._server.shutdown()
+        self._server.server_close()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Simulated NeoPixelAnimator controllers")
+    parser.add_argument("--host", default="127.0.0.1", help="address for the local broker")
+    parser.add_argument("--port", type=int, default=1883, help="port for the local broker")
+    parser.add_argument("--prefix", default="MQTTAnimator", help="topic prefix of the first controller")
+    parser.add_argument("--instances", type=int, default=1, help="number of simulated controllers")
+    parser.add_argument("--leds", type=int, default=100, help="LEDs per controller")
+    parser.add_argument("--latency", type=float, default=0.0, help="response latency in seconds")
+    parser.add_argument("--jitter", type=float, default=0.0, help="response latency jitter in seconds")
+    parser.add_argument("--storm", type=float, default=0.0, help="unsolicited messages per second per controller")
+    parser.add_argument("--frames", type=float, default=0.0, help="frames per second on the rframe topic")
+    args = parser.parse_args()
+
+    broker = LocalBroker(args.host, args.port).start()
+    controllers = [
+        ControllerSimulator(
+            broker.bus,
+            args.prefix if i == 0 else f"{args.prefix}{i + 1}",
+            num_leds=args.leds,
+            latency=args.latency,
+            jitter=args.jitter,
+        )
+        for i in range(args.instances)
+    ]
+    if args.storm > 0:
+        for controller in controllers:
+            controller.storm(args.storm)
+    if args.frames > 0:
+        for controller in controllers:
+            controller.stream_frames(args.frames)
+    logger.info(f"Simulating {len(controllers)} controllers: {', '.join(c.prefix for c in controllers)}")
+
+    try:
+        while True:
+            time.sleep(1)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        for controller in controllers:
+            controller.close()
+        broker.stop()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,204 @@
+import math
+
+import numpy as np
+from qtpy.QtCore import QRectF, QSize, Signal
+from qtpy.QtGui import QImage, QPainter
+from qtpy.QtWidgets import QSizePolicy, QWidget
+
+# fewest LEDs a view can be zoomed in to
+MIN_VIEW_LEDS = 8
+ZOOM_STEP = 1.25
+
+
+class LodPyramid:
+    """
+    Max or mean pooled copies of one frame, each level half the length of the one below.
+
+    Levels are only built when a view needs them and are kept until the next frame, so
+    zooming and panning a frame never pools the whole strip again. Sampling a view pools
+    the smallest level that still has at least one LED per output pixel.
+    """
+
+    def __init__(self, mode: str = "max") -> None:
+        if mode not in ("max", "mean"):
+            raise ValueError(f"Unknown pooling mode {mode}")
+        self.mode = mode
+        self.m_levels: list[np.ndarray] = []
+        self.m_built = 0
+
+    @property
+    def num_leds(self) -> int:
+        return len(self.m_levels[0]) if self.m_levels else 0
+
+    def set_frame(self, frame: np.ndarray) -> None:
+        if self.m_levels and len(self.m_levels[0]) != len(frame):
+            # level buffers are reused while the size stays the same
+            self.m_levels = []
+        if self.m_levels:
+            self.m_levels[0] = frame
+        else:
+            self.m_levels = [frame]
+        self.m_built = 1
+
+    def level(self, k: int) -> np.ndarray:
+        while self.m_built <= k and len(self.m_levels[self.m_built - 1]) > 1:
+            below = self.m_levels[self.m_built - 1]
+            pairs = len(below) // 2
+            if self.m_built == len(self.m_levels):
+                self.m_levels.append(np.empty(((len(below) + 1) // 2, 3), dtype=np.uint8))
+            level = self.m_levels[self.m_built]
+            even, odd = below[0 : pairs * 2 : 2], below[1 : pairs * 2 : 2]
+            if self.mode == "max":
+                np.maximum(even, odd, out=level[:pairs])
+            else:
+                level[:pairs] = (even.astype(np.uint16) + odd + 1) >> 1
+            if len(below) % 2:
+                level[pairs] = below[-1]
+            self.m_built += 1
+        return self.m_levels[min(k, self.m_built - 1)]
+
+    def sample(self, start: float, end: float, width: int, out: np.ndarray | None = None) -> np.ndarray:
+        """Pool the LEDs in [start, end) to width pixels
+
+        Args:
+            start (float): First LED of the view
+            end (float): End of the view in LEDs
+            width (int): Number of output pixels
+            out (np.ndarray | None, optional): (width, 3) uint8 array to pool into. Defaults to None.
+
+        Returns:
+            np.ndarray: (width, 3) uint8 pixels
+        """
+        if out is None:
+            out = np.empty((width, 3), dtype=np.uint8)
+        span = max(end - start, 1e-9)
+        k = max(0, int(math.floor(math.log2(span / width)))) if span > width else 0
+        level = self.level(k)
+        scale = self.num_leds / len(level)
+
+        edges = np.linspace(start / scale, end / scale, width + 1)
+        starts = np.clip(edges[:-1].astype(np.intp), 0, len(level) - 1)
+        stop = min(len(level), max(int(math.ceil(edges[-1])), int(starts[-1]) + 1))
+        # reduceat pools [starts[i], starts[i + 1]), a repeated start yields that single LED
+        segment = level[:stop]
+        if self.mode == "max":
+            np.maximum.reduceat(segment, starts, axis=0, out=out)
+        else:
+            sums = np.add.reduceat(segment, starts, axis=0, dtype=np.uint32)
+            counts = np.maximum(np.diff(np.append(starts, stop)), 1).astype(np.uint32)
+            np.floor_divide(sums, counts[:, None], out=sums)
+            out[:] = sums
+        return out
+
+
+class StripView(QWidget):
+    """
+    Shows a strip frame at any number of LEDs.
+
+    When the view has more LEDs than the widget has pixels, the frame is pooled down to
+    the pixel width through a per-frame LodPyramid, otherwise the visible LEDs are drawn
+    directly. The wheel zooms around the cursor, dragging pans and a double click shows
+    the whole strip again.
+    """
+
+    viewChanged = Signal(float, float)
+
+    def __init__(self, pooling: str = "max", parent=None) -> None:
+        super(StripView, self).__init__(parent)
+        self.setSizePolicy(QSizePolicy.Policy.Expanding, QSizePolicy.Policy.Fixed)
+        self.setFixedHeight(32)
+
+        self.m_pyramid = LodPyramid(pooling)
+        self.m_frame: np.ndarray | None = None
+        # None shows the whole strip
+        self.m_view: tuple[float, float] | None = None
+        self.m_line: np.ndarray | None = None
+        self.m_line_image: QImage | None = None
+        self.m_drag: tuple[float, float] | None = None
+
+    @property
+    def num_leds(self) -> int:
+        return 0 if self.m_frame is None else len(self.m_frame)
+
+    def set_frame(self, frame: np.ndarray) -> None:
+        """
+        Show a (num_leds, 3) uint8 frame, the array is read until the next frame is set
+        """
+        resized = len(frame) != self.num_leds
+        self.m_frame = frame
+        self.m_pyramid.set_frame(frame)
+        if resized and self.m_view is not None:
+            self.set_view(*self.m_view)
+        self.update()
+
+    def view(self) -> tuple[float, float]:
+        return self.m_view if self.m_view is not None else (0.0, float(self.num_leds))
+
+    def set_view(self, start: float, end: float) -> None:
+        n = self.num_leds
+        span = min(max(end - start, min(MIN_VIEW_LEDS, n)), n)
+        start = min(max(start, 0.0), n - span)
+        self.m_view = None if span >= n else (start, start + span)
+        self.viewChanged.emit(*self.view())
+        self.update()
+
+    def reset_view(self) -> None:
+        self.m_view = None
+        self.viewChanged.emit(*self.view())
+        self.update()
+
+    def sizeHint(self) -> QSize:
+        return QSize(400, 32)
+
+    def _line_image(self, width: int) -> tuple[np.ndarray, QImage]:
+        if self.m_line is None or len(self.m_line[0]) != width:
+            self.m_line = np.zeros((1, width, 3), dtype=np.uint8)
+            self.m_line_image = QImage(self.m_line.data, width, 1, width * 3, QImage.Format.Format_RGB888)
+        return self.m_line, self.m_line_image
+
+    def paintEvent(self, event):
+        if self.m_frame is None or not self.num_leds:
+            return
+        painter = QPainter(self)
+        start, end = self.view()
+        width = max(1, round(self.width() * self.devicePixelRatioF()))
+
+        if end - start > width:
+            line, image = self._line_image(width)
+            self.m_pyramid.sample(start, end, width, line[0])
+            painter.drawImage(self.rect(), image)
+            return
+
+        # zoomed in far enough for every LED to get at least one pixel
+        first = int(start)
+        visible = self.m_frame[first:min(self.num_leds, int(math.ceil(end)))]
+        image = QImage(visible.data, len(visible), 1, len(visible) * 3, QImage.Format.Format_RGB888)
+        painter.drawImage(QRectF(self.rect()), image, QRectF(start - first, 0, end - start, 1))
+
+    def wheelEvent(self, event):
+        if not self.num_leds:
+            return
+        start, end = self.view()
+        factor = ZOOM_STEP ** (-event.angleDelta().y() / 120)
+        anchor = start + (end - start) * event.position().x() / max(1, self.width())
+        self.set_view(anchor - (anchor - start) * factor, anchor + (end - anchor) * factor)
+        event.accept()
+
+    def mousePressEvent(self, event):
+        self.m_drag = (event.position().x(), self.view()[0])
+        super().mousePressEvent(event)
+
+    def mouseMoveEvent(self, event):
+        if self.m_drag is None or self.m_view is None:
+            return
+        x, origin = self.m_drag
+        start, end = self.view()
+        offset = (x - event.position().x()) * (end - start) / max(1, self.width())
+        self.set_view(origin + offset, origin + offset + end - start)
+
+    def mouseReleaseEvent(self, event):
+        self.m_drag = None
+        super().mouseReleaseEvent(event)
+
+    def mouseDoubleClickEvent(self, event):
+        self.reset_view()
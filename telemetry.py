@@ -0,0 +1,160 @@
+from collections import deque
+from dataclasses import dataclass
+import bisect
+import csv
+import json
+import math
+import threading
+import time
+
+
+class LatencyHistogram:
+    """
+    Rolling window of latency samples, with all-time counts per bucket
+    """
+
+    BUCKETS_MS: tuple[float, ...] = (1, 2, 5, 10, 20, 50, 100, 200, 500, 1000, 2000, 5000, math.inf)
+
+    def __init__(self, window: int = 1024) -> None:
+        self.samples: deque[float] = deque(maxlen=window)
+        self.buckets: list[int] = [0] * len(self.BUCKETS_MS)
+        self.count = 0
+        self.lost = 0
+
+    def add(self, seconds: float) -> None:
+        ms = seconds * 1000
+        self.samples.append(ms)
+        self.buckets[bisect.bisect_left(self.BUCKETS_MS, ms)] += 1
+        self.count += 1
+
+    def percentile(self, p: float) -> float | None:
+        """
+        Nearest-rank percentile of the window in milliseconds
+        """
+        if not self.samples:
+            return None
+        ordered = sorted(self.samples)
+        return ordered[min(len(ordered) - 1, max(0, math.ceil(p / 100 * len(ordered)) - 1))]
+
+    def summary(self) -> dict:
+        return {
+            "count": self.count,
+            "lost": self.lost,
+            "p50": self.percentile(50),
+            "p95": self.percentile(95),
+            "p99": self.percentile(99),
+            "min": min(self.samples) if self.samples else None,
+            "max": max(self.samples) if self.samples else None,
+            "buckets": {
+                ("inf" if math.isinf(bound) else str(bound)): count
+                for bound, count in zip(self.BUCKETS_MS, self.buckets)
+            },
+        }
+
+
+@dataclass(slots=True)
+class _Pending:
+    command_topic: str
+    sent: float
+    correlation: bytes | None
+
+
+class LatencyTracker:
+    """
+    Matches commands to their echo on the return topic and records the round trip.
+
+    Echoes carrying MQTTv5 correlation data are matched exactly. Otherwise the oldest
+    outstanding command for the return topic is used, unless the pair is correlation-only.
+    Commands without an echo within the timeout are counted as lost.
+    Safe to call from the GUI and network threads.
+    """
+
+    def __init__(self, timeout: float = 10.0) -> None:
+        self.timeout = timeout
+        self._lock = threading.Lock()
+        self._pairs: dict[str, tuple[str, bool]] = {}
+        self._pending: dict[str, deque[_Pending]] = {}
+        self._histograms: dict[str, LatencyHistogram] = {}
+
+    def set_pairs(self, pairs: dict[str, tuple[str, bool]]) -> None:
+        """
+        Set {command topic: (return topic, match in order without correlation data)}
+        """
+        with self._lock:
+            self._pairs = dict(pairs)
+            self._pending = {return_topic: deque() for return_topic, _ in pairs.values()}
+            self._histograms = {
+                command_topic: self._histograms.get(command_topic) or LatencyHistogram()
+                for command_topic in pairs
+            }
+
+    def return_topic(self, command_topic: str) -> str | None:
+        pair = self._pairs.get(command_topic)
+        return pair[0] if pair else None
+
+    def sent(self, topic: str, correlation: bytes | None = None, at: float | None = None) -> None:
+        at = time.monotonic() if at is None else at
+        with self._lock:
+            pair = self._pairs.get(topic)
+            if pair is None:
+                return
+            self._expire(pair[0], at)
+            self._pending[pair[0]].append(_Pending(topic, at, correlation))
+
+    def received(self, topic: str, correlation: bytes | None = None, at: float | None = None) -> None:
+        with self._lock:
+            pending = self._pending.get(topic)
+            if not pending:
+                return
+            at = time.monotonic() if at is None else at
+            self._expire(topic, at)
+
+            match = None
+            if correlation is not None:
+                for item in pending:
+                    if item.correlation == correlation:
+                        match = item
+                        break
+            else:
+                for item in pending:
+                    if self._pairs[item.command_topic][1]:
+                        match = item
+                        break
+            if match is None:
+                return
+            pending.remove(match)
+            self._histograms[match.command_topic].add(at - match.sent)
+
+    def _expire(self, return_topic: str, now: float) -> None:
+        pending = self._pending[return_topic]
+        while pending and now - pending[0].sent > self.timeout:
+            item = pending.popleft()
+            # correlation-only commands are not expected to be echoed by every controller
+            if self._pairs[item.command_topic][1]:
+                self._histograms[item.command_topic].lost += 1
+
+    def summary(self) -> dict[str, dict]:
+        with self._lock:
+            return {topic: histogram.summary() for topic, histogram in self._histograms.items()}
+
+    def reset(self) -> None:
+        with self._lock:
+            for pending in self._pending.values():
+                pending.clear()
+            self._histograms = {topic: LatencyHistogram() for topic in self._pairs}
+
+    def export(self, path: str) -> None:
+        """
+        Write the summary as JSON, or CSV if the path ends in .csv
+        """
+        summary = self.summary()
+        if path.endswith(".csv"):
+            with open(path, "w", newline="", encoding="utf-8") as f:
+                writer = csv.writer(f)
+                writer.writerow(["topic", "count", "lost", "p50_ms", "p95_ms", "p99_ms", "min_ms", "max_ms"])
+                columns = ("count", "lost", "p50", "p95", "p99", "min", "max")
+                for topic, stats in summary.items():
+                    writer.writerow([topic] + [stats[key] for key in columns])
+        else:
+            with open(path, "w", encoding="utf-8") as f:
+                json.dump(summary, f, indent=2)
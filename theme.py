@@ -0,0 +1,136 @@
+import hashlib
+import json
+import os
+
+import qdarktheme
+from qtpy.QtGui import QFontDatabase
+from loguru import logger
+
+# bump when the way stylesheets are combined changes
+THEME_CACHE_VERSION = 1
+
+DARK_COLORS = {
+    "[dark]": {
+        "primary": "#F44336",
+        "background": "#000912",
+        "border": "#263238",
+    }
+}
+
+FONTS = ["assets/fonts/Roboto/Roboto/Roboto-Regular.ttf"]
+
+_fonts_registered = False
+
+
+def register_fonts() -> None:
+    """Register the application fonts, only the first call in a process does any work"""
+    global _fonts_registered
+    if _fonts_registered:
+        return
+    for path in FONTS:
+        if QFontDatabase.addApplicationFont(path) == -1:
+            logger.warning(f"Could not load font {path}")
+    _fonts_registered = True
+
+
+class ThemeCompiler:
+    """
+    Combines the qdarktheme stylesheet with style.qss once per (theme, custom colors, qss hash).
+
+    Results are kept in memory and written to a cache directory, so later starts and theme
+    switches only read the compiled stylesheet.
+    """
+
+    def __init__(self, qss_path: str = "style.qss", cache_dir: str | None = None) -> None:
+        self.qss_path = qss_path
+        self.cache_dir: str | None = None
+        self.m_compiled: dict[str, str] = {}
+        self.m_qss: tuple[tuple[int, int], str, str] | None = None
+
+        self.hits = 0
+        self.disk_hits = 0
+        self.compiles = 0
+
+        self.set_cache_dir(cache_dir)
+
+    def set_cache_dir(self, path: str | None) -> None:
+        """
+        Set the directory for compiled stylesheets, None keeps them in memory only
+        """
+        self.cache_dir = path
+        if path is None:
+            return
+        try:
+            os.makedirs(path, exist_ok=True)
+        except OSError as e:
+            logger.warning(f"Theme disk cache disabled, could not create {path}: {e}")
+            self.cache_dir = None
+
+    def _read_qss(self) -> tuple[str, str]:
+        stat = os.stat(self.qss_path)
+        signature = (stat.st_mtime_ns, stat.st_size)
+        if self.m_qss is None or self.m_qss[0] != signature:
+            with open(self.qss_path, "r", encoding="utf-8") as qss:
+                content = qss.read()
+            self.m_qss = (signature, content, hashlib.sha256(content.encode("utf-8")).hexdigest())
+        return self.m_qss[1], self.m_qss[2]
+
+    def key(self, theme: str, custom_colors: dict | None = None) -> str:
+        _, qss_hash = self._read_qss()
+        material = json.dumps(
+            [THEME_CACHE_VERSION, qdarktheme.__version__, theme, custom_colors, qss_hash], sort_keys=True
+        )
+        return hashlib.sha256(material.encode("utf-8")).hexdigest()[:32]
+
+    def _path(self, theme: str, key: str) -> str | None:
+        return os.path.join(self.cache_dir, f"{theme}-{key}.qss") if self.cache_dir else None
+
+    def is_cached(self, theme: str, custom_colors: dict | None = None) -> bool:
+        key = self.key(theme, custom_colors)
+        path = self._path(theme, key)
+        return key in self.m_compiled or (path is not None and os.path.exists(path))
+
+    def stylesheet(self, theme: str, custom_colors: dict | None = None) -> str:
+        key = self.key(theme, custom_colors)
+        compiled = self.m_compiled.get(key)
+        if compiled is not None:
+            self.hits += 1
+            return compiled
+
+        path = self._path(theme, key)
+        if path and os.path.exists(path):
+            with open(path, "r", encoding="utf-8") as f:
+                compiled = f.read()
+            self.disk_hits += 1
+        else:
+            qss, _ = self._read_qss()
+            compiled = qdarktheme.load_stylesheet(theme, custom_colors=custom_colors) + "\n" + qss
+            self.compiles += 1
+            if path:
+                self._write(path, compiled)
+                self._prune(theme, path)
+
+        self.m_compiled[key] = compiled
+        return compiled
+
+    def _prune(self, theme: str, keep: str) -> None:
+        # stylesheets for an older qss or qdarktheme are never read again
+        for name in os.listdir(self.cache_dir):
+            path = os.path.join(self.cache_dir, name)
+            if name.startswith(f"{theme}-") and name.endswith(".qss") and path != keep:
+                try:
+                    os.remove(path)
+                except OSError:
+                    pass
+
+    @staticmethod
+    def _write(path: str, compiled: str) -> None:
+        try:
+            with open(path + ".tmp", "w", encoding="utf-8") as f:
+                f.write(compiled)
+            os.replace(path + ".tmp", path)
+        except OSError as e:
+            logger.warning(f"Could not write theme cache {path}: {e}")
+
+
+themes = ThemeCompiler()
@@ -0,0 +1,220 @@
+import dataclasses
+import hashlib
+import json
+import os
+
+import numpy as np
+from qtpy.QtCore import QEvent, QObject, QTimer
+from qtpy.QtGui import QImage
+from loguru import logger
+
+from animation_data import AnimationArgs
+from preview import PreviewEngine
+from widgets import SpriteStrip
+
+# bump when the preview generators change how a sheet looks
+SPRITE_CACHE_VERSION = 1
+SPRITE_LEDS = 32
+SPRITE_FPS = 12
+SPRITE_FRAMES = 48
+SPRITE_FILES_PER_ANIMATION = 8
+# args change many times while a slider is dragged, sheets are rebuilt once they settle
+ARGS_SETTLE_DELAY = 500
+
+# args section each animation is drawn from, the others look the same for any args
+ANIMATION_SECTIONS: dict[str, str | None] = {
+    "SingleColor": "single_color",
+    "Rainbow": None,
+    "GlitterRainbow": "glitter_rainbow",
+    "Colorloop": None,
+    "Fade": "fade",
+    "Flash": "flash",
+    "Wipe": "wipe",
+    "Firework": "firework",
+    "Random": "random",
+    "RandomColor": None,
+}
+
+
+def render_sheet(animation: str, args: AnimationArgs, leds: int = SPRITE_LEDS, frames: int = SPRITE_FRAMES,
+                 fps: int = SPRITE_FPS) -> QImage:
+    """Render a looping preview into a sprite sheet
+
+    Args:
+        animation (str): Animation name as sent to the controller
+        args (AnimationArgs): Args to render with
+        leds (int, optional): Width of the sheet. Defaults to SPRITE_LEDS.
+        frames (int, optional): Height of the sheet. Defaults to SPRITE_FRAMES.
+        fps (int, optional): Frame rate the sheet is played at. Defaults to SPRITE_FPS.
+
+    Returns:
+        QImage: One row per frame
+    """
+    # a fixed seed makes sheets for the same args identical
+    engine = PreviewEngine(leds, seed=0)
+    engine.animation = animation
+    engine.args = args
+    sheet = np.empty((frames, leds, 3), dtype=np.uint8)
+    for frame in range(frames):
+        engine.render(frame / fps, sheet[frame])
+    return QImage(sheet.data, leds, frames, leds * 3, QImage.Format.Format_RGB888).copy()
+
+
+class SpriteCache:
+    """
+    Sprite sheets of the animation previews, keyed by animation and a hash of its args.
+
+    The latest sheet of each animation is kept in memory and every sheet is written to a
+    cache directory as a PNG, so a cold start with unchanged args only loads images.
+    """
+
+    def __init__(self, cache_dir: str | None = None) -> None:
+        self.cache_dir: str | None = None
+        self.m_sheets: dict[str, tuple[str, QImage]] = {}
+
+        self.hits = 0
+        self.disk_hits = 0
+        self.renders = 0
+
+        self.set_cache_dir(cache_dir)
+
+    def set_cache_dir(self, path: str | None) -> None:
+        """
+        Set the directory of the PNG store, None keeps sheets in memory only
+        """
+        self.cache_dir = path
+        if path is None:
+            return
+        try:
+            os.makedirs(path, exist_ok=True)
+        except OSError as e:
+            logger.warning(f"Sprite disk cache disabled, could not create {path}: {e}")
+            self.cache_dir = None
+
+    @staticmethod
+    def key(animation: str, args: AnimationArgs) -> str:
+        section = ANIMATION_SECTIONS.get(animation)
+        values = dataclasses.asdict(getattr(args, section)) if section else None
+        material = json.dumps(
+            [SPRITE_CACHE_VERSION, animation, values, SPRITE_LEDS, SPRITE_FRAMES, SPRITE_FPS], sort_keys=True
+        )
+        return hashlib.sha256(material.encode("utf-8")).hexdigest()[:32]
+
+    def _path(self, animation: str, key: str) -> str | None:
+        return os.path.join(self.cache_dir, f"{animation}-{key}.png") if self.cache_dir else None
+
+    def sheet(self, animation: str, args: AnimationArgs) -> QImage:
+        key = self.key(animation, args)
+        cached = self.m_sheets.get(animation)
+        if cached is not None and cached[0] == key:
+            self.hits += 1
+            return cached[1]
+
+        path = self._path(animation, key)
+        image = QImage(path) if path and os.path.exists(path) else QImage()
+        if not image.isNull():
+            self.disk_hits += 1
+        else:
+            image = render_sheet(animation, args)
+            self.renders += 1
+            if path:
+                if image.save(path, "PNG"):
+                    self._prune(animation)
+                else:
+                    logger.warning(f"Could not write sprite cache file {path}")
+
+        self.m_sheets[animation] = (key, image)
+        return image
+
+    def _prune(self, animation: str) -> None:
+        # keep the sheets of the most recently used args
+        files = [
+            os.path.join(self.cache_dir, name)
+            for name in os.listdir(self.cache_dir)
+            if name.startswith(f"{animation}-") and name.endswith(".png")
+        ]
+        files.sort(key=os.path.getmtime, reverse=True)
+        for path in files[SPRITE_FILES_PER_ANIMATION:]:
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+
+    def stats(self) -> dict:
+        return {
+            "sheets": len(self.m_sheets),
+            "hits": self.hits,
+            "disk_hits": self.disk_hits,
+            "renders": self.renders,
+        }
+
+
+sprites = SpriteCache()
+
+
+class ThumbnailAnimator(QObject):
+    """
+    Plays sprite sheets on animation tiles from one shared timer.
+
+    Every tick advances all visible strips to the same frame, their updates are combined
+    into one paint pass. Missing sheets are built one per tick and the timer only runs
+    while a strip is visible.
+    """
+
+    def __init__(self, cache: SpriteCache = sprites, fps: int = SPRITE_FPS, parent=None) -> None:
+        super().__init__(parent)
+        self.cache = cache
+        self.args = AnimationArgs()
+        self.frame = 0
+
+        self.m_strips: dict[str, SpriteStrip] = {}
+        self.m_keys: dict[str, str] = {}
+        self.m_pending: list[str] = []
+
+        self.m_timer = QTimer(self)
+        self.m_timer.setInterval(round(1000 / fps))
+        self.m_timer.timeout.connect(self.tick)
+
+        self.m_settle = QTimer(self)
+        self.m_settle.setSingleShot(True)
+        self.m_settle.setInterval(ARGS_SETTLE_DELAY)
+        self.m_settle.timeout.connect(self.refresh)
+
+    def add(self, animation: str, strip: SpriteStrip) -> None:
+        if animation not in ANIMATION_SECTIONS:
+            return
+        self.m_strips[animation] = strip
+        self.m_pending.append(animation)
+        strip.installEventFilter(self)
+
+    def set_args(self, args: AnimationArgs) -> None:
+        self.args = args
+        self.m_settle.start()
+
+    def refresh(self) -> None:
+        """
+        Queue every strip whose sheet does not match the current args
+        """
+        for animation in self.m_strips:
+            if animation not in self.m_pending and self.m_keys.get(animation) != self.cache.key(animation, self.args):
+                self.m_pending.append(animation)
+
+    def tick(self) -> None:
+        visible = [strip for strip in self.m_strips.values() if strip.isVisible()]
+        if not visible:
+            self.m_timer.stop()
+            return
+
+        if self.m_pending:
+            animation = self.m_pending.pop(0)
+            self.m_keys[animation] = self.cache.key(animation, self.args)
+            self.m_strips[animation].set_sheet(self.cache.sheet(animation, self.args))
+
+        self.frame += 1
+        for strip in visible:
+            strip.set_frame(self.frame)
+
+    def eventFilter(self, watched, event) -> bool:
+        if event.type() == QEvent.Type.Show and not self.m_timer.isActive():
+            self.m_timer.start()
+        return False
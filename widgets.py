@@ -1,11 +1,14 @@
-from qtpy.QtWidgets import QFrame, QLabel, QHBoxLayout, QPushButton, QMessageBox, QVBoxLayout
-from qtpy.QtCore import Qt, Signal, QSize, QTimer, Slot, QUrl
-from qtpy.QtGui import QMouseEvent, QPainter, QPen, QColor
+from qtpy.QtWidgets import QFrame, QLabel, QHBoxLayout, QPushButton, QMessageBox, QVBoxLayout, QStackedWidget, QWidget
+from qtpy.QtCore import Qt, Signal, QSize, QTimer, Slot, QUrl, QPointF, QRect
+from qtpy.QtGui import QMouseEvent, QPainter, QPen, QColor, QLinearGradient, QImage
 from qtpy.QtMultimedia import QSoundEffect
 
 from enum import Enum
+from typing import Callable
 import qtawesome as _qta
 
+from icon_cache import icons
+
 
 class Severity(Enum):
     SEVERE = 0
@@ -111,13 +114,10 @@ class LockButton(QPushButton):
             painter.drawRoundedRect(self.rect().adjusted(2, 2, -2, -2), 2, 2)
 
 
-def rgb_to_hex(rgb):
-    return "%02x%02x%02x" % tuple(rgb)
-
-
 class ColorBlock(QFrame):
     """
-    A simple widget ot show a single color
+    A simple widget ot show a single color, or several colors as stripes or a gradient.
+    The colors are painted directly and only repainted when they change
     """
 
     def __init__(self) -> None:
@@ -129,18 +129,180 @@ class ColorBlock(QFrame):
 
         self.setMaximumSize(128, 128)
 
+        self.m_colors: tuple[tuple[int, int, int], ...] = ()
+        self.m_gradient = False
+        self.m_brushes: list[QColor] = []
+
     def set_color(self, color: str) -> None:
         """
         Sets the color of the widget
         """
-        self.setStyleSheet(f"background-color: {color};")
+        qcolor = QColor(color)
+        self.set_colors([(qcolor.red(), qcolor.green(), qcolor.blue())])
 
     def set_rgb(self, rgb):
         """
         Sets the color of the widget in (r, g, b)
         """
-        color_str = rgb_to_hex(rgb)
-        self.setStyleSheet(f"background-color: #{color_str};")
+        self.set_colors((rgb,))
+
+    def set_colors(self, colors, gradient: bool = False):
+        """
+        Sets several (r, g, b) colors, shown as equal stripes or an even horizontal gradient
+        """
+        colors = tuple(tuple(color) for color in colors)
+        if colors == self.m_colors and gradient == self.m_gradient:
+            return
+        self.m_colors = colors
+        self.m_gradient = gradient
+        self.m_brushes = [QColor(*color) for color in colors]
+        self.update()
+
+    def paintEvent(self, event):
+        super().paintEvent(event)
+        if not self.m_brushes:
+            return
+
+        painter = QPainter(self)
+        rect = self.contentsRect()
+        if len(self.m_brushes) == 1:
+            painter.fillRect(rect, self.m_brushes[0])
+        elif self.m_gradient:
+            gradient = QLinearGradient(QPointF(rect.topLeft()), QPointF(rect.topRight()))
+            last = len(self.m_brushes) - 1
+            for i, color in enumerate(self.m_brushes):
+                gradient.setColorAt(i / last, color)
+            painter.fillRect(rect, gradient)
+        else:
+            count = len(self.m_brushes)
+            for i, color in enumerate(self.m_brushes):
+                left = rect.left() + rect.width() * i // count
+                right = rect.left() + rect.width() * (i + 1) // count
+                painter.fillRect(QRect(left, rect.top(), right - left, rect.height()), color)
+
+
+class LazyStackedWidget(QStackedWidget):
+    """
+    Stacked widget whose pages can be built by a factory the first time they are shown
+    """
+
+    pageCreated = Signal(int, QWidget)
+
+    def __init__(self, parent=None):
+        super(LazyStackedWidget, self).__init__(parent)
+
+        # placeholder widget -> factory for the page that replaces it
+        self.m_factories: dict[QWidget, Callable[[], QWidget]] = {}
+
+        self.m_warm_up_timer = QTimer(self)
+        self.m_warm_up_timer.setSingleShot(True)
+        self.m_warm_up_timer.timeout.connect(self._warm_up_next)
+
+    def insert_page(self, index: int, factory: Callable[[], QWidget]) -> int:
+        placeholder = QWidget()
+        self.m_factories[placeholder] = factory
+        return self.insertWidget(index, placeholder)
+
+    def add_page(self, factory: Callable[[], QWidget]) -> int:
+        return self.insert_page(self.count(), factory)
+
+    def is_created(self, index: int) -> bool:
+        return self.widget(index) not in self.m_factories
+
+    @property
+    def pending(self) -> int:
+        return len(self.m_factories)
+
+    def page(self, index: int) -> QWidget:
+        """
+        Get the page at index, building it if needed
+        """
+        placeholder = self.widget(index)
+        factory = self.m_factories.pop(placeholder, None)
+        if factory is None:
+            return placeholder
+
+        page = factory()
+        current = self.currentIndex()
+        self.blockSignals(True)
+        self.insertWidget(index, page)
+        self.removeWidget(placeholder)
+        super().setCurrentIndex(current)
+        self.blockSignals(False)
+        placeholder.deleteLater()
+
+        self.pageCreated.emit(index, page)
+        return page
+
+    @Slot(int)
+    def setCurrentIndex(self, index: int):
+        self.page(index)
+        super().setCurrentIndex(index)
+
+    def warm_up(self, delay: int = 0):
+        """
+        Build the remaining pages one per event loop pass, starting after delay ms
+        """
+        if self.m_factories:
+            self.m_warm_up_timer.start(delay)
+
+    def _warm_up_next(self):
+        for index in range(self.count()):
+            if not self.is_created(index):
+                self.page(index)
+                break
+        if self.m_factories:
+            self.m_warm_up_timer.start(0)
+
+    def showEvent(self, event):
+        if self.currentIndex() >= 0:
+            self.page(self.currentIndex())
+        super().showEvent(event)
+
+
+ANIMATION_ICONS = {
+    "Single Color": "mdi6.moon-full",
+    "Rainbow": "ph.rainbow",
+    "Colorloop": "mdi6.refresh",
+    "Fire": "mdi6.fire",
+    "Magic": "mdi6.magic-staff",
+    "Colored Lights": "mdi6.string-lights",
+    "Flash": "mdi6.flash",
+    "Fade": "mdi6.transition",
+    "Wipe": "mdi6.chevron-double-right",
+    "Firework": "mdi6.firework",
+    "Glitter Rainbow": "mdi6.auto-mode",
+}
+
+
+class SpriteStrip(QWidget):
+    """
+    Shows one row of a sprite sheet, each row of the sheet is one frame of a strip
+    """
+
+    def __init__(self, height: int = 12):
+        super().__init__()
+        self.setFixedHeight(height)
+        self.m_sheet: QImage | None = None
+        self.m_frame = 0
+
+    def set_sheet(self, sheet: QImage | None) -> None:
+        self.m_sheet = sheet
+        self.update()
+
+    def set_frame(self, frame: int) -> None:
+        if self.m_sheet is None or self.m_sheet.height() == 0:
+            return
+        frame %= self.m_sheet.height()
+        if frame != self.m_frame:
+            self.m_frame = frame
+            self.update()
+
+    def paintEvent(self, event):
+        if self.m_sheet is None:
+            return
+        painter = QPainter(self)
+        painter.drawImage(self.rect(), self.m_sheet, QRect(0, self.m_frame, self.m_sheet.width(), 1))
 
 
 class AnimationWidget(QFrame):
@@ -159,42 +321,16 @@ class AnimationWidget(QFrame):
 
         self.icon = QLabel()
 
-        if title == "Single Color":
-            self.icon.setPixmap(_qta.icon("mdi6.moon-full", color="#FFEE58").pixmap(72, 72))
-        elif title == "Rainbow":
-            self.icon.setPixmap(_qta.icon("ph.rainbow", color="#FFEE58").pixmap(72, 72))
-        elif title == "Colorloop":
-            self.icon.setPixmap(_qta.icon("mdi6.refresh", color="#FFEE58").pixmap(72, 72))
-        elif title == "Fire":
-            self.icon.setPixmap(_qta.icon("mdi6.fire", color="#FFEE58").pixmap(72, 72))
-        elif title == "Magic":
-            self.icon.setPixmap(
-                _qta.icon("mdi6.magic-staff", color="#FFEE58").pixmap(72, 72)
-            )
-        elif title == "Colored Lights":
-            self.icon.setPixmap(
-                _qta.icon("mdi6.string-lights", color="#FFEE58").pixmap(72, 72)
-            )
-        elif title == "Flash":
-            self.icon.setPixmap(_qta.icon("mdi6.flash", color="#FFEE58").pixmap(72, 72))
-        elif title == "Fade":
-            self.icon.setPixmap(_qta.icon("mdi6.transition", color="#FFEE58").pixmap(72, 72))
-        elif title == "Wipe":
-            self.icon.setPixmap(
-                _qta.icon("mdi6.chevron-double-right", color="#FFEE58").pixmap(72, 72)
-            )
-        elif title == "Firework":
-            self.icon.setPixmap(
-                _qta.icon("mdi6.firework", color="#FFEE58").pixmap(72, 72)
-            )
-        elif title == "Glitter Rainbow":
-            self.icon.setPixmap(_qta.icon("mdi6.auto-mode", color="#FFEE58").pixmap(72, 72))
-        else:
-            self.icon.setPixmap(_qta.icon("mdi6.auto-fix", color="#FFEE58").pixmap(72, 72))
+        self.icon.setPixmap(
+            icons.pixmap(ANIMATION_ICONS.get(title, "mdi6.auto-fix"), 72, color="#FFEE58")
+        )
 
         self.icon.setAlignment(Qt.AlignmentFlag.AlignCenter)
         self.root_layout.addWidget(self.icon)
 
+        self.thumbnail = SpriteStrip()
+        self.root_layout.addWidget(self.thumbnail)
+
         self.title = QLabel(title)
         self.title.setObjectName("h4")
         self.title.setAlignment(Qt.AlignmentFlag.AlignCenter)